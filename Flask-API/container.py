@@ -1,11 +1,17 @@
+import atexit
 import os
 import logging
+import logging.handlers
+import queue
 import socket
+from concurrent.futures import ThreadPoolExecutor
 import redis
 from flask import request
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from services.time_series_manager import TimeSeriesManager
+from utils.rate_limit_storage import LocallyBatchedRedisStorage
+from utils.redis_pool import BurstableConnectionPool
 
 
 def _should_skip_rate_limit():
@@ -17,23 +23,65 @@ def _should_skip_rate_limit():
     return request.method == "OPTIONS"
 
 
+def _tcp_keepalive_options():
+    """
+    Socket options detecting dead Redis connections within seconds.
+
+    Keepalive probes reap idle connections after ~45s instead of the kernel
+    default of hours, and TCP_USER_TIMEOUT aborts connections whose writes stay
+    unacknowledged for 15s. The options are Linux-only, so those missing on the
+    current platform (e.g. macOS in development) are skipped.
+    """
+    options = {
+        "TCP_KEEPIDLE": 30,
+        "TCP_KEEPINTVL": 5,
+        "TCP_KEEPCNT": 3,
+        "TCP_USER_TIMEOUT": 15000,  # milliseconds
+    }
+    return {
+        getattr(socket, name): value
+        for name, value in options.items()
+        if hasattr(socket, name)
+    }
+
+
 class Container:
     def __init__(self):
         self._logger = None
         self._redis_client = None
         self._time_series_manager = None
         self._limiter = None
+        self._background_executor = None
         self._redis_host = os.environ.get("REDIS_HOST", "redis")
         self._use_ssl = self._redis_host not in ["localhost", "127.0.0.1", "redis"]
+        # One connection per gunicorn thread plus headroom, so a worker never
+        # waits for a connection nor holds far more sockets than it can use
+        threads_per_worker = int(os.environ.get("GUNICORN_THREADS", 4))
+        self._redis_pool_size = int(
+            os.environ.get("REDIS_POOL_SIZE", threads_per_worker + 4)
+        )
+        # Extra connections are opened during bursts and closed once released.
+        # Every gevent greenlet may hold a connection at once, so with gevent
+        # workers a burst can reach the worker's connection limit
+        burst_size = self._redis_pool_size * 4
+        if os.environ.get("GUNICORN_WORKER_CLASS") == "gevent":
+            burst_size = max(
+                burst_size, int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 1000))
+            )
+        self._redis_pool_burst_size = int(
+            os.environ.get("REDIS_POOL_BURST_SIZE", burst_size)
+        )
+        # Responses are not decoded: series values are JSON which is parsed
+        # straight from the raw bytes, skipping a UTF-8 decode to str first
         connection_kwargs = {
             "host": self._redis_host,
             "port": 6379,
-            "decode_responses": True,
             "db": 0,
-            "max_connections": 50,
+            "max_connections": max(self._redis_pool_burst_size, self._redis_pool_size),
             "socket_connect_timeout": 5,
             "socket_timeout": 10,
             "socket_keepalive": True,
+            "socket_keepalive_options": _tcp_keepalive_options(),
             "retry_on_timeout": True,
             "health_check_interval": 30,
             "connection_class": (
@@ -41,22 +89,59 @@ class Container:
             ),
         }
 
-        # Add TCP keepalive options only for AWS Elasticache (production)
         if self._use_ssl:
             connection_kwargs["ssl_cert_reqs"] = None
-            connection_kwargs["socket_keepalive_options"] = {
-                socket.TCP_KEEPIDLE: 60,
-                socket.TCP_KEEPINTVL: 10,
-                socket.TCP_KEEPCNT: 3,
-            }
 
-        self._redis_pool = redis.ConnectionPool(**connection_kwargs)
+        self._redis_pool = BurstableConnectionPool(
+            max_idle_connections=self._redis_pool_size, **connection_kwargs
+        )
+
+    def reset_redis_pool(self):
+        """
+        Drop Redis connections inherited from the parent process.
+
+        Must be called in a freshly forked worker. The inherited sockets are
+        abandoned rather than closed, as closing them would also tear down the
+        connections still used by the parent. New ones are opened lazily.
+        """
+        self._redis_pool.reset()
+
+    def start_background_logging(self):
+        """
+        Hand log records to a background thread which writes them out.
+
+        Request threads only enqueue records, while the blocking writes of the
+        root handlers happen on the listener thread. Must be called in the
+        process doing the logging: a listener thread started before a fork
+        does not exist in the forked workers.
+        """
+        self.logger.debug("Moving log output to a background thread")
+        root = logging.getLogger()
+        handlers = [
+            handler
+            for handler in root.handlers
+            if not isinstance(handler, logging.handlers.QueueHandler)
+        ]
+        if not handlers:
+            return
+
+        log_queue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(
+            log_queue, *handlers, respect_handler_level=True
+        )
+        for handler in handlers:
+            root.removeHandler(handler)
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        listener.start()
+        # Flush the queued records when the worker exits
+        atexit.register(listener.stop)
 
     @property
     def logger(self):
         if not self._logger:
+            # INFO by default: per-request trace logs are DEBUG and skipped
             logging.basicConfig(
-                level=logging.DEBUG,
+                level=os.environ.get("LOG_LEVEL", "INFO").upper(),
                 format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
             )
             self._logger = logging.getLogger("FlaskAPI")
@@ -65,9 +150,11 @@ class Container:
     @property
     def limiter(self):
         if not self._limiter:
+            # Hits are counted in-process and flushed to Redis in batches,
+            # so most requests do not pay a Redis round-trip for rate limiting
             self._limiter = Limiter(
                 key_func=get_remote_address,
-                storage_uri=self.redis_url,
+                storage_uri=LocallyBatchedRedisStorage.URI_PREFIX + self.redis_url,
                 default_limits=["5000 per day", "1000 per hour"],
                 strategy="fixed-window",
             )
@@ -93,11 +180,23 @@ class Container:
                 raise e
         return self._redis_client
 
+    @property
+    def background_executor(self):
+        if not self._background_executor:
+            # Threads are started on the first submitted task, so an executor
+            # created before gunicorn forks gets fresh threads in each worker
+            self._background_executor = ThreadPoolExecutor(
+                max_workers=2, thread_name_prefix="background"
+            )
+        return self._background_executor
+
     @property
     def time_series_manager(self):
         if not self._time_series_manager:
             self._time_series_manager = TimeSeriesManager(
-                redis_client=self.redis_client, logger=self.logger
+                redis_client=self.redis_client,
+                logger=self.logger,
+                background_executor=self.background_executor,
             )
         return self._time_series_manager
 
@@ -3,13 +3,28 @@
 import multiprocessing
 import os
 
+# Handlers spend most of their wall time waiting on Redis, so a cooperative
+# worker class ("gevent") can be selected when gevent is installed in the image.
+# CPU-heavy metric kernels (DTW, pandas alignment) block the event loop, hence
+# gthread stays the default.
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+
+if worker_class == "gevent":
+    # Patch before the app (and redis-py sockets) is imported, which matters
+    # when the app is preloaded in the master process
+    from gevent import monkey
+
+    monkey.patch_all()
+
 # Bind to all interfaces
 bind = "0.0.0.0:5000"
 
 # Worker configuration
 # Use more workers for better parallelism with Elasticache
 workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
-worker_class = "gthread"
+# Only used by the gthread worker class. Also sizes the per-worker Redis
+# connection pool (see container.py); with gevent its burst limit follows
+# worker_connections instead.
 threads = int(os.environ.get("GUNICORN_THREADS", 4))
 
 # Keepalive - important for persistent connections to Elasticache
@@ -29,9 +44,10 @@ accesslog = None  # Disable access logs
 errorlog = "-"  # stderr
 capture_output = True  # Capture stdout/stderr from workers
 
-# Preload app for better performance (production only)
-# Disabled for local development to see real-time logs
-preload_app = os.environ.get("GUNICORN_PRELOAD", "false").lower() == "true"
+# Preload the app in the master so workers share its memory copy-on-write and
+# start faster. Workers drop the inherited Redis connections in post_fork.
+# Disabled for local development (GUNICORN_PRELOAD=false) to see real-time logs
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() == "true"
 
 # Server mechanics
 daemon = False
@@ -42,12 +58,21 @@ group = None
 tmp_upload_dir = None
 
 # Connection settings optimized for Elasticache
-worker_connections = 1000
+# Maximum concurrent clients per worker for the gevent worker class
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 1000))
 backlog = 2048
 
 
 def post_fork(server, worker):
     """Called after a worker has been forked."""
+    from container import container
+
+    if preload_app:
+        # The preloaded container holds connections opened in the master
+        # (e.g. the startup ping), give each worker a pool of its own
+        container.reset_redis_pool()
+    # Log writes happen on a background thread instead of request threads
+    container.start_background_logging()
     server.log.info(f"Worker spawned (pid: {worker.pid})")
 
 
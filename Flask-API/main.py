@@ -1,17 +1,42 @@
-import sys
-import uuid
+import functools
+import hashlib
 import math
+import os
+import re
+import secrets
+import sys
 from container import container
 import services.metric_service as metric_service
-from utils.data_utils import pivot_file
+from utils.data_utils import pivot_file, to_float32
 from flask_cors import CORS
-from flask import Flask, jsonify, request
+from flask import Flask, g, jsonify, request
+from werkzeug.middleware.proxy_fix import ProxyFix
 from utils.time_utils import convert_timeseries_keys_timezone
-from services.plugin_service import validate_plugin_code
+from utils.cache_utils import TTLCache
+from utils.compression_utils import gzip_response
+from utils.json_provider import OrjsonProvider
+from utils.query_utils import (
+    PluginExecuteRequest,
+    SeriesQuery,
+    ValidationError,
+    parse_bool,
+    parse_choice,
+    parse_choices,
+    parse_positive_int,
+)
+from utils.wsgi_utils import HealthCheckMiddleware
+from services.plugin_service import (
+    build_execution_pairs,
+    builtin_plugin_metric,
+    execution_results_to_map,
+    validate_plugin_code,
+)
+from services.time_series_manager import InvalidTimeseriesError
 
 sys.stdout.reconfigure(line_buffering=True)
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.config["MAX_CONTENT_LENGTH"] = 16 * 1024 * 1024  # 16MB max
 CORS(
     app,
@@ -31,6 +56,12 @@ limiter = container.limiter
 limiter.init_app(app)
 
 
+@app.after_request
+def compress_response(response):
+    """Compress large JSON responses for clients accepting gzip."""
+    return gzip_response(response, request)
+
+
 @app.errorhandler(429)
 def ratelimit_handler(e):
     """
@@ -66,6 +97,13 @@ def ratelimit_handler(e):
     return response
 
 
+@app.errorhandler(ValidationError)
+def validation_error_handler(e):
+    """Handle invalid request parameters with a structured 400 response."""
+    logger.error("Invalid request parameters: %s", e)
+    return _create_response({"error": str(e), "code": "bad_request"}, 400)
+
+
 def _all_required_services_are_running():
     """
     Check if all required services are running.
@@ -78,41 +116,163 @@ def _all_required_services_are_running():
     return True
 
 
+# Behind a load balancer the remote address is the balancer's, so the client
+# address is taken from X-Forwarded-For, set by that many trusted proxies.
+# Otherwise all clients would share the same rate limit.
+_trusted_proxy_count = int(os.environ.get("TRUSTED_PROXY_COUNT", 0))
+if _trusted_proxy_count:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=_trusted_proxy_count)
+
+# Liveness probes are answered in front of Flask, bypassing routing and the limiter
+app.wsgi_app = HealthCheckMiddleware(
+    app.wsgi_app, path="/health", check=_all_required_services_are_running
+)
+
+
+# Session tokens minted by secrets.token_hex(16), or the uuid4 strings minted
+# before, whose sessions are still accepted
+_SESSION_TOKEN_RE = re.compile(
+    r"[0-9a-f]{32}|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+)
+
+
+def _get_request_session_token():
+    """
+    Session token from the X-Session-ID header, None if missing or malformed.
+    """
+    token = request.headers.get("X-Session-ID")
+    if not token or not _SESSION_TOKEN_RE.fullmatch(token):
+        return None
+    return token
+
+
 def _get_session_token():
     """
     Retrieve or generate a session token from request headers.
     """
-    token = request.headers.get("X-Session-ID")
-    is_new_token = False
-    if not token or token == "null" or len(token.strip()) < 10:
-        token = str(uuid.uuid4())
+    token = _get_request_session_token()
+    is_new_token = token is None
+    if is_new_token:
+        token = secrets.token_hex(16)
         logger.info(f"Generated new session token: {token}")
-        is_new_token = True
     return token, is_new_token
 
 
+def _get_request_data_version():
+    """
+    Data version of the session named by the request's X-Session-ID header.
+
+    Looked up once per request, None without a session or session data.
+    """
+    if "data_version" not in g:
+        token = _get_request_session_token()
+        g.data_version = timeseries_manager.get_version(token) if token else None
+    return g.data_version
+
+
+def _get_request_args_key():
+    """
+    Sorted query arguments of the request, identifying it in cache keys.
+
+    Computed once per request and shared by the ETag and the response cache.
+    """
+    if "args_key" not in g:
+        g.args_key = tuple(sorted(request.args.items(multi=True)))
+    return g.args_key
+
+
+def _conditional_response(view):
+    """
+    Answer GET requests for unchanged session data with 304 Not Modified.
+
+    The ETag is derived from the session's data version, which is replaced on
+    every upload or clear, and from the request path, query string and
+    Accept header. Clients must revalidate every time, so a changed session
+    is never served stale.
+    """
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        version = _get_request_data_version()
+        if version is None:
+            return view(*args, **kwargs)
+
+        etag = hashlib.blake2b(
+            repr(
+                (
+                    version,
+                    request.path,
+                    _get_request_args_key(),
+                    request.headers.get("Accept"),
+                )
+            ).encode(),
+            digest_size=16,
+        ).hexdigest()
+        # Weak comparison, as compressed responses carry the ETag as weak
+        if request.if_none_match.contains_weak(etag):
+            response = app.response_class(status=304)
+        else:
+            response = app.make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag)
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        response.vary.update(("X-Session-ID", "Accept"))
+        return response
+
+    return wrapper
+
+
+# Computed metric responses, keyed by session data version so that an upload or
+# clear made through any worker makes the stale entries unreachable
+_response_cache = TTLCache(maxsize=512, ttl=900)
+
+
+def _cached_response(view):
+    """
+    Serve repeated identical metric requests from the in-process response cache.
+
+    Successful responses are cached under the session token, the session's data
+    version and the query string. Error responses are never cached.
+    """
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        token = _get_request_session_token()
+        version = _get_request_data_version()
+        if version is None:
+            return view(*args, **kwargs)
+
+        key = (
+            token,
+            version,
+            request.path,
+            _get_request_args_key(),
+        )
+        cached = _response_cache.get(key)
+        if cached is not None:
+            body, mimetype = cached
+            return app.response_class(body, status=200, mimetype=mimetype)
+
+        response = app.make_response(view(*args, **kwargs))
+        if response.status_code == 200:
+            _response_cache.set(key, (response.get_data(), response.mimetype))
+        return response
+
+    return wrapper
+
+
 def _create_response(data, status_code=200, token=None):
     """
     Create a Flask response with optional session token.
-    Converts NaN values to null for valid JSON.
+    NaN values are serialized as null by the app's JSON provider.
 
     :param data: Response data
     :param status_code: HTTP status code for the response
     :param token: Optional session token to include in the response headers
     """
-
-    # Convert NaN to None (null in JSON) recursively
-    def convert_nan(obj):
-        if isinstance(obj, float) and math.isnan(obj):
-            return None
-        elif isinstance(obj, dict):
-            return {k: convert_nan(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [convert_nan(item) for item in obj]
-        return obj
-
-    cleaned_data = convert_nan(data)
-    response = jsonify(cleaned_data)
+    response = jsonify(data)
     response.status_code = status_code
     if token:
         response.headers["X-Session-ID"] = token
@@ -120,25 +280,68 @@ def _create_response(data, status_code=200, token=None):
     return response
 
 
-def _apply_timezone_conversion(data, param_name="data"):
+def _wants_ndjson():
+    """
+    Check whether the client asked for newline delimited JSON.
+
+    Requested with the `format=ndjson` query parameter or with an Accept header
+    preferring application/x-ndjson over application/json.
+    """
+    if request.args.get("format") == "ndjson":
+        return True
+    best = request.accept_mimetypes.best_match(
+        ["application/json", "application/x-ndjson"]
+    )
+    return best == "application/x-ndjson"
+
+
+def _create_ndjson_response(records, token=None):
+    """
+    Create a streamed newline delimited JSON response, one record per line.
+
+    :param records: Iterable of JSON serializable records
+    :param token: Optional session token to include in the response headers
+    """
+    response = app.response_class(
+        app.json.ndjson_lines(records), mimetype="application/x-ndjson"
+    )
+    if token:
+        response.headers["X-Session-ID"] = token
+        response.headers["Access-Control-Expose-Headers"] = "X-Session-ID"
+    return response
+
+
+# Conversions of the series shared through the series cache of the
+# TimeSeriesManager, keyed by the identity of the source dict. The source is
+# kept in the entry, so its id cannot be reused while the entry exists.
+_converted_series_cache = TTLCache(maxsize=64, ttl=900)
+
+
+def _apply_timezone_conversion(data, param_name="data", shared=False):
     """
     Apply timezone conversion to timeseries data.
 
     :param data: Dictionary with timeseries data (keys are timestamps)
     :param param_name: Name of the parameter for logging
+    :param shared: Whether data is a cached series returned by
+        get_series/get_series_many, which is never modified; its conversion is
+        then cached as well and must not be modified either
     """
     if not data:
         return data
 
-    tz_param = request.args.get("tz", "Europe/Warsaw")
-    keep_offset_param = request.args.get("keep_offset", "false").lower() in (
-        "1",
-        "true",
-        "yes",
-    )
+    args = request.args
+    tz_param = args.get("tz", "Europe/Warsaw")
+    keep_offset_param = parse_bool(args.get("keep_offset"))
+
+    cache_key = (id(data), tz_param, keep_offset_param)
+    if shared:
+        entry = _converted_series_cache.get(cache_key)
+        if entry is not None and entry[0] is data:
+            return entry[1]
 
     try:
-        return convert_timeseries_keys_timezone(
+        converted = convert_timeseries_keys_timezone(
             data,
             tz_str=tz_param,
             keep_offset=keep_offset_param,
@@ -152,15 +355,150 @@ def _apply_timezone_conversion(data, param_name="data"):
         )
         return data
 
+    if shared:
+        _converted_series_cache.set(cache_key, (data, converted))
+    return converted
 
-@app.route("/health")
-def health_check():
-    try:
-        if _all_required_services_are_running():
-            return "OK", 200
-    except Exception as e:
-        logger.error(f"Health check failed: {e}")
-    return "Service Unavailable", 503
+
+# Statistics of single timeseries, shared by the per-statistic endpoints and
+# /api/timeseries/stats
+_statistics_cache = TTLCache(maxsize=1024, ttl=900)
+
+
+def _cached_statistic(query, name, compute):
+    """
+    Compute a statistic of the queried timeseries, cached per session data version.
+
+    The result is recomputed after every write, and is not cached for
+    sessions without data.
+
+    :param query: The SeriesQuery naming the timeseries
+    :param name: Tuple identifying the statistic and its parameters
+    :param compute: Computes the statistic on a cache miss
+    """
+    version = _get_request_data_version()
+    if version is None:
+        return compute()
+    key = (
+        _get_request_session_token(),
+        version,
+        query.filename,
+        query.category,
+        query.start,
+        query.end,
+    ) + name
+    return _statistics_cache.get_or_set(key, compute)
+
+
+def _get_basic_statistics(query, serie):
+    """
+    Compute the mean, median, variance and std_dev of a single timeseries.
+    """
+    return _cached_statistic(
+        query, ("basic",), lambda: metric_service.calculate_basic_statistics(serie)
+    )
+
+
+# Series parsed into (index, values) by metric_service.parse_series, keyed by
+# session data version so that an upload or clear makes the stale entries
+# unreachable. Requests comparing the same files skip pd.to_datetime.
+_parsed_series_cache = TTLCache(maxsize=64, ttl=900)
+
+
+def _parse_series(series_query, series):
+    """
+    Parse a series read for the request, cached per session data version.
+
+    :param series_query: The get_series_many query the series was read with
+    :param series: The series read
+    """
+    version = _get_request_data_version()
+    if version is None:
+        return metric_service.parse_series(series)
+    key = (
+        _get_request_session_token(),
+        version,
+        series_query["filename"],
+        series_query["category"],
+        series_query["start"],
+        series_query["end"],
+    )
+    return _parsed_series_cache.get_or_set(
+        key, lambda: metric_service.parse_series(series)
+    )
+
+
+def _with_series(
+    *filename_params, filter_dates=True, errors=(KeyError, ValueError), parsed=False
+):
+    """
+    Read the timeseries named by the query parameters before calling the view.
+
+    The view is called with the parsed SeriesQuery followed by one series per
+    filename parameter, all read in one get_series_many call. The given errors,
+    raised while reading the series or by the view, are answered with 400;
+    invalid parameters are left to the ValidationError handler.
+
+    :param filename_params: Query parameters naming the files, e.g. "filename"
+    :param filter_dates: Whether the series are restricted to start and end
+    :param errors: Exception types answered with 400
+    :param parsed: Whether the view takes the series parsed into (index, values)
+        instead of as dicts
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper():
+            token, _ = _get_session_token()
+            query = SeriesQuery.from_args(request.args, *filename_params, "category")
+            start, end = (query.start, query.end) if filter_dates else (None, None)
+            queries = [
+                dict(
+                    filename=getattr(query, name),
+                    category=query.category,
+                    start=start,
+                    end=end,
+                )
+                for name in filename_params
+            ]
+            try:
+                series = timeseries_manager.get_series_many(
+                    token, queries, version=_get_request_data_version()
+                )
+                if parsed:
+                    # The same file named twice stays the same object
+                    parsed_by_id = {}
+                    for series_query, serie in zip(queries, series):
+                        if id(serie) not in parsed_by_id:
+                            parsed_by_id[id(serie)] = _parse_series(series_query, serie)
+                    series = [parsed_by_id[id(serie)] for serie in series]
+                return view(query, *series)
+            except ValidationError:
+                raise
+            except errors as e:
+                logger.error("Error handling %s for %s: %s", request.path, query, e)
+                return _create_response({"error": str(e)}, 400)
+
+        return wrapper
+
+    return decorator
+
+
+def _metric_response(name, value, query):
+    """
+    Respond with a single metric value, or 400 if it could not be calculated.
+
+    :param name: Key of the value in the response
+    :param value: The metric value, None without valid data
+    :param query: The SeriesQuery, for logging
+    """
+    if value is None:
+        logger.warning(
+            "No valid timeseries data provided for %s calculation for %s", name, query
+        )
+        return _create_response({"error": "No valid timeseries data provided"}, 400)
+    logger.debug("Successfully calculated %s for %s", name, query)
+    return _create_response({name: value}, 200)
 
 
 @app.route("/", methods=["GET"])
@@ -174,8 +512,14 @@ def index():
     )
 
 
+# Precisions the values of /api/timeseries can be sent with; float32 is
+# visually identical on a chart and needs about half the digits
+_PRECISIONS = ("float64", "float32")
+
+
 @app.route("/api/timeseries", methods=["GET"])
 @limiter.limit("100 per minute")
+@_conditional_response
 def get_timeseries():
     """
     Get timeseries data for a specific filename, category and time interval.
@@ -184,11 +528,11 @@ def get_timeseries():
         JSON response with timeseries data or error message.
     """
     token, _ = _get_session_token()
-    time = request.args.get("time")
-    filename = request.args.get("filename")
-    category = request.args.get("category")
-    start = request.args.get("start")
-    end = request.args.get("end")
+    args = request.args
+    query = SeriesQuery.from_args(args)
+    time, filename, category = query.time, query.filename, query.category
+    start, end = query.start, query.end
+    precision = parse_choice(args.get("precision"), "precision", _PRECISIONS, "float64")
     try:
         data = timeseries_manager.get_timeseries(
             token=token,
@@ -228,21 +572,34 @@ def get_timeseries():
             end,
         )
         return _create_response({"error": "Timeseries not found"}, 404)
-    logger.info(
+    logger.debug(
         "Successfully fetched timeseries for filename '%s' and category '%s' and time interval '%s - %s'",
         filename,
         category,
         start,
         end,
     )
+    if precision == "float32":
+        data = to_float32(data)
+    if _wants_ndjson():
+        # Large series are streamed line by line instead of as one document
+        return _create_ndjson_response(
+            ({"t": ts, "v": values} for ts, values in data.items()), token=token
+        )
     return _create_response(data, 200, token=token)
 
 
+# Response layouts of record endpoints: a list of row objects, or an object of
+# column lists which does not repeat the field names on every row
+_LAYOUTS = ("records", "columns")
+
+
 @app.route("/api/transform/pivot", methods=["POST"])
 def transform_pivot():
     """
     Pivots uploaded data (CSV or JSON) using Pandas.
-    Returns the transformed data as a JSON list of records.
+    Returns the transformed data as a JSON list of records, or as a JSON
+    object of columns with `layout=columns`.
     """
     if "file" not in request.files:
         return _create_response({"error": "No file part in the request"}, 400)
@@ -254,6 +611,9 @@ def transform_pivot():
     index_col = request.form.get("index_col")
     columns_col = request.form.get("columns_col")
     values_col = request.form.get("values_col")
+    layout = parse_choice(
+        request.form.get("layout"), "layout", _LAYOUTS, default="records"
+    )
 
     if not all([index_col, columns_col, values_col]):
         return _create_response(
@@ -267,6 +627,7 @@ def transform_pivot():
             index_col,
             columns_col,
             values_col,
+            layout,
         )
 
         return _create_response(result_data, 200)
@@ -277,53 +638,66 @@ def transform_pivot():
 
 
 @app.route("/api/timeseries/scatter_data", methods=["GET"])
+@_conditional_response
 def get_scatter_data():
     """
     Returns aligned data points for scatter plot using the same logic as Pearson correlation.
     """
     token, _ = _get_session_token()
-    filename1 = request.args.get("filename1")
-    filename2 = request.args.get("filename2")
-    category = request.args.get("category")
-    tolerance = request.args.get("tolerance")  # Opcjonalnie
-    start_date = request.args.get("start_date")
-    end_date = request.args.get("end_date")
+    args = request.args
+    query = SeriesQuery.from_args(args, "filename1", "filename2", "category")
+    filename1, filename2, category = query.filename1, query.filename2, query.category
+    tolerance = query.tolerance  # Opcjonalnie
+    start_date, end_date = args.get("start_date"), args.get("end_date")
+    layout = parse_choice(args.get("layout"), "layout", _LAYOUTS, default="records")
 
     try:
         # Pobranie danych
-        data1 = timeseries_manager.get_timeseries(
-            token=token,
-            filename=filename1,
-            category=category,
-            start=start_date,
-            end=end_date,
-        )
-        data1 = _apply_timezone_conversion(data1, "data1")
-        serie1 = metric_service.extract_series_from_dict(data1, category, filename1)
-        data2 = timeseries_manager.get_timeseries(
-            token=token,
-            filename=filename2,
-            category=category,
-            start=start_date,
-            end=end_date,
+        serie1, serie2 = timeseries_manager.get_series_many(
+            token,
+            [
+                dict(
+                    filename=filename1,
+                    category=category,
+                    start=start_date,
+                    end=end_date,
+                ),
+                dict(
+                    filename=filename2,
+                    category=category,
+                    start=start_date,
+                    end=end_date,
+                ),
+            ],
+            version=_get_request_data_version(),
+        )
+        same_series = serie2 is serie1
+        serie1 = _apply_timezone_conversion(serie1, "serie1", shared=True)
+        serie2 = (
+            serie1
+            if same_series
+            else _apply_timezone_conversion(serie2, "serie2", shared=True)
         )
-        data2 = _apply_timezone_conversion(data2, "data2")
-        serie2 = metric_service.extract_series_from_dict(data2, category, filename2)
 
         # Użycie wspólnej logiki alignowania
         df_merged = metric_service.get_aligned_data(serie1, serie2, tolerance)
 
         # Przygotowanie odpowiedzi JSON
         # Format: [{x: 10, y: 12, time: "2023-01-01..."}, ...]
-        result = []
-        for index, row in df_merged.iterrows():
-            result.append(
-                {
-                    "x": row["value1"],
-                    "y": row["value2"],
-                    "time": index.isoformat(),
-                }
-            )
+        # or with layout=columns: {x: [10, ...], y: [12, ...], time: [...]}
+        # Columns are converted to lists at once instead of boxing every row
+        columns = {
+            "x": df_merged["value1"].tolist(),
+            "y": df_merged["value2"].tolist(),
+            "time": metric_service.format_timestamps(df_merged.index),
+        }
+        if layout == "columns":
+            result = columns
+        else:
+            result = [
+                {"x": x, "y": y, "time": time}
+                for x, y, time in zip(columns["x"], columns["y"], columns["time"])
+            ]
 
         return _create_response(result, 200)
 
@@ -333,712 +707,309 @@ def get_scatter_data():
 
 
 @app.route("/api/timeseries/mean", methods=["GET"])
-def get_mean():
+@_conditional_response
+@_cached_response
+@_with_series("filename")
+def get_mean(query, serie):
     """
     Get the mean value of the timeseries for a specific filename, category and time interval.
 
     Returns:
         JSON response with the mean value or error message.
     """
-    token, _ = _get_session_token()
-    filename = request.args.get("filename")
-    category = request.args.get("category")
-    start = request.args.get("start")
-    end = request.args.get("end")
-    try:
-        data = timeseries_manager.get_timeseries(
-            token=token,
-            filename=filename,
-            category=category,
-            start=start,
-            end=end,
-        )
-        serie = metric_service.extract_series_from_dict(data, category, filename)
-        mean = metric_service.calculate_basic_statistics(serie)["mean"]
-    except (KeyError, ValueError) as e:
-        logger.error(
-            "Error calculating mean for filename '%s' and category '%s' and time interval '%s - %s': %s",
-            filename,
-            category,
-            start,
-            end,
-            e,
-        )
-        return _create_response({"error": str(e)}, 400)
-    if mean is None:
-        logger.warning(
-            "No valid timeseries data provided for mean calculation for filename '%s' and category '%s' and time interval '%s - %s'",
-            filename,
-            category,
-            start,
-            end,
-        )
-        return _create_response({"error": "No valid timeseries data provided"}, 400)
-    logger.info(
-        "Successfully calculated mean for provided timeseries data: filename '%s', category '%s', time interval '%s - %s'",
-        filename,
-        category,
-        start,
-        end,
-    )
-
-    return _create_response({"mean": mean}, 200)
+    return _metric_response("mean", _get_basic_statistics(query, serie)["mean"], query)
 
 
 @app.route("/api/timeseries/median", methods=["GET"])
-def get_median():
+@_conditional_response
+@_cached_response
+@_with_series("filename")
+def get_median(query, serie):
     """
     Get the median value of the timeseries for a specific filename and category.
 
     Returns:
         JSON response with the median value or error message.
     """
-
-    token, _ = _get_session_token()
-    filename = request.args.get("filename")
-    category = request.args.get("category")
-    start = request.args.get("start")
-    end = request.args.get("end")
-    try:
-        data = timeseries_manager.get_timeseries(
-            token=token,
-            filename=filename,
-            category=category,
-            start=start,
-            end=end,
-        )
-        serie = metric_service.extract_series_from_dict(data, category, filename)
-        median = metric_service.calculate_basic_statistics(serie)["median"]
-        logger.debug(
-            "Calculated median: %s for filename '%s' and category '%s' and time interval '%s - %s'",
-            median,
-            filename,
-            category,
-            start,
-            end,
-        )
-    except (KeyError, ValueError) as e:
-        logger.error(
-            "Error calculating median for filename '%s' and category '%s' and time interval '%s - %s': %s",
-            filename,
-            category,
-            start,
-            end,
-            e,
-        )
-        return _create_response({"error": str(e)}, 400)
-    if median is None:
-        logger.warning(
-            "No valid timeseries data provided for median calculation for filename '%s' and category '%s' and time interval '%s - %s'",
-            filename,
-            category,
-            start,
-            end,
-        )
-        return _create_response({"error": "No valid timeseries data provided"}, 400)
-    logger.info(
-        "Successfully calculated median for provided timeseries data for filename '%s' and category '%s' and time interval '%s - %s'",
-        filename,
-        category,
-        start,
-        end,
-    )
-
-    return _create_response({"median": median}, 200)
+    median = _get_basic_statistics(query, serie)["median"]
+    return _metric_response("median", median, query)
 
 
 @app.route("/api/timeseries/variance", methods=["GET"])
-def get_variance():
+@_conditional_response
+@_cached_response
+@_with_series("filename")
+def get_variance(query, serie):
     """
     Get the variance of the timeseries for a specific filename, category and time interval.
 
     Returns:
         JSON response with the variance value or error message.
     """
-
-    token, _ = _get_session_token()
-    filename = request.args.get("filename")
-    category = request.args.get("category")
-    start = request.args.get("start")
-    end = request.args.get("end")
-    try:
-        data = timeseries_manager.get_timeseries(
-            token=token,
-            filename=filename,
-            category=category,
-            start=start,
-            end=end,
-        )
-        serie = metric_service.extract_series_from_dict(data, category, filename)
-        variance = metric_service.calculate_basic_statistics(serie)["variance"]
-    except (KeyError, ValueError) as e:
-        logger.error(
-            "Error calculating variance for filename '%s' and category '%s' and time interval '%s - %s': %s",
-            filename,
-            category,
-            start,
-            end,
-            e,
-        )
-        return _create_response({"error": str(e)}, 400)
-    if variance is None:
-        logger.warning(
-            "No valid timeseries data provided for variance calculation for filename '%s' and category '%s' and time interval '%s - %s'",
-            filename,
-            category,
-            start,
-            end,
-        )
-        return _create_response({"error": "No valid timeseries data provided"}, 400)
-    logger.info(
-        "Successfully calculated variance for provided timeseries data for filename '%s' and category '%s' and time interval '%s - %s'",
-        filename,
-        category,
-        start,
-        end,
-    )
-
-    return _create_response({"variance": variance}, 200)
+    variance = _get_basic_statistics(query, serie)["variance"]
+    return _metric_response("variance", variance, query)
 
 
 @app.route("/api/timeseries/standard_deviation", methods=["GET"])
-def get_standard_deviation():
+@_conditional_response
+@_cached_response
+@_with_series("filename")
+def get_standard_deviation(query, serie):
     """
     Get the standard deviation of the timeseries for a specific filename, category and time interval.
 
     Returns:
         JSON response with the standard deviation value or error message.
     """
-    token, _ = _get_session_token()
-    filename = request.args.get("filename")
-    category = request.args.get("category")
-    start = request.args.get("start")
-    end = request.args.get("end")
-    try:
-        data = timeseries_manager.get_timeseries(
-            token=token,
-            filename=filename,
-            category=category,
-            start=start,
-            end=end,
-        )
-        serie = metric_service.extract_series_from_dict(data, category, filename)
-        std_dev = metric_service.calculate_basic_statistics(serie)["std_dev"]
-    except (KeyError, ValueError) as e:
-        logger.error(
-            "Error calculating standard deviation for filename '%s' and category '%s' and time interval '%s - %s': %s",
-            filename,
-            category,
-            start,
-            end,
-            e,
-        )
-        return _create_response({"error": str(e)}, 400)
-    if std_dev is None:
-        logger.warning(
-            "No valid timeseries data provided for standard deviation calculation for filename '%s' and category '%s' and time interval '%s - %s'",
-            filename,
-            category,
-            start,
-            end,
-        )
-        return _create_response({"error": "No valid timeseries data provided"}, 400)
-    logger.info(
-        "Successfully calculated standard deviation for provided timeseries data for filename '%s' and category '%s' and time interval '%s - %s'",
-        filename,
-        category,
-        start,
-        end,
+    std_dev = _get_basic_statistics(query, serie)["std_dev"]
+    return _metric_response("standard_deviation", std_dev, query)
+
+
+# Metrics of /api/timeseries/stats read from the basic statistics bundle
+_BASIC_STATISTICS = {
+    "mean": "mean",
+    "median": "median",
+    "variance": "variance",
+    "standard_deviation": "std_dev",
+}
+# Metrics of /api/timeseries/stats computed on the series
+_SERIES_STATISTICS = {
+    "iqr": metric_service.calculate_iqr,
+    "coefficient_of_variation": metric_service.calculate_coefficient_of_variation,
+    "autocorrelation": metric_service.calculate_autocorrelation,
+}
+# Series metrics which also take the lag
+_LAGGED_STATISTICS = frozenset({"autocorrelation"})
+
+
+def _get_series_statistic(query, serie, metric, lag=None):
+    """
+    Compute one of the _SERIES_STATISTICS of a single timeseries, see _cached_statistic.
+    """
+    args = (lag,) if metric in _LAGGED_STATISTICS else ()
+    return _cached_statistic(
+        query, (metric,) + args, lambda: _SERIES_STATISTICS[metric](serie, *args)
     )
 
-    return _create_response({"standard_deviation": std_dev}, 200)
-
 
-@app.route("/api/timeseries/autocorrelation", methods=["GET"])
-def get_autocorrelation():
+def _calculate_statistics(query, serie, metrics, lag):
     """
-    Get the autocorrelation of the timeseries for a specific filename, category and time interval.
+    Calculate the selected statistics of a single timeseries.
+
     Returns:
-        JSON response with the autocorrelation value or error message.
+        dict: Value of each metric in the requested order, or None if the
+            timeseries has no valid data
     """
-    if not request.args.get("filename") or not request.args.get("category"):
-        logger.error("Missing required parameters: 'filename' and 'category'")
-        return (
-            jsonify(
-                {"error": "Missing required parameters: 'filename' and 'category'"}
-            ),
-            400,
-        )
-    token, _ = _get_session_token()
-    filename = request.args.get("filename")
-    category = request.args.get("category")
-    start = request.args.get("start")
-    end = request.args.get("end")
-    try:
-        data = timeseries_manager.get_timeseries(
-            token=token,
-            filename=filename,
-            category=category,
-            start=start,
-            end=end,
-        )
-        serie = metric_service.extract_series_from_dict(data, category, filename)
-        acf_value = metric_service.calculate_autocorrelation(serie)
-    except (KeyError, ValueError) as e:
-        logger.error(
-            "Error calculating autocorrelation for filename '%s' and category '%s' and time interval '%s - %s': %s",
-            filename,
-            category,
-            start,
-            end,
-            e,
-        )
-        return _create_response({"error": str(e)}, 400)
-    if acf_value is None:
+    # Validated and converted once for all the metrics; an invalid series is
+    # passed as it is so each metric reports it as usual
+    values = metric_service.series_values(serie)
+    if values is not None:
+        serie = values
+
+    result = {}
+    if any(metric in _BASIC_STATISTICS for metric in metrics):
+        stats = _get_basic_statistics(query, serie)
+        if "error" in stats:
+            return None
+        for metric, key in _BASIC_STATISTICS.items():
+            result[metric] = stats[key]
+
+    for metric in metrics:
+        if metric in _SERIES_STATISTICS:
+            result[metric] = _get_series_statistic(query, serie, metric, lag)
+            if result[metric] is None:
+                return None
+    return {metric: result[metric] for metric in metrics}
+
+
+@app.route("/api/timeseries/stats", methods=["GET"])
+@_conditional_response
+@_cached_response
+@_with_series("filename")
+def get_stats(query, serie):
+    """
+    Get several statistics of the timeseries for a specific filename, category
+    and time interval in one response, reading the series only once.
+
+    The `metrics` parameter selects the statistics, by default the mean,
+    median, variance and standard deviation.
+
+    Returns:
+        JSON response with the statistics or error message.
+    """
+    args = request.args
+    metrics = parse_choices(
+        args.get("metrics"),
+        "metrics",
+        tuple(_BASIC_STATISTICS) + tuple(_SERIES_STATISTICS),
+        default=tuple(_BASIC_STATISTICS),
+    )
+    lag = parse_positive_int(args.get("lag"), "lag", default=1)
+    result = _calculate_statistics(query, serie, metrics, lag)
+    if result is None:
         logger.warning(
-            "No valid timeseries data provided for autocorrelation calculation for filename '%s' and category '%s' and time interval '%s - %s'",
-            filename,
-            category,
-            start,
-            end,
+            "No valid timeseries data provided for statistics calculation for %s",
+            query,
         )
         return _create_response({"error": "No valid timeseries data provided"}, 400)
-    logger.info(
-        "Successfully calculated autocorrelation for provided timeseries data for filename '%s' and category '%s' and time interval '%s - %s'",
-        filename,
-        category,
-        start,
-        end,
-    )
+    logger.debug("Successfully calculated statistics for %s", query)
+    return _create_response(result, 200)
+
 
-    return _create_response({"autocorrelation": acf_value}, 200)
+@app.route("/api/timeseries/autocorrelation", methods=["GET"])
+@_conditional_response
+@_cached_response
+@_with_series("filename")
+def get_autocorrelation(query, serie):
+    """
+    Get the autocorrelation of the timeseries for a specific filename, category and time interval.
+    Returns:
+        JSON response with the autocorrelation value or error message.
+    """
+    lag = parse_positive_int(request.args.get("lag"), "lag", default=1)
+    acf_value = _get_series_statistic(query, serie, "autocorrelation", lag)
+    return _metric_response("autocorrelation", acf_value, query)
 
 
 @app.route("/api/timeseries/coefficient_of_variation", methods=["GET"])
-def get_coefficient_of_variation():
+@_conditional_response
+@_cached_response
+@_with_series("filename")
+def get_coefficient_of_variation(query, serie):
     """
     Get the coefficient of variation of the timeseries for a specific filename, category and time interval.
 
     Returns:
         JSON response with the coefficient of variation value or error message.
     """
-    token, _ = _get_session_token()
-    filename = request.args.get("filename")
-    category = request.args.get("category")
-    start = request.args.get("start")
-    end = request.args.get("end")
-    try:
-        data = timeseries_manager.get_timeseries(
-            token=token,
-            filename=filename,
-            category=category,
-            start=start,
-            end=end,
-        )
-        serie = metric_service.extract_series_from_dict(data, category, filename)
-        cv = metric_service.calculate_coefficient_of_variation(serie)
-    except (KeyError, ValueError) as e:
-        logger.error(
-            "Error calculating coefficient of variation for filename '%s' and category '%s' and time interval '%s - %s': %s",
-            filename,
-            category,
-            start,
-            end,
-            e,
-        )
-        return _create_response({"error": str(e)}, 400)
-    if cv is None:
-        logger.warning(
-            "No valid timeseries data provided for coefficient of variation calculation for filename '%s' and category '%s' and time interval '%s - %s'",
-            filename,
-            category,
-            start,
-            end,
-        )
-        return _create_response({"error": "No valid timeseries data provided"}, 400)
-    logger.info(
-        "Successfully calculated coefficient of variation for provided timeseries data for filename '%s' and category '%s' and time interval '%s - %s'",
-        filename,
-        category,
-        start,
-        end,
-    )
-
-    return _create_response({"coefficient_of_variation": cv}, 200)
+    cv = _get_series_statistic(query, serie, "coefficient_of_variation")
+    return _metric_response("coefficient_of_variation", cv, query)
 
 
 @app.route("/api/timeseries/iqr", methods=["GET"])
-def get_iqr():
+@_conditional_response
+@_cached_response
+@_with_series("filename")
+def get_iqr(query, serie):
     """
     Get the interquartile range (IQR) of the timeseries for a specific filename, category and time interval.
 
     Returns:
         JSON response with the IQR value or error message.
     """
-    token, _ = _get_session_token()
-    filename = request.args.get("filename")
-    category = request.args.get("category")
-    start = request.args.get("start")
-    end = request.args.get("end")
-    try:
-        data = timeseries_manager.get_timeseries(
-            token=token,
-            filename=filename,
-            category=category,
-            start=start,
-            end=end,
-        )
-        serie = metric_service.extract_series_from_dict(data, category, filename)
-        iqr = metric_service.calculate_iqr(serie)
-    except (KeyError, ValueError) as e:
-        logger.error(
-            "Error calculating IQR for filename '%s' and category '%s' and time interval '%s - %s': %s",
-            filename,
-            category,
-            start,
-            end,
-            e,
-        )
-        return _create_response({"error": str(e)}, 400)
-    if iqr is None:
-        logger.warning(
-            "No valid timeseries data provided for IQR calculation for filename '%s' and category '%s' and time interval '%s - %s'",
-            filename,
-            category,
-            start,
-            end,
-        )
-        return _create_response({"error": "No valid timeseries data provided"}, 400)
-    logger.info(
-        "Successfully calculated IQR for provided timeseries data for filename '%s' and category '%s' and time interval '%s - %s'",
-        filename,
-        category,
-        start,
-        end,
-    )
-
-    return _create_response({"iqr": iqr}, 200)
+    return _metric_response("iqr", _get_series_statistic(query, serie, "iqr"), query)
 
 
 @app.route("/api/timeseries/pearson_correlation", methods=["GET"])
-def get_pearson_correlation():
+@_conditional_response
+@_cached_response
+@_with_series("filename1", "filename2", parsed=True)
+def get_pearson_correlation(query, serie1, serie2):
     """
     Get the Pearson correlation between two timeseries for specific filenames, category and time interval.
 
     Returns:
         JSON response with the Pearson correlation value or error message.
     """
-    token, _ = _get_session_token()
-    filename1 = request.args.get("filename1")
-    filename2 = request.args.get("filename2")
-    category = request.args.get("category")
-    start = request.args.get("start")
-    end = request.args.get("end")
-    tolerance = request.args.get("tolerance")
-
-    logger.info(
-        f"Pearson correlation request: {filename1} vs {filename2}, category={category}"
+    correlation = metric_service.calculate_pearson_correlation(
+        serie1, serie2, query.tolerance
     )
+    return _metric_response("pearson_correlation", correlation, query)
 
-    try:
-        data1 = timeseries_manager.get_timeseries(
-            token=token,
-            filename=filename1,
-            category=category,
-            start=start,
-            end=end,
-        )
-        logger.info(
-            f"Pearson: data1 keys count = {len(data1) if isinstance(data1, dict) else 'N/A'}"
-        )
-        serie1 = metric_service.extract_series_from_dict(data1, category, filename1)
-        data2 = timeseries_manager.get_timeseries(
-            token=token,
-            filename=filename2,
-            category=category,
-            start=start,
-            end=end,
-        )
-        logger.info(
-            f"Pearson: data2 keys count = {len(data2) if isinstance(data2, dict) else 'N/A'}"
-        )
-        serie2 = metric_service.extract_series_from_dict(data2, category, filename2)
 
-        logger.info(f"Pearson: serie1_len={len(serie1)}, serie2_len={len(serie2)}")
+@app.route("/api/timeseries/metrics", methods=["GET"])
+@_conditional_response
+@_cached_response
+@_with_series("filename1", "filename2", parsed=True)
+def get_comparison_metrics(query, serie1, serie2):
+    """
+    Get the Pearson correlation, cosine similarity, MAE and RMSE between two
+    timeseries in one response, aligning the series only once.
 
-        correlation = metric_service.calculate_pearson_correlation(
-            serie1, serie2, tolerance
-        )
-    except (KeyError, ValueError) as e:
-        logger.error(
-            "Error calculating Pearson correlation for filenames '%s' and '%s' in category '%s': %s",
-            filename1,
-            filename2,
-            category,
-            e,
-        )
-        return _create_response({"error": str(e)}, 400)
-    if correlation is None:
-        logger.warning(
-            "No valid timeseries data provided for Pearson correlation calculation for filenames '%s' and '%s' in category '%s'",
-            filename1,
-            filename2,
-            category,
-        )
-        return _create_response({"error": "No valid timeseries data provided"}, 400)
-    logger.info(
-        "Successfully calculated Pearson correlation for provided timeseries data for filenames '%s' and '%s' in category '%s': result=%s",
-        filename1,
-        filename2,
-        category,
-        correlation,
+    The `metrics` parameter selects the metrics, by default all of them.
+
+    Returns:
+        JSON response with the metric values or error message.
+    """
+    selected = parse_choices(
+        request.args.get("metrics"),
+        "metrics",
+        tuple(metric_service.COMPARISON_METRICS),
+        default=tuple(metric_service.COMPARISON_METRICS),
+    )
+    metrics = metric_service.calculate_comparison_metrics(
+        serie1, serie2, query.tolerance, selected
     )
-    return _create_response({"pearson_correlation": correlation}, 200)
+    logger.debug("Successfully calculated comparison metrics for %s", query)
+    return _create_response(metrics, 200)
 
 
 @app.route("/api/timeseries/cosine_similarity", methods=["GET"])
-def get_cosine_similarity():
+@_conditional_response
+@_cached_response
+@_with_series("filename1", "filename2", parsed=True)
+def get_cosine_similarity(query, serie1, serie2):
     """
     Get the cosine similarity between two timeseries for specific filenames, category and time interval.
 
     Returns:
         JSON response with the cosine similarity value or error message.
     """
-    token, _ = _get_session_token()
-    filename1 = request.args.get("filename1")
-    filename2 = request.args.get("filename2")
-    category = request.args.get("category")
-    start = request.args.get("start")
-    end = request.args.get("end")
-    tolerance = request.args.get("tolerance")
-
     try:
-        # Pobierz dane dla obu plików
-        data1 = timeseries_manager.get_timeseries(
-            token=token,
-            filename=filename1,
-            category=category,
-            start=start,
-            end=end,
-        )
-        serie1 = metric_service.extract_series_from_dict(data1, category, filename1)
-
-        data2 = timeseries_manager.get_timeseries(
-            token=token,
-            filename=filename2,
-            category=category,
-            start=start,
-            end=end,
-        )
-        serie2 = metric_service.extract_series_from_dict(data2, category, filename2)
-
-        # Oblicz cosine similarity
         similarity = metric_service.calculate_cosine_similarity(
-            serie1, serie2, tolerance
-        )
-
-    except (KeyError, ValueError) as e:
-        logger.error(
-            "Error calculating cosine similarity for filenames '%s' and '%s' in category '%s': %s",
-            filename1,
-            filename2,
-            category,
-            e,
+            serie1, serie2, query.tolerance
         )
-        return _create_response({"error": str(e)}, 400)
+    except (KeyError, ValueError):
+        raise
     except Exception as e:
         logger.error("Unexpected error calculating cosine similarity: %s", e)
         return _create_response({"error": "Unexpected error occurred"}, 500)
-
-    if similarity is None:
-        logger.warning(
-            "No valid timeseries data provided for cosine similarity calculation for filenames '%s' and '%s' in category '%s'",
-            filename1,
-            filename2,
-            category,
-        )
-        return _create_response({"error": "No valid timeseries data provided"}, 400)
-
-    logger.info(
-        "Successfully calculated cosine similarity for provided timeseries data for filenames '%s' and '%s' in category '%s'",
-        filename1,
-        filename2,
-        category,
-    )
-    return _create_response({"cosine_similarity": similarity}, 200)
+    return _metric_response("cosine_similarity", similarity, query)
 
 
 @app.route("/api/timeseries/mae", methods=["GET"])
-def get_mae():
+@_conditional_response
+@_cached_response
+@_with_series("filename1", "filename2", parsed=True)
+def get_mae(query, serie1, serie2):
     """
     Calculate MAE (Mean Absolute Error) between two timeseries.
     """
-    token, _ = _get_session_token()
-    filename1 = request.args.get("filename1")
-    filename2 = request.args.get("filename2")
-    category = request.args.get("category")
-    start = request.args.get("start")
-    end = request.args.get("end")
-    tolerance = request.args.get("tolerance")
-
-    try:
-        data1 = timeseries_manager.get_timeseries(
-            token=token,
-            filename=filename1,
-            category=category,
-            start=start,
-            end=end,
-        )
-        serie1 = metric_service.extract_series_from_dict(data1, category, filename1)
-
-        data2 = timeseries_manager.get_timeseries(
-            token=token,
-            filename=filename2,
-            category=category,
-            start=start,
-            end=end,
-        )
-        serie2 = metric_service.extract_series_from_dict(data2, category, filename2)
-
-        mae = metric_service.calculate_mae(serie1, serie2, tolerance)
-
-    except (KeyError, ValueError) as e:
-        logger.error(
-            "Error calculating MAE for filenames '%s' and '%s' in category '%s': %s",
-            filename1,
-            filename2,
-            category,
-            e,
-        )
-        return _create_response({"error": str(e)}, 400)
-
-    if mae is None:
-        return _create_response({"error": "No valid timeseries data provided"}, 400)
-
-    logger.info(
-        "Successfully calculated MAE for files '%s' and '%s' in category '%s'",
-        filename1,
-        filename2,
-        category,
-    )
-
-    return _create_response({"mae": mae}, 200)
+    mae = metric_service.calculate_mae(serie1, serie2, query.tolerance)
+    return _metric_response("mae", mae, query)
 
 
 @app.route("/api/timeseries/rmse", methods=["GET"])
-def get_rmse():
+@_conditional_response
+@_cached_response
+@_with_series("filename1", "filename2", parsed=True)
+def get_rmse(query, serie1, serie2):
     """
     Calculate RMSE (Root Mean Squared Error) between two timeseries.
     """
-    token, _ = _get_session_token()
-    filename1 = request.args.get("filename1")
-    filename2 = request.args.get("filename2")
-    category = request.args.get("category")
-    start = request.args.get("start")
-    end = request.args.get("end")
-    tolerance = request.args.get("tolerance")
-
-    try:
-        data1 = timeseries_manager.get_timeseries(
-            token=token,
-            filename=filename1,
-            category=category,
-            start=start,
-            end=end,
-        )
-        serie1 = metric_service.extract_series_from_dict(data1, category, filename1)
-
-        data2 = timeseries_manager.get_timeseries(
-            token=token,
-            filename=filename2,
-            category=category,
-            start=start,
-            end=end,
-        )
-        serie2 = metric_service.extract_series_from_dict(data2, category, filename2)
-
-        rmse = metric_service.calculate_rmse(serie1, serie2, tolerance)
-
-    except (KeyError, ValueError) as e:
-        logger.error(
-            "Error calculating RMSE for filenames '%s' and '%s' in category '%s': %s",
-            filename1,
-            filename2,
-            category,
-            e,
-        )
-        return _create_response({"error": str(e)}, 400)
-
-    if rmse is None:
-        return _create_response({"error": "No valid timeseries data provided"}, 400)
-
-    logger.info(
-        "Successfully calculated RMSE for files '%s' and '%s' in category '%s'",
-        filename1,
-        filename2,
-        category,
-    )
-
-    return _create_response({"rmse": rmse}, 200)
+    rmse = metric_service.calculate_rmse(serie1, serie2, query.tolerance)
+    return _metric_response("rmse", rmse, query)
 
 
 @app.route("/api/timeseries/difference", methods=["GET"])
-def get_difference():
-    token, _ = _get_session_token()
-    filename1 = request.args.get("filename1")
-    filename2 = request.args.get("filename2")
-    category = request.args.get("category")
-    tolerance = request.args.get("tolerance")
-
-    try:
-        data1 = timeseries_manager.get_timeseries(
-            token=token,
-            filename=filename1,
-            category=category,
-        )
-        serie1 = metric_service.extract_series_from_dict(data1, category, filename1)
-
-        data2 = timeseries_manager.get_timeseries(
-            token=token,
-            filename=filename2,
-            category=category,
-        )
-        serie2 = metric_service.extract_series_from_dict(data2, category, filename2)
-
-        difference_series = metric_service.calculate_difference(
-            serie1, serie2, tolerance
-        )
-
-    except Exception as e:
-        return _create_response({"error": str(e)}, 400)
-
+@_conditional_response
+@_with_series(
+    "filename1", "filename2", filter_dates=False, errors=(Exception,), parsed=True
+)
+def get_difference(query, serie1, serie2):
+    difference_series = metric_service.calculate_difference(
+        serie1, serie2, query.tolerance
+    )
     difference_series = _apply_timezone_conversion(difference_series, "difference")
     return _create_response({"difference": difference_series}, 200)
 
 
 @app.route("/api/timeseries/rolling_mean", methods=["GET"])
-def get_rolling_mean():
-    token, _ = _get_session_token()
-    filename = request.args.get("filename")
-    category = request.args.get("category")
+@_conditional_response
+@_with_series("filename", filter_dates=False, errors=(Exception,), parsed=True)
+def get_rolling_mean(query, serie):
     window_size = request.args.get("window_size", "1d")
-
-    try:
-        data = timeseries_manager.get_timeseries(
-            token=token,
-            filename=filename,
-            category=category,
-        )
-        serie = metric_service.extract_series_from_dict(data, category, filename)
-
-        rolling_mean_series = metric_service.calculate_rolling_mean(
-            serie,
-            window_size,
-        )
-
-    except Exception as e:
-        return _create_response({"error": str(e)}, 400)
-
+    rolling_mean_series = metric_service.calculate_rolling_mean(serie, window_size)
     rolling_mean_series = _apply_timezone_conversion(
         rolling_mean_series,
         "rolling_mean",
@@ -1047,89 +1018,58 @@ def get_rolling_mean():
 
 
 @app.route("/api/timeseries/dtw", methods=["GET"])
-def get_dtw():
-    token, _ = _get_session_token()
-    filename1 = request.args.get("filename1")
-    filename2 = request.args.get("filename2")
-    category = request.args.get("category")
-    start = request.args.get("start")
-    end = request.args.get("end")
-
-    logger.info(f"DTW request: {filename1} vs {filename2}, category={category}")
-
-    try:
-        data1 = timeseries_manager.get_timeseries(
-            token=token,
-            filename=filename1,
-            category=category,
-            start=start,
-            end=end,
-        )
-        series1 = metric_service.extract_series_from_dict(data1, category, filename1)
-        data2 = timeseries_manager.get_timeseries(
-            token=token,
-            filename=filename2,
-            category=category,
-            start=start,
-            end=end,
-        )
-        series2 = metric_service.extract_series_from_dict(data2, category, filename2)
-
-        logger.info(f"DTW: series1_len={len(series1)}, series2_len={len(series2)}")
-
-        dtw_distance = metric_service.calculate_dtw(series1, series2)
-        logger.info(f"DTW result: {dtw_distance}")
-
-    except Exception as e:
-        logger.error(f"DTW error: {e}")
-        return _create_response({"error": str(e)}, 400)
-
+@_conditional_response
+@_cached_response
+@_with_series("filename1", "filename2", errors=(Exception,), parsed=True)
+def get_dtw(query, series1, series2):
+    radius = parse_positive_int(request.args.get("radius"), "radius")
+    dtw_distance = metric_service.calculate_dtw(series1, series2, radius)
+    logger.debug("DTW result: %s", dtw_distance)
     return _create_response({"dtw_distance": dtw_distance}, 200)
 
 
 @app.route("/api/timeseries/euclidean_distance", methods=["GET"])
-def get_euclidean_distance():
-    token, _ = _get_session_token()
-    filename1 = request.args.get("filename1")
-    filename2 = request.args.get("filename2")
-    category = request.args.get("category")
-    tolerance = request.args.get("tolerance")
-
-    logger.info(
-        f"Euclidean distance request: {filename1} vs {filename2}, category={category}"
+@_conditional_response
+@_cached_response
+@_with_series(
+    "filename1", "filename2", filter_dates=False, errors=(Exception,), parsed=True
+)
+def get_euclidean_distance(query, series1, series2):
+    euclidean_distances = metric_service.calculate_euclidean_distance(
+        series1,
+        series2,
+        query.tolerance,
     )
+    logger.debug("Euclidean result: %s", euclidean_distances)
+    return _create_response({"euclidean_distance": euclidean_distances}, 200)
 
-    try:
-        data1 = timeseries_manager.get_timeseries(
-            token=token,
-            filename=filename1,
-            category=category,
-        )
-        series1 = metric_service.extract_series_from_dict(data1, category, filename1)
-
-        data2 = timeseries_manager.get_timeseries(
-            token=token,
-            filename=filename2,
-            category=category,
-        )
-        series2 = metric_service.extract_series_from_dict(data2, category, filename2)
 
-        logger.info(
-            f"Euclidean: series1_len={len(series1)}, series2_len={len(series2)}"
-        )
+def _strip_upload_keys(values):
+    """
+    Normalize category and filename by trimming whitespace to handle CSV/JSON
+    inconsistencies.
 
-        euclidean_distances = metric_service.calculate_euclidean_distance(
-            series1,
-            series2,
-            tolerance,
-        )
-        logger.info(f"Euclidean result: {euclidean_distances}")
+    Uploads are usually clean already, in which case the parsed dicts are
+    reused instead of copying the whole payload a second time.
+    """
 
-    except Exception as e:
-        logger.error(f"Euclidean error: {e}")
-        return _create_response({"error": str(e)}, 400)
+    def is_stripped(keys):
+        return all(key == key.strip() for key in keys)
 
-    return _create_response({"euclidean_distance": euclidean_distances}, 200)
+    if is_stripped(values) and all(
+        is_stripped(category_data)
+        for category_data in values.values()
+        if isinstance(category_data, dict)
+    ):
+        return values
+    return {
+        category.strip(): (
+            {filename.strip(): value for filename, value in category_data.items()}
+            if isinstance(category_data, dict)
+            else category_data
+        )
+        for category, category_data in values.items()
+    }
 
 
 @app.route("/api/upload-timeseries", methods=["POST"])
@@ -1141,7 +1081,9 @@ def add_timeseries():
         JSON response indicating success or failure.
     """
     token, _ = _get_session_token()
-    data = request.get_json()
+    # Parsed once without caching, so the raw body is not kept next to the dict.
+    # Malformed bodies give None and get the JSON error below
+    data = request.get_json(cache=False, silent=True)
     if not isinstance(data, dict):
         logger.error(
             "Invalid data format: Expected a JSON object with keys as identifiers"
@@ -1150,42 +1092,41 @@ def add_timeseries():
             {"error": "Expected a JSON object with keys as identifiers"},
             400,
         )
-    try:
-        current_timeseries = timeseries_manager.get_timeseries(token=token)
-        for time, values in data.items():
-            if not isinstance(values, dict):
-                logger.error(
-                    "Invalid data format for time '%s': Expected a dictionary",
-                    time,
-                )
-                return _create_response(
-                    {
-                        "error": f"Invalid data format for time '{time}': Expected a dictionary"
-                    },
-                    400,
-                )
+    errors = {}
+    for time, values in data.items():
+        if not isinstance(values, dict):
+            errors[time] = (
+                f"Invalid data format for time '{time}': Expected a dictionary"
+            )
+            continue
+        if errors:
+            continue  # the upload is rejected, only the remaining errors matter
+
+        # The parsed body is normalized in place rather than copied into a
+        # second mapping of every timestamp; replacing the value of an
+        # existing key is safe while iterating
+        stripped = _strip_upload_keys(values)
+        if stripped is not values:
+            data[time] = stripped
+
+    if errors:
+        logger.error("Invalid data format for %d timestamps", len(errors))
+        return _create_response(
+            {"error": next(iter(errors.values())), "errors": errors}, 400
+        )
 
-            # Normalize category and filename by trimming whitespace to handle CSV/JSON inconsistencies
-            normalized_values = {}
-            for category, category_data in values.items():
-                if isinstance(category_data, dict):
-                    normalized_category_key = category.strip()
-                    normalized_category_data = {}
-                    for filename, file_value in category_data.items():
-                        normalized_filename = filename.strip()
-                        normalized_category_data[normalized_filename] = file_value
-                    normalized_values[normalized_category_key] = (
-                        normalized_category_data
-                    )
-                else:
-                    normalized_values[category.strip()] = category_data
-
-            timeseries_manager.add_timeseries(token, time, normalized_values)
+    # All timestamps are validated first and stored in one transaction,
+    # so a rejected upload leaves the session untouched
+    try:
+        stored = timeseries_manager.add_timeseries_bulk(token, data)
+    except InvalidTimeseriesError as e:
+        logger.error("Error adding timeseries: %d invalid timestamps", len(e.errors))
+        return _create_response({"error": str(e), "errors": e.errors}, 400)
     except ValueError as e:
-        logger.error("Error adding timeseries for time '%s': %s", time, e)
-        if current_timeseries:
-            timeseries_manager.add_timeseries(token, current_timeseries)
+        logger.error("Error adding timeseries: %s", e)
         return _create_response({"error": str(e)}, 400)
+    if not stored:
+        return _create_response({"error": "Failed to store timeseries data"}, 500)
     logger.info("All timeseries data uploaded successfully")
     return _create_response({"status": "Data uploaded"}, 201)
 
@@ -1221,9 +1162,9 @@ def api_validate_plugin_code():
     """
 
     token, _ = _get_session_token()
-    data = request.get_json()
+    data = request.get_json(silent=True)
 
-    if not data or "code" not in data:
+    if not isinstance(data, dict) or "code" not in data:
         return _create_response({"error": "No code provided"}, 400)
 
     result = validate_plugin_code(data["code"])
@@ -1231,70 +1172,58 @@ def api_validate_plugin_code():
     return _create_response(result, 200, token=token)
 
 
-def _validate_plugin_request(data):
-    """Validate plugin execution request data."""
-    if not data:
-        return {"error": "No data provided"}
-
-    required_fields = ["code", "category", "filenames"]
-    for field in required_fields:
-        if field not in data:
-            return {"error": f"Missing required field: {field}"}
+def _fetch_series_data(filenames, category, start, end, token):
+    """Fetch all series data for given filenames in a single session read."""
+    try:
+        series = timeseries_manager.get_series_many(
+            token,
+            [
+                dict(filename=filename, category=category, start=start, end=end)
+                for filename in filenames
+            ],
+            version=_get_request_data_version(),
+        )
+    except Exception as e:
+        logger.error("Error extracting series data for files %s: %s", filenames, e)
+        raise RuntimeError(f"Error extracting series data: {e}") from e
+    return dict(zip(filenames, series))
 
-    if not data["filenames"] or len(data["filenames"]) < 2:
-        return {"error": "At least 2 filenames required"}
 
-    return None
+def _execute_builtin_plugin(metric, plugin_request, series_data):
+    """
+    Compute a plugin recognized as a built-in comparison metric in-process.
 
+    Each series is parsed once and every pair is aligned from the parsed
+    series, instead of sending the pairs to a sandbox.
 
-def _fetch_series_data(filenames, category, start, end, token):
-    """Fetch all series data for given filenames."""
-    series_data = {}
-    for filename in filenames:
-        try:
-            raw_data = timeseries_manager.get_timeseries(
+    :param metric: Name of the metric in metric_service.COMPARISON_METRICS
+    :param plugin_request: The PluginExecuteRequest
+    :param series_data: Series keyed by filename
+    :return: Nested results map, or None if a pair cannot be aligned, which
+        the plugin reports as an error; those are left to the sandbox
+    """
+    compute = metric_service.COMPARISON_METRICS[metric]
+    parsed = {
+        filename: _parse_series(
+            dict(
                 filename=filename,
-                category=category,
-                start=start,
-                end=end,
-                token=token,
-            )
-            series_data[filename] = metric_service.extract_series_from_dict(
-                raw_data, category, filename
-            )
-        except Exception as e:
-            logger.error("Error extracting series data for file '%s': %s", filename, e)
-            raise RuntimeError(
-                f"Error extracting series data for file '{filename}': {e}"
-            ) from e
-    return series_data
-
-
-def _build_execution_pairs(filenames, series_data):
-    """Build pairs for execution from filenames and series data."""
-    pairs = []
-    for file1 in filenames:
-        for file2 in filenames:
-            pairs.append(
-                {
-                    "series1": series_data[file1],
-                    "series2": series_data[file2],
-                    "key": f"{file1}|{file2}",
-                }
-            )
-    return pairs
-
-
-def _transform_results_to_map(execution_results):
-    """Transform flat execution results to nested structure."""
+                category=plugin_request.category,
+                start=plugin_request.start,
+                end=plugin_request.end,
+            ),
+            series,
+        )
+        for filename, series in series_data.items()
+    }
     results_map = {}
-    for item in execution_results:
-        key = item.get("key", "")
-        if "|" in key:
-            f1, f2 = key.split("|", 1)
-            if f1 not in results_map:
-                results_map[f1] = {}
-            results_map[f1][f2] = item.get("result") if "result" in item else None
+    for file1 in plugin_request.filenames:
+        row = results_map.setdefault(file1, {})
+        for file2 in plugin_request.filenames:
+            aligned = metric_service.align_series(parsed[file1], parsed[file2])
+            if aligned is None:
+                return None
+            value = compute(aligned[1], aligned[2])
+            row[file2] = None if math.isnan(value) else value
     return results_map
 
 
@@ -1306,27 +1235,36 @@ def api_execute_plugin():
     from services.sandboxed_executor import get_executor
 
     token, _ = _get_session_token()
-    data = request.get_json()
-
-    # Validate request
-    validation_error = _validate_plugin_request(data)
-    if validation_error:
-        return _create_response(validation_error, 400)
+    try:
+        plugin_request = PluginExecuteRequest.from_json(request.get_json(silent=True))
+    except ValidationError as e:
+        return _create_response({"error": str(e)}, 400)
 
     try:
         # Fetch all series data
         series_data = _fetch_series_data(
-            data["filenames"],
-            data["category"],
-            data.get("start"),
-            data.get("end"),
+            plugin_request.filenames,
+            plugin_request.category,
+            plugin_request.start,
+            plugin_request.end,
             token,
         )
 
+        metric = builtin_plugin_metric(plugin_request.code)
+        if metric is not None:
+            results_map = _execute_builtin_plugin(metric, plugin_request, series_data)
+            if results_map is not None:
+                logger.info(
+                    "Built-in %s plugin computed for %d files",
+                    metric,
+                    len(plugin_request.filenames),
+                )
+                return _create_response({"results": results_map}, 200, token=token)
+
         # Build pairs and execute
-        pairs = _build_execution_pairs(data["filenames"], series_data)
+        pairs = build_execution_pairs(plugin_request.filenames)
         executor = get_executor()
-        result = executor.execute(data["code"], pairs)
+        result = executor.execute(plugin_request.code, pairs, series_data)
 
         # Check for top-level execution errors
         if "error" in result:
@@ -1341,7 +1279,7 @@ def api_execute_plugin():
             return _create_response({"error": errors[0]}, 400)
 
         # Transform results to nested structure
-        results_map = _transform_results_to_map(execution_results)
+        results_map = execution_results_to_map(pairs, execution_results)
         logger.info("Plugin executed successfully for %d pairs", len(pairs))
         return _create_response({"results": results_map}, 200, token=token)
 
@@ -1351,4 +1289,11 @@ def api_execute_plugin():
 
 
 if __name__ == "__main__":
+    # The Werkzeug server handles requests one worker process at a time, so it
+    # is only started on explicit request for local debugging
+    if os.environ.get("FLASK_DEV") != "1":
+        sys.exit(
+            "Run the API with `gunicorn -c gunicorn_config.py main:app`, "
+            "or set FLASK_DEV=1 to start the development server"
+        )
     app.run(host="0.0.0.0", port=5000)
@@ -1,12 +1,18 @@
+import datetime
+import functools
 import numpy as np
 import pandas as pd
-from scipy.stats import pearsonr
-from statsmodels.tsa.stattools import acf
 import logging
 from fastdtw import fastdtw
+from utils.cache_utils import TTLCache
 
 logger = logging.getLogger("FlaskAPI")
 
+_FLOAT_TYPE = frozenset({float})
+
+# A series parsed by parse_series: its time index and float values
+ParsedSeries = tuple[pd.DatetimeIndex, np.ndarray]
+
 
 def extract_series_from_dict(data: dict, category: str, filename: str) -> dict:
     """Extracts a time series from a nested dictionary structure.
@@ -28,227 +34,523 @@ def extract_series_from_dict(data: dict, category: str, filename: str) -> dict:
             "Invalid data structure for: " + str(category) + " " + str(filename)
         )
 
-    series = {}
-    extracted_count = 0
-    skipped_count = 0
-
     # Normalize filename and category by trimming whitespace to handle CSV/JSON inconsistencies
     filename_normalized = filename.strip()
     category_normalized = category.strip()
 
-    for key in data.keys():
-        # Error handling
-        if not isinstance(data[key], dict):
+    # One pass over the items, with a single lookup per nesting level
+    keys, values = [], []
+    for key, entry in data.items():
+        if not isinstance(entry, dict):
             raise ValueError(
                 f"Invalid data structure at key '{key}': expected a dictionary"
             )
-
-        if category_normalized not in data[key] or not isinstance(
-            data[key][category_normalized], dict
-        ):
-            skipped_count += 1
+        files = entry.get(category_normalized)
+        if not isinstance(files, dict):
             continue  # Category not found in this timestamp - skip silently
-
-        if filename_normalized not in data[key][category_normalized] or not isinstance(
-            data[key][category_normalized][filename_normalized], (int, float)
-        ):
-            skipped_count += 1
+        value = files.get(filename_normalized)
+        if not isinstance(value, (int, float)):
             continue  # not good solution, but gotta find out what to do when there's missing data for some timestamps
+        keys.append(key)
+        values.append(value)
+
+    # Values are converted to float in one C loop, unless they already are
+    if not set(map(type, values)) <= _FLOAT_TYPE:
+        values = np.fromiter(values, dtype=np.float64, count=len(values)).tolist()
+    series = dict(zip(keys, values))
+    extracted_count = len(series)
+    skipped_count = len(data) - extracted_count
+
+    logger.debug(
+        "extract_series_from_dict: filename='%s', category='%s' → extracted=%d, skipped=%d, series_len=%d",
+        filename,
+        category,
+        extracted_count,
+        skipped_count,
+        len(series),
+    )
 
-        if not isinstance(
-            data[key][category_normalized][filename_normalized], (int, float)
-        ):
-            raise ValueError(
-                f"Unsupported data type for key '{key}': {type(data[key][category_normalized][filename_normalized])}"
-            )
+    return series
+
+
+def _to_datetime_index(keys, count: int) -> pd.DatetimeIndex:
+    """
+    Parses timestamps into a DatetimeIndex named "time".
+
+    The keys are copied straight into the object array pandas parses, instead
+    of into a list first. Strings go through pandas' format inference and its
+    C parser; datetime keys are converted without parsing.
+    """
+    keys = np.fromiter(keys, dtype=object, count=count)
+    return pd.to_datetime(keys, cache=False).rename("time")
+
+
+def parse_series(series: dict | ParsedSeries) -> ParsedSeries:
+    """
+    Parses a {timestamp: value} series into its time index and float values,
+    sorted by time.
+
+    The functions aligning or windowing series accept the result in place of
+    the dict, so a series used by several of them is parsed only once. An
+    already parsed series is returned as it is.
+
+    Args:
+        series (dict | ParsedSeries): Time series.
+
+    Returns:
+        ParsedSeries: DatetimeIndex named "time" and float64 values.
+    """
+    if isinstance(series, tuple):
+        return series
+    values = series.values()
+    # Floats, as the TimeSeriesManager stores them, are copied in directly
+    # instead of being converted from a list of objects
+    if series and set(map(type, values)) <= _FLOAT_TYPE:
+        values = np.fromiter(values, dtype=np.float64, count=len(series))
+    else:
+        values = np.asarray(list(values), dtype=np.float64)
+    index = _to_datetime_index(series.keys(), len(series))
+    if not index.is_monotonic_increasing:
+        order = np.argsort(index.asi8, kind="stable")
+        index, values = index[order], values[order]
+    return index, values
+
+
+def _series_length(series) -> int | None:
+    """Number of points of a series dict or ParsedSeries, None for other values."""
+    if isinstance(series, dict):
+        return len(series)
+    if isinstance(series, tuple):
+        return len(series[1])
+    return None
 
-        # extracting the value and converting it to float
-        try:
-            series[key] = float(data[key][category_normalized][filename_normalized])
-            extracted_count += 1
-        except (ValueError, TypeError) as exc:
-            raise ValueError(
-                f"Invalid value for key '{key}': {data[key][category_normalized][filename_normalized]}"
-            ) from exc
 
-    logger.info(
-        f"extract_series_from_dict: filename='{filename}', category='{category}' → extracted={extracted_count}, skipped={skipped_count}, series_len={len(series)}"
+def _is_empty(series) -> bool:
+    """Whether a series has no points; other values are empty if falsy."""
+    length = _series_length(series)
+    return not series if length is None else length == 0
+
+
+def _unique_timestamps(series: ParsedSeries) -> ParsedSeries:
+    """Keeps the first value of duplicated timestamps of a parsed series."""
+    index, values = series
+    if not index.is_unique:
+        keep = ~index.duplicated(keep="first")
+        index, values = index[keep], values[keep]
+    return index, values
+
+
+def _nearest_within(
+    left: np.ndarray, right: np.ndarray, tolerance_ns: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Matches every sorted left timestamp (int64 nanoseconds) with the nearest
+    sorted, unique right timestamp, as merge_asof(direction="nearest") does:
+    ties go to the earlier right timestamp.
+
+    Both neighbours are found with one binary search per side, in C, without
+    building the merged frame.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Mask of the left timestamps matched
+        within tolerance and the position of their nearest right timestamp.
+    """
+    if len(right) == 0:
+        return np.zeros(len(left), dtype=bool), np.zeros(len(left), dtype=np.intp)
+    after = np.searchsorted(right, left, side="left")
+    before = np.searchsorted(right, left, side="right") - 1
+    before_gap = np.where(
+        before >= 0, left - right[np.maximum(before, 0)], np.iinfo(np.int64).max
     )
+    after_gap = np.where(
+        after < len(right),
+        right[np.minimum(after, len(right) - 1)] - left,
+        np.iinfo(np.int64).max,
+    )
+    use_before = before_gap <= after_gap
+    nearest = np.where(use_before, before, after)
+    gap = np.where(use_before, before_gap, after_gap)
+    return gap <= tolerance_ns, nearest
 
-    return series
+
+# Alignments of parsed series, keyed by the identity of both series and the
+# tolerance, so that the metrics of one pair share a single alignment. Parsed
+# series are never modified, and are kept in the entry so that their ids
+# cannot be reused while it exists.
+_alignment_cache = TTLCache(maxsize=32, ttl=900)
+
+
+@functools.lru_cache(maxsize=128)
+def _parse_tolerance(tolerance: str | pd.Timedelta) -> pd.Timedelta:
+    """Parses a tolerance once; requests repeat the same few spellings."""
+    return pd.Timedelta(tolerance)
+
+
+def align_series(
+    series1: dict | ParsedSeries,
+    series2: dict | ParsedSeries,
+    tolerance: str | pd.Timedelta | None = None,
+) -> tuple[pd.DatetimeIndex, np.ndarray, np.ndarray] | None:
+    """
+    Aligns two series based on timestamp with tolerance, as numpy arrays.
+
+    Each timestamp of the first series is matched with the nearest one of the
+    second series within the tolerance; pairs with a missing value are left
+    out. Passing the same series twice aligns it with itself without the
+    search, every timestamp matching exactly.
+
+    The alignment of two parsed series is cached, so MAE, RMSE, Pearson,
+    difference and Euclidean distance of the same pair align it once. The
+    returned arrays are shared and must not be modified.
+
+    Args:
+        series1 (dict | ParsedSeries): First time series.
+        series2 (dict | ParsedSeries): Second time series.
+        tolerance (str | pd.Timedelta | None): Optional tolerance for aligning
+            timestamps. If None, the larger median sampling interval of the series.
+
+    Returns:
+        tuple | None: Matched timestamps of the first series with the values of
+        both series at them, or None if no tolerance can be derived because
+        neither series has two points.
+    """
+    if _series_length(series1) is None or _series_length(series2) is None:
+        raise ValueError("Inputs must be dictionaries")
+    if tolerance is not None:
+        # Parsed before the cache lookup, so "1min" and "60s" share an entry
+        tolerance = _parse_tolerance(tolerance)
+
+    if not isinstance(series1, tuple) or not isinstance(series2, tuple):
+        return _align(series1, series2, tolerance)
+    key = (id(series1), id(series2), tolerance)
+    entry = _alignment_cache.get(key)
+    if entry is not None and entry[0] is series1 and entry[1] is series2:
+        return entry[2]
+    aligned = _align(series1, series2, tolerance)
+    _alignment_cache.set(key, (series1, series2, aligned))
+    return aligned
+
+
+def _align(
+    series1: dict | ParsedSeries,
+    series2: dict | ParsedSeries,
+    tolerance: pd.Timedelta | None,
+) -> tuple[pd.DatetimeIndex, np.ndarray, np.ndarray] | None:
+    """Computes the alignment of align_series, with a parsed tolerance."""
+    index1, values1 = _unique_timestamps(parse_series(series1))
+    if series2 is series1:
+        if tolerance is None and len(index1) <= 1:
+            return None
+        keep = ~np.isnan(values1)
+        return index1[keep], values1[keep], values1[keep]
+
+    index2, values2 = _unique_timestamps(parse_series(series2))
+
+    if tolerance is None:
+        deltas = []
+        if len(index1) > 1:
+            deltas.append((index1[1:] - index1[:-1]).median())
+        if len(index2) > 1:
+            deltas.append((index2[1:] - index2[:-1]).median())
+
+        if not deltas:
+            return None
+        tolerance_td = max(deltas)
+    else:
+        tolerance_td = tolerance
+
+    if tolerance_td < pd.Timedelta(0):
+        raise ValueError("tolerance must be positive")
+    if (index1.tz is None) != (index2.tz is None):
+        raise ValueError("Cannot align timezone-aware and timezone-naive timestamps")
+
+    matched, nearest = _nearest_within(
+        index1.as_unit("ns").asi8, index2.as_unit("ns").asi8, tolerance_td.value
+    )
+    x, y = values1[matched], values2[nearest[matched]]
+    keep = ~(np.isnan(x) | np.isnan(y))
+    return index1[matched][keep], x[keep], y[keep]
 
 
 def get_aligned_data(
-    series1: dict, series2: dict, tolerance: str | None = None
+    series1: dict | ParsedSeries,
+    series2: dict | ParsedSeries,
+    tolerance: str | None = None,
 ) -> pd.DataFrame:
     """
     Helper function to align two series based on timestamp with tolerance.
     Returns a DataFrame with columns ['value1', 'value2'] indexed by time.
 
+    See align_series, which computes the alignment.
+
     Args:
-        series1 (dict): First time series.
-        series2 (dict): Second time series.
+        series1 (dict | ParsedSeries): First time series.
+        series2 (dict | ParsedSeries): Second time series.
         tolerance (str | None): Optional tolerance for aligning timestamps.
 
     Returns:
         pd.DataFrame: Aligned data with columns ['value1', 'value2'] indexed by time.
     """
-    if not isinstance(series1, dict) or not isinstance(series2, dict):
-        raise ValueError("Inputs must be dictionaries")
+    aligned = align_series(series1, series2, tolerance)
+    if aligned is None:
+        return pd.DataFrame()
+    index, x, y = aligned
+    return pd.DataFrame({"value1": x, "value2": y}, index=index)
 
-    df1 = (
-        pd.DataFrame(
-            {
-                "time": pd.to_datetime(list(series1.keys())),
-                "value1": list(series1.values()),
-            }
-        )
-        .set_index("time")
-        .sort_index()
-    )
 
-    df2 = (
-        pd.DataFrame(
-            {
-                "time": pd.to_datetime(list(series2.keys())),
-                "value2": list(series2.values()),
-            }
-        )
-        .set_index("time")
-        .sort_index()
+# --- Metrics for single time series ---
+_NUMERIC_TYPES = frozenset({int, float})
+
+
+def _has_numeric_values(series: dict) -> bool:
+    """
+    Returns whether all values of a series are numbers.
+
+    The distinct value types are collected in C, so isinstance is only checked
+    once per type instead of once per value.
+    """
+    types = set(map(type, series.values()))
+    return types <= _NUMERIC_TYPES or all(
+        issubclass(value_type, (int, float)) for value_type in types
     )
 
-    df1 = df1[~df1.index.duplicated(keep="first")]
-    df2 = df2[~df2.index.duplicated(keep="first")]
 
-    if tolerance is None:
-        deltas = []
-        if len(df1.index) > 1:
-            deltas.append((df1.index[1:] - df1.index[:-1]).median())
-        if len(df2.index) > 1:
-            deltas.append((df2.index[1:] - df2.index[:-1]).median())
+def _numeric_values(series: dict) -> np.ndarray:
+    """
+    Returns the values of a series already checked to be numeric as a float
+    array, without building a pandas Series indexed by the timestamp strings.
+    """
+    return np.fromiter(series.values(), dtype=np.float64, count=len(series))
 
-        if not deltas:
-            return pd.DataFrame()
-        tolerance_td = max(deltas)
-    else:
-        tolerance_td = pd.Timedelta(tolerance)
 
-    df_merged = pd.merge_asof(
-        df1,
-        df2,
-        left_index=True,
-        right_index=True,
-        direction="nearest",
-        tolerance=tolerance_td,
-    ).dropna()
+def series_values(series: dict | np.ndarray) -> np.ndarray | None:
+    """
+    Returns the values of a single time series as a float array, validated
+    once so that several statistics of the series can be computed from it.
 
-    return df_merged
+    Args:
+        series (dict | np.ndarray): Timeseries, or values already returned by
+                                    this function.
+    Returns:
+        np.ndarray | None: Values, or None if the series is not a non-empty
+                           dictionary of numbers.
+    """
+    if isinstance(series, np.ndarray):
+        return series if series.size else None
+    if not isinstance(series, dict) or not series:
+        return None
+    if not _has_numeric_values(series):
+        return None
+    return _numeric_values(series)
 
 
-# --- Metrics for single time series ---
-def calculate_basic_statistics(series: dict) -> dict:
+def calculate_basic_statistics(series: dict | np.ndarray) -> dict:
     """
     Calculates basic descriptive statistics for a time series.
     Args:
-        series (dict): Timeseries
+        series (dict | np.ndarray): Timeseries, or its series_values
     Returns:
         dict: Dictionary with four statistics: mean, median, variance, std_dev.
     """
-    if not series or not isinstance(series, dict):
-        return {
-            "mean": np.nan,
-            "median": np.nan,
-            "variance": np.nan,
-            "std_dev": np.nan,
-            "error": "series must be a non-empty dictionary",
-        }
-    if not all(isinstance(v, (int, float)) for v in series.values()):
+    shared = series_values(series)
+    if shared is None:
+        if isinstance(series, dict) and series:
+            error = "series values must be numeric"
+        else:
+            error = "series must be a non-empty dictionary"
         return {
             "mean": np.nan,
             "median": np.nan,
             "variance": np.nan,
             "std_dev": np.nan,
-            "error": "series values must be numeric",
+            "error": error,
         }
-    try:
-        # Convert the dictionary to a pandas Series
-        series: pd.Series = pd.Series(series)
-    except (ValueError, TypeError) as e:
-        raise ValueError("could not convert series to pd.Series: " + str(e)) from e
+    values = shared
+    missing = np.isnan(values)
+    if missing.any():
+        values = values[~missing]  # skip missing values like pandas does
+    if values.size == 0:
+        return {"mean": np.nan, "median": np.nan, "variance": np.nan, "std_dev": np.nan}
+
+    # Single pass over the array shared by all four statistics
+    mean = values.mean()
+    deviations = values - mean
+    variance = deviations.dot(deviations) / values.size  # population variance
+    # An array converted from the dict or filtered above is a private copy, so
+    # the median may partition it in place instead of copying it again
+    median = np.median(values, overwrite_input=values is not series)
     return {
-        "mean": series.mean(),
-        "median": series.median(),
-        "variance": series.var(ddof=0),  # ddof=0 for population variance
-        "std_dev": series.std(ddof=0),  # ddof=0 for population standard deviation
+        "mean": float(mean),
+        "median": float(median),
+        "variance": float(variance),
+        "std_dev": float(np.sqrt(variance)),  # population standard deviation
     }
 
 
-def calculate_autocorrelation(series: dict) -> float:
+def calculate_autocorrelation(series: dict | np.ndarray, lag: int = 1) -> float:
     """
-    Calculates the autocorrelation function (ACF) for a time series.
+    Calculates the autocorrelation function (ACF) for a time series at a given lag.
+
+    Computed directly as the lagged dot product of the demeaned values over
+    their sum of squares, the same estimate as statsmodels' acf, in O(n)
+    for the single requested lag.
+
     Args:
-        series (dict): Timeseries.
+        series (dict | np.ndarray): Timeseries, or its series_values.
+        lag (int): Lag of the autocorrelation, 1 by default.
     Returns:
-        float: Autocorrelation value;
+        float: Autocorrelation value; NaN if it cannot be computed.
     """
-    if not series or not isinstance(series, dict):
+    if lag < 1:
+        raise ValueError("Autocorrelation lag must be a positive integer")
+    data = series_values(series)
+    if data is None or np.isnan(data).any():
         return np.nan
-    if any(not isinstance(v, (int, float)) or np.isnan(v) for v in series.values()):
+    if len(data) <= lag:
         return np.nan
-    try:
-        series: pd.Series = pd.Series(series)
-        data = pd.to_numeric(series, errors="coerce").dropna().values
-    except (ValueError, TypeError) as e:
-        raise ValueError("could not convert series to pd.Series: " + str(e)) from e
-    # acf from statsmodels returns the autocorrelation values for lags 0 to nlags
-    # we use nlags=1 to get the first lag autocorrelation
-    acf_values = acf(data, nlags=1, fft=True)
-    return float(acf_values[1])
+
+    centered = data - data.mean()
+    variance = np.dot(centered, centered)
+    if variance == 0:
+        return np.nan  # Constant series
+    return float(np.dot(centered[:-lag], centered[lag:]) / variance)
 
 
-def calculate_coefficient_of_variation(series: dict) -> float:
+def calculate_coefficient_of_variation(series: dict | np.ndarray) -> float:
     """
     Calculates the coefficient of variation (CV).
     Args:
-        series (dict): Timeseries.
+        series (dict | np.ndarray): Timeseries, or its series_values.
     Returns:
         float: Coefficient of variation.
     """
-    if not series or not isinstance(series, dict):
-        return np.nan
-    if any(not isinstance(v, (int, float)) or np.isnan(v) for v in series.values()):
+    values = series_values(series)
+    if values is None or np.isnan(values).any():
         return np.nan
-    try:
-        series: pd.Series = pd.Series(series)
-    except (ValueError, TypeError) as e:
-        raise ValueError("could not convert series to pd.Series: " + str(e)) from e
-    if series.mean() == 0:
+    if values.size < 2:
+        return np.nan  # Sample standard deviation needs two points
+    mean = values.mean()
+    if mean == 0:
         return np.nan  # Avoid division by zero
-    return series.std() * 100 / series.mean()
+    return values.std(ddof=1) * 100 / mean
 
 
-def calculate_iqr(series: dict) -> float:
+def calculate_iqr(series: dict | np.ndarray) -> float:
     """
     Calculates the interquartile range (IQR).
     Args:
-        series (dict): Timeseries.
+        series (dict | np.ndarray): Timeseries, or its series_values.
     Returns:
         float: IQR value.
     """
-    if not series or not isinstance(series, dict):
+    values = series_values(series)
+    if values is None or np.isnan(values).any():
         return np.nan
-    if any(not isinstance(v, (int, float)) or np.isnan(v) for v in series.values()):
+    q1, q3 = np.quantile(values, [0.25, 0.75])
+    return q3 - q1
+
+
+# --- Metrics for two aligned time series ---
+def _aligned_values(
+    series1: dict | ParsedSeries, series2: dict | ParsedSeries, tolerance: str | None
+) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the aligned values of both series as float arrays."""
+    aligned = align_series(series1, series2, tolerance)
+    if aligned is None:
+        return np.empty(0), np.empty(0)
+    return aligned[1], aligned[2]
+
+
+def _pearson_from_aligned(x: np.ndarray, y: np.ndarray) -> float:
+    if len(x) < 2:
+        return np.nan  # Too few overlapping points
+    # Checked exactly, as the deviations of a constant series from its
+    # computed mean are not always exactly zero
+    if np.ptp(x) == 0 or np.ptp(y) == 0:
+        return np.nan  # One of the series has zero variance
+
+    xm = x - x.mean()
+    ym = y - y.mean()
+    norm = np.sqrt(np.dot(xm, xm) * np.dot(ym, ym))
+    if norm == 0:
+        return np.nan  # Deviations too small to square
+
+    return float(np.clip(np.dot(xm, ym) / norm, -1.0, 1.0))
+
+
+def _cosine_from_aligned(x: np.ndarray, y: np.ndarray) -> float:
+    if len(x) < 2:
         return np.nan
-    try:
-        series: pd.Series = pd.Series(series)
-    except (ValueError, TypeError) as e:
-        raise ValueError("could not convert series to pd.Series: " + str(e)) from e
-    return series.quantile(0.75) - series.quantile(0.25)
+
+    # Jeśli jedna seria to same zera → brak sensownego podobieństwa
+    if not x.any() or not y.any():
+        return np.nan
+
+    denominator = np.linalg.norm(x) * np.linalg.norm(y)
+    if denominator == 0:
+        return np.nan
+
+    return float(np.dot(x, y) / denominator)
+
+
+def _mae_from_aligned(x: np.ndarray, y: np.ndarray) -> float:
+    if len(x) == 0:
+        return np.nan
+    return float(np.mean(np.abs(x - y)))
+
+
+def _rmse_from_aligned(x: np.ndarray, y: np.ndarray) -> float:
+    if len(x) == 0:
+        return np.nan
+    diff = x - y
+    return float(np.sqrt(np.dot(diff, diff) / len(diff)))
+
+
+# Metrics computed by calculate_comparison_metrics from the aligned values
+COMPARISON_METRICS = {
+    "pearson_correlation": _pearson_from_aligned,
+    "cosine_similarity": _cosine_from_aligned,
+    "mae": _mae_from_aligned,
+    "rmse": _rmse_from_aligned,
+}
+
+
+def calculate_comparison_metrics(
+    series1: dict | ParsedSeries,
+    series2: dict | ParsedSeries,
+    tolerance: str | None = None,
+    metrics: tuple[str, ...] | None = None,
+) -> dict:
+    """
+    Computes the Pearson correlation, cosine similarity, MAE and RMSE between
+    two time series, aligning them only once.
+
+    Args:
+        series1 (dict | ParsedSeries): First time series.
+        series2 (dict | ParsedSeries): Second time series.
+        tolerance (str | None): Max allowed time difference for matching timestamps.
+        metrics (tuple[str, ...] | None): Names of COMPARISON_METRICS to compute,
+            all of them if None.
+
+    Returns:
+        dict: Values keyed by metric name, np.nan for those which cannot be computed.
+    """
+    x, y = np.empty(0), np.empty(0)
+    if _series_length(series1) and _series_length(series2):
+        try:
+            x, y = _aligned_values(series1, series2, tolerance)
+        except (ValueError, TypeError):
+            pass
+
+    if metrics is None:
+        metrics = tuple(COMPARISON_METRICS)
+    return {metric: COMPARISON_METRICS[metric](x, y) for metric in metrics}
 
 
 def calculate_pearson_correlation(
-    series1: dict, series2: dict, tolerance: str | None = None
+    series1: dict | ParsedSeries,
+    series2: dict | ParsedSeries,
+    tolerance: str | None = None,
 ) -> float:
     """
     Calculates the Pearson correlation coefficient between two series,
@@ -262,39 +564,88 @@ def calculate_pearson_correlation(
     Returns:
         float: Pearson correlation coefficient.
     """
-    if not isinstance(series1, dict) or not isinstance(series2, dict):
+    length1, length2 = _series_length(series1), _series_length(series2)
+    if length1 is None or length2 is None:
         return np.nan
-    if not series1 or not series2:
+    if not length1 or not length2:
         logger.warning(
-            f"calculate_pearson_correlation: empty series detected (s1={len(series1)}, s2={len(series2)}) → returning NaN"
+            f"calculate_pearson_correlation: empty series detected (s1={length1}, s2={length2}) → returning NaN"
         )
         return np.nan
 
-    logger.info(
-        f"calculate_pearson_correlation: series1_len={len(series1)}, series2_len={len(series2)}, tolerance={tolerance}"
+    logger.debug(
+        "calculate_pearson_correlation: series1_len=%d, series2_len=%d, tolerance=%s",
+        length1,
+        length2,
+        tolerance,
     )
 
     try:
-        df_merged = get_aligned_data(series1, series2, tolerance)
-
+        x, y = _aligned_values(series1, series2, tolerance)
     except (ValueError, TypeError):
         return np.nan
 
-    if len(df_merged) < 2:
-        return np.nan  # Too few overlapping points
+    return _pearson_from_aligned(x, y)
 
-    # Check for zero variance
-    if df_merged["value1"].var() == 0 or df_merged["value2"].var() == 0:
-        return np.nan  # One of the series has zero variance
 
-    # Calculate Pearson correlation
-    corr, _ = pearsonr(df_merged["value1"], df_merged["value2"])
+def _utc_offset_suffix(tz) -> str | None:
+    """
+    The offset isoformat() writes for a timezone with a fixed offset, "" for
+    naive timestamps, or None if the offset may vary.
+    """
+    if tz is None:
+        return ""
+    if str(tz) == "UTC":
+        return "+00:00"
+    if not isinstance(tz, datetime.timezone):
+        return None
+    seconds = int(tz.utcoffset(None).total_seconds())
+    if seconds % 60:
+        return None
+    hours, minutes = divmod(abs(seconds) // 60, 60)
+    return f"{'-' if seconds < 0 else '+'}{hours:02d}:{minutes:02d}"
 
-    return corr
+
+def format_timestamps(index: pd.DatetimeIndex) -> list:
+    """
+    Format timestamps as Timestamp.isoformat() does, for a whole index at once.
+
+    Timestamps with at most microsecond precision, naive or with a fixed
+    offset, are formatted by numpy in C instead of one Timestamp at a time.
+    Like isoformat(), microseconds are only written when they are not zero.
+    """
+    if len(index) == 0:
+        return []
+    suffix = _utc_offset_suffix(index.tz)
+    fraction = index.as_unit("ns").asi8 % 1_000_000_000
+    if suffix is None or (fraction % 1000).any():
+        return [timestamp.isoformat() for timestamp in index]
+    wall_times = index.tz_localize(None).to_numpy()
+    keys = np.datetime_as_string(wall_times, unit="s")
+    if fraction.any():
+        keys = np.where(
+            fraction == 0, keys, np.datetime_as_string(wall_times, unit="us")
+        )
+    if suffix:
+        keys = np.char.add(keys, suffix)
+    return keys.tolist()
+
+
+def _series_to_dict(series: pd.Series) -> dict:
+    """
+    Convert a datetime indexed series to a {timestamp: value} dict.
+
+    Keys and values are converted column-wise instead of boxing every item;
+    NaN is kept and written as null by the JSON provider.
+    """
+    values = series.to_numpy(dtype=np.float64).tolist()
+    return dict(zip(format_timestamps(series.index), values))
 
 
 def calculate_difference(
-    series1: dict, series2: dict, tolerance: str | None = None
+    series1: dict | ParsedSeries,
+    series2: dict | ParsedSeries,
+    tolerance: str | None = None,
 ) -> dict:
     """
     Calculates the difference between two time series by nearest timestamp matching.
@@ -307,82 +658,233 @@ def calculate_difference(
     Returns:
         dict: timestamp-to-difference series (empty dict if series are empty)
     """
-    if not series1 or not series2:
+    if _is_empty(series1) or _is_empty(series2):
         # Return empty dict instead of raising - graceful handling of empty series
         return {}
 
-    df_merged = get_aligned_data(series1, series2, tolerance)
-
-    if df_merged.empty:
+    # Aligned with binary searches on the timestamps, without building a frame
+    aligned = align_series(series1, series2, tolerance)
+    if aligned is None or len(aligned[0]) == 0:
         raise ValueError("No overlapping timestamps within tolerance")
 
-    df_merged["diff"] = df_merged["value1"] - df_merged["value2"]
-    return {idx.isoformat(): float(val) for idx, val in df_merged["diff"].items()}
+    index, x, y = aligned
+    return dict(zip(format_timestamps(index), (x - y).tolist()))
+
 
+def _regular_step(ts_ns: np.ndarray) -> int | None:
+    """Interval of evenly spaced, strictly increasing timestamps, else None."""
+    if len(ts_ns) < 2:
+        return None
+    deltas = np.diff(ts_ns)
+    step = deltas[0]
+    if step <= 0 or not (deltas == step).all():
+        return None
+    return int(step)
+
+
+def _rolling_time_mean(
+    ts_ns: np.ndarray, values: np.ndarray, window_ns: int
+) -> np.ndarray:
+    """
+    Mean of the values within (t - window, t] of every timestamp t.
+
+    Matches pandas' time-based rolling mean with min_periods=1. The sums are
+    differences of a cumulative sum, so the cost does not depend on the window
+    size. On a regular grid every full window holds the same number of points
+    and its start is computed directly; otherwise the window starts are found
+    with one binary search. As in pandas, a window always holds its own point,
+    so a zero window gives the values themselves.
+
+    Args:
+        ts_ns (np.ndarray): Sorted timestamps as int64 nanoseconds.
+        values (np.ndarray): Values, without NaN.
+        window_ns (int): Window length in nanoseconds.
 
-def calculate_rolling_mean(series: dict, window_size: str = "1d") -> dict:
+    Returns:
+        np.ndarray: Rolling mean.
+    """
+    stop = np.arange(1, len(ts_ns) + 1)
+    step = _regular_step(ts_ns)
+    if step is not None:
+        # Points less than a window before t: ceil(window / step) of them
+        start = np.maximum(stop - -(-window_ns // step), 0)
+    else:
+        start = np.searchsorted(ts_ns, ts_ns - window_ns, side="right")
+    # A zero window ends before t; pandas still counts the point itself
+    start = np.minimum(start, stop - 1)
+    # Summing the deviations from the mean keeps the cumulative sum small
+    # enough not to lose the precision of the individual values
+    center = values.mean()
+    cumsum = np.concatenate(([0.0], np.cumsum(values - center)))
+    return (cumsum[stop] - cumsum[start]) / (stop - start) + center
+
+
+def calculate_rolling_mean(
+    series: dict | ParsedSeries, window_size: str = "1d"
+) -> dict:
     """
     Calculates the rolling mean (moving average) of a time series using a configurable window size.
 
     Args:
-        series (dict): Time series as a dictionary of timestamp-value pairs.
+        series (dict | ParsedSeries): Time series as a dictionary of timestamp-value pairs.
         window_size (str): Size of the moving window (e.g., '1d', '3h'). Defaults to '1d'.
 
     Returns:
         dict: Time series of rolling mean values.
     """
-    if not series or not isinstance(series, dict):
+    if not _series_length(series):
         return {}
-    if any(not isinstance(v, (int, float)) or np.isnan(v) for v in series.values()):
+    if isinstance(series, dict) and not _has_numeric_values(series):
         return {}
     if not isinstance(window_size, str):
         return {}
     try:
-        s = pd.Series(series)
-        s.index = pd.to_datetime(s.index)
-        s = s.sort_index()
-        rolling_mean = s.rolling(pd.Timedelta(window_size)).mean()
+        index, values = parse_series(series)
+        if np.isnan(values).any():
+            return {}
+        window = pd.Timedelta(window_size)
+        if window < pd.Timedelta(0):
+            raise ValueError("window must be non-negative")
+        rolling_mean = _rolling_time_mean(
+            index.as_unit("ns").asi8, values, window.value
+        )
     except (ValueError, TypeError) as e:
         raise ValueError("could not convert series to pd.Series: " + str(e)) from e
-    return {idx.isoformat(): float(val) for idx, val in rolling_mean.items()}
+    return _series_to_dict(pd.Series(rolling_mean, index=index))
+
 
+# Above this many cost matrix cells exact DTW gets slower than the FastDTW approximation
+EXACT_DTW_MAX_CELLS = 25_000_000
 
-def calculate_dtw(series1: dict, series2: dict) -> float:
-    if not series1 or not series2:
+
+def _dtw_distance(x: np.ndarray, y: np.ndarray, radius: int | None = None) -> float:
+    """
+    Computes the exact DTW distance with absolute difference as the local cost.
+
+    The cost matrix is filled one row at a time with numpy, keeping only the
+    previous row in memory. Within a row the D[i, j-1] dependency is a running
+    minimum: D[i, j] = C[j] + min_{k<=j}(tmp[k] - C[k]), where C is the cumulative
+    cost of the row and tmp[k] = cost[k] + min(D[i-1, k-1], D[i-1, k]).
+
+    DTW is symmetric, so the rows are the points of the shorter series: the
+    Python loop runs once per point of the shorter series and each row is
+    vectorized over the longer one.
+
+    With a radius, only cells within a Sakoe-Chiba band of that many cells
+    around the (length scaled) diagonal are filled. The band is measured along
+    the shorter series, |i - j * (n - 1) / (m - 1)| <= radius for point i of the
+    shorter and j of the longer series, whichever series is passed first.
+
+    Args:
+        x (np.ndarray): First series values.
+        y (np.ndarray): Second series values.
+        radius (int, optional): Sakoe-Chiba band radius, unconstrained if None.
+
+    Returns:
+        float: DTW distance.
+    """
+    if len(x) > len(y):
+        x, y = y, x  # iterate in Python over the shorter series, vectorize the longer
+    n, m = len(x), len(y)
+
+    # Rows are computed into a few buffers allocated once and reused for
+    # every row, instead of allocating new arrays in each numpy call
+    previous, current, cost, cumulative = np.empty((4, m))
+    step, window = np.empty((2, m + 1))
+    lo, hi = 0, m - 1
+    previous_lo, previous_width = 0, 0
+    for i, value in enumerate(x):
+        if radius is not None and n > 1:
+            # Columns j with i - radius <= j * (n - 1) / (m - 1) <= i + radius,
+            # in integers so that cells on the band edge are not lost to rounding
+            lo = max(0, -int((radius - i) * (m - 1) // (n - 1)))
+            hi = min(m - 1, int((i + radius) * (m - 1) // (n - 1)))
+        end = hi + 1
+        width = end - lo
+        row_cost, row_step = cost[:width], step[:width]
+        np.subtract(y[lo:end], value, out=row_cost)
+        np.abs(row_cost, out=row_cost)
+        if i == 0:
+            row_step.fill(np.inf)
+            row_step[0] = row_cost[0]
+        elif radius is None:
+            row_step[0] = row_cost[0] + previous[0]
+            np.minimum(previous[: m - 1], previous[1:m], out=row_step[1:])
+            row_step[1:] += row_cost[1:]
+        else:
+            # Previous row over columns lo-1..hi, infinite outside its band
+            row_window = window[: width + 1]
+            row_window.fill(np.inf)
+            first = max(lo - 1, previous_lo)
+            last = min(hi, previous_lo + previous_width - 1)
+            if first <= last:
+                target = slice(first - lo + 1, last - lo + 2)
+                source = slice(first - previous_lo, last - previous_lo + 1)
+                row_window[target] = previous[source]
+            np.minimum(row_window[:-1], row_window[1:], out=row_step)
+            row_step += row_cost
+        row_cumulative = cumulative[:width]
+        np.cumsum(row_cost, out=row_cumulative)
+        row_step -= row_cumulative
+        np.minimum.accumulate(row_step, out=row_step)
+        np.add(row_cumulative, row_step, out=current[:width])
+        previous, current = current, previous
+        previous_lo, previous_width = lo, width
+    return float(previous[previous_width - 1])
+
+
+def calculate_dtw(
+    series1: dict | ParsedSeries,
+    series2: dict | ParsedSeries,
+    radius: int | None = None,
+) -> float:
+    """
+    Computes the DTW distance between two time series.
+
+    Args:
+        series1 (dict | ParsedSeries): First time series with timestamps as keys.
+        series2 (dict | ParsedSeries): Second time series with timestamps as keys.
+        radius (int, optional): Sakoe-Chiba band radius limiting how far the
+            warping path may stray from the diagonal, unconstrained if None.
+
+    Returns:
+        float: DTW distance, or None if either series is empty.
+    """
+    if _is_empty(series1) or _is_empty(series2):
         # Return None instead of raising - graceful handling of empty series
         return None  # type: ignore
 
-    if not isinstance(series1, dict) or not isinstance(series2, dict):
+    if _series_length(series1) is None or _series_length(series2) is None:
         raise ValueError("Both series must be dictionaries with timestamps as keys")
-    if len(series1) == 0 or len(series2) == 0:
-        # Return None instead of raising - graceful handling
-        return None  # type: ignore
+    if radius is not None and radius < 1:
+        raise ValueError("DTW radius must be a positive integer")
 
-    s1 = pd.Series(series1)
-    s1.index = pd.to_datetime(s1.index)
-    s1 = s1.sort_index().astype(float)
-
-    s2 = pd.Series(series2)
-    s2.index = pd.to_datetime(s2.index)
-    s2 = s2.sort_index().astype(float)
-
-    if s1.empty or s2.empty:
-        return None
+    # Values in time order; the timestamps themselves are not needed
+    _, x = parse_series(series1)
+    _, y = parse_series(series2)
 
-    x = s1.values.astype(np.float64).flatten()
-    y = s2.values.astype(np.float64).flatten()
+    if series2 is series1 and not np.isnan(x).any():
+        # The diagonal path pairs every point with itself
+        return 0.0
 
-    distance, path = fastdtw(x, y)
+    cells = len(x) * len(y)
+    if radius is not None:
+        cells = min(cells, max(len(x), len(y)) * (2 * radius + 1))
+    if cells > EXACT_DTW_MAX_CELLS:
+        distance, _ = fastdtw(x, y)
+        return float(distance)
 
-    return distance
+    return _dtw_distance(x, y, radius)
 
 
 def calculate_euclidean_distance(
-    series1: dict, series2: dict, tolerance: str | None = None
+    series1: dict | ParsedSeries,
+    series2: dict | ParsedSeries,
+    tolerance: str | None = None,
 ) -> float:
     """
     Computes the Euclidean distance between two time series by aligning points
-    using pandas.merge_asof with nearest timestamp matching.
+    with nearest timestamp matching.
 
     Args:
         series1 (dict): First time series (timestamp -> value).
@@ -394,23 +896,26 @@ def calculate_euclidean_distance(
     Returns:
         float: Euclidean distance computed from the aligned points, or None if series are empty.
     """
-    if not series1 or not series2:
+    if _is_empty(series1) or _is_empty(series2):
         # Return None instead of raising - graceful handling of empty series
         return None  # type: ignore
 
-    df_merged = get_aligned_data(series1, series2, tolerance)
+    x, y = _aligned_values(series1, series2, tolerance)
 
-    if df_merged.empty:
+    if len(x) == 0:
         raise ValueError("No overlapping timestamps within tolerance")
 
-    diffs = df_merged["value1"].values - df_merged["value2"].values
-    euclidean_distance = float(np.linalg.norm(diffs))
-
-    return euclidean_distance
+    # The pair is aligned on its own timestamps, so there is no shared matrix
+    # for the ||x||² + ||y||² - 2·x·y expansion; one dot product of the
+    # differences is as fast and does not lose precision to cancellation
+    diff = x - y
+    return float(np.sqrt(np.dot(diff, diff)))
 
 
 def calculate_cosine_similarity(
-    series1: dict, series2: dict, tolerance: str | None = None
+    series1: dict | ParsedSeries,
+    series2: dict | ParsedSeries,
+    tolerance: str | None = None,
 ) -> float:
     """
     Computes the cosine similarity between two time series
@@ -427,36 +932,22 @@ def calculate_cosine_similarity(
         float: The cosine similarity value in the range [-1, 1].
                Returns np.nan if it cannot be computed.
     """
-    if not isinstance(series1, dict) or not isinstance(series2, dict):
-        return np.nan
-    if not series1 or not series2:
+    if not _series_length(series1) or not _series_length(series2):
         return np.nan
 
     try:
-        df_merged = get_aligned_data(series1, series2, tolerance)
+        x, y = _aligned_values(series1, series2, tolerance)
     except (ValueError, TypeError):
         return np.nan
 
-    if df_merged.empty or len(df_merged) < 2:
-        return np.nan
-
-    a = df_merged["value1"].to_numpy()
-    b = df_merged["value2"].to_numpy()
-
-    # Jeśli jedna seria to same zera → brak sensownego podobieństwa
-    if np.all(a == 0) or np.all(b == 0):
-        return np.nan
+    return _cosine_from_aligned(x, y)
 
-    numerator = np.dot(a, b)
-    denominator = np.linalg.norm(a) * np.linalg.norm(b)
 
-    if denominator == 0:
-        return np.nan
-
-    return float(numerator / denominator)
-
-
-def calculate_mae(series1: dict, series2: dict, tolerance: str | None = None) -> float:
+def calculate_mae(
+    series1: dict | ParsedSeries,
+    series2: dict | ParsedSeries,
+    tolerance: str | None = None,
+) -> float:
     """
     Calculates Mean Absolute Error (MAE) between two time series matched by nearest timestamp.
 
@@ -468,24 +959,22 @@ def calculate_mae(series1: dict, series2: dict, tolerance: str | None = None) ->
     Returns:
         float: MAE value (or np.nan if cannot compute)
     """
-    if not isinstance(series1, dict) or not isinstance(series2, dict):
-        return np.nan
-    if not series1 or not series2:
+    if not _series_length(series1) or not _series_length(series2):
         return np.nan
 
     try:
-        df_merged = get_aligned_data(series1, series2, tolerance)
+        x, y = _aligned_values(series1, series2, tolerance)
     except (ValueError, TypeError):
         return np.nan
 
-    if df_merged.empty:
-        return np.nan
-
-    mae = np.mean(np.abs(df_merged["value1"] - df_merged["value2"]))
-    return float(mae)
+    return _mae_from_aligned(x, y)
 
 
-def calculate_rmse(series1: dict, series2: dict, tolerance: str | None = None) -> float:
+def calculate_rmse(
+    series1: dict | ParsedSeries,
+    series2: dict | ParsedSeries,
+    tolerance: str | None = None,
+) -> float:
     """
     Calculates Root Mean Square Error (RMSE) between two time series matched by nearest timestamp.
 
@@ -497,18 +986,12 @@ def calculate_rmse(series1: dict, series2: dict, tolerance: str | None = None) -
     Returns:
         float: RMSE value (or np.nan if cannot compute)
     """
-    if not isinstance(series1, dict) or not isinstance(series2, dict):
-        return np.nan
-    if not series1 or not series2:
+    if not _series_length(series1) or not _series_length(series2):
         return np.nan
 
     try:
-        df_merged = get_aligned_data(series1, series2, tolerance)
+        x, y = _aligned_values(series1, series2, tolerance)
     except (ValueError, TypeError):
         return np.nan
 
-    if df_merged.empty:
-        return np.nan
-
-    rmse = np.sqrt(np.mean((df_merged["value1"] - df_merged["value2"]) ** 2))
-    return float(rmse)
+    return _rmse_from_aligned(x, y)
@@ -6,19 +6,59 @@ NOTE: Plugins are stored on the frontend (localStorage) for privacy.
 This service only handles validation and sandboxed execution.
 """
 
+import hashlib
+import itertools
 import textwrap
 
+from utils.cache_utils import TTLCache
+
+# Validation results keyed by a digest of the code, as clients send the same
+# plugin again and again. Keying on the digest keeps large sources out of memory.
+_validation_cache = TTLCache(maxsize=1024, ttl=24 * 3600)
+
+# Template new plugins are created from in the client (MetricModal), computing
+# the mean absolute error of the aligned series
+MAE_TEMPLATE = (
+    "def calculate(series1, series2) -> float:\n"
+    "    # Align series by timestamp (returns DataFrame with 'value1', 'value2' columns)\n"
+    "    aligned = get_aligned_data(series1, series2)\n"
+    "    \n"
+    "    # Calculate your metric\n"
+    "    diff = aligned['value1'] - aligned['value2']\n"
+    "    return float(np.mean(np.abs(diff)))\n"
+)
+
+
+def _code_digest(code: str) -> bytes:
+    """SHA-256 digest identifying a plugin source."""
+    return hashlib.sha256(code.encode("utf-8", "surrogatepass")).digest()
+
+
+# Plugins whose result is a built-in comparison metric, keyed by the digest of
+# their normalized source, with the name of the metric in
+# metric_service.COMPARISON_METRICS
+_BUILTIN_PLUGINS = {_code_digest(textwrap.dedent(MAE_TEMPLATE).strip()): "mae"}
+
 
 def validate_plugin_code(code: str) -> dict:
     """
     Validate plugin code for security and correctness.
 
+    Results are cached by the SHA-256 of the code, so repeated validation of
+    the same plugin costs a hash instead of scanning and compiling it again.
+
     Args:
         code: Python code to validate
 
     Returns:
         dict with 'valid' (bool) and optionally 'error' (str)
     """
+    key = _code_digest(code)
+    return dict(_validation_cache.get_or_set(key, lambda: _check_plugin_code(code)))
+
+
+def _check_plugin_code(code: str) -> dict:
+    """Validate plugin code without caching, see validate_plugin_code."""
     # Normalize code: remove common leading indentation and leading/trailing newlines
     normalized_code = textwrap.dedent(code).strip()
 
@@ -93,6 +133,66 @@ def validate_plugin_code(code: str) -> dict:
     return {"valid": True}
 
 
+def builtin_plugin_metric(code: str) -> str | None:
+    """
+    Name the built-in comparison metric a plugin computes, if any.
+
+    Plugins saved unchanged from the client's template compute the MAE of the
+    aligned series, which can be computed in-process for all pairs at once
+    instead of in a sandbox.
+
+    Args:
+        code: Python code of the plugin
+
+    Returns:
+        Name of the metric in metric_service.COMPARISON_METRICS, or None
+    """
+    return _BUILTIN_PLUGINS.get(_code_digest(textwrap.dedent(code).strip()))
+
+
+def build_execution_pairs(filenames: list) -> list:
+    """
+    Build the pairs of every two files for sandboxed execution.
+
+    Pairs refer to their series by filename, each series being sent to the
+    sandbox once instead of inline in every pair using it. The key, echoed back
+    by the sandbox with the result of the pair, is the position of the pair:
+    filenames may contain any character, so no string joining them is unique.
+
+    Args:
+        filenames: Files to compare with each other
+
+    Returns:
+        list of pairs, as accepted by the sandboxed executor
+    """
+    return [
+        {"series1": file1, "series2": file2, "key": key}
+        for key, (file1, file2) in enumerate(itertools.product(filenames, repeat=2))
+    ]
+
+
+def execution_results_to_map(pairs: list, execution_results: list) -> dict:
+    """
+    Transform flat execution results to a nested {file1: {file2: result}} map.
+
+    Args:
+        pairs: Pairs built by build_execution_pairs
+        execution_results: Results of the pairs, with the keys they echo
+
+    Returns:
+        dict of the results by filenames of their pair
+    """
+    pairs_by_key = {pair["key"]: pair for pair in pairs}
+    results_map = {}
+    for item in execution_results:
+        pair = pairs_by_key.get(item.get("key"))
+        if pair is None:
+            continue
+        row = results_map.setdefault(pair["series1"], {})
+        row[pair["series2"]] = item.get("result")
+    return results_map
+
+
 def execute_plugin_code(code: str, series1, series2) -> dict:
     """
     Execute plugin code on two time series using sandboxed execution.
@@ -4,10 +4,42 @@ import json
 import logging
 import textwrap
 import atexit
+from concurrent.futures import ThreadPoolExecutor
+
+import orjson
 
 logger = logging.getLogger(__name__)
 
 
+def _loads(payload):
+    """
+    Parse plugin output with orjson, falling back to the stdlib parser for the
+    NaN and Infinity literals plugins may print through json.dumps.
+    """
+    try:
+        return orjson.loads(payload)
+    except orjson.JSONDecodeError:
+        return json.loads(payload)
+
+
+def _encode_series(series: dict) -> dict:
+    """
+    Encode {name: {timestamp: value}} series as value columns, each pointing to
+    its timestamp index. Series of files uploaded together share their
+    timestamps, so every distinct index is sent, and parsed, only once.
+    """
+    indexes = []
+    positions = {}
+    columns = {}
+    for name, values in series.items():
+        index = tuple(values)
+        if index not in positions:
+            positions[index] = len(indexes)
+            indexes.append(index)
+        columns[name] = {"index": positions[index], "values": list(values.values())}
+    return {"indexes": indexes, "series": columns}
+
+
 class SandboxedExecutor:
     """
     Adaptive executor for plugin code with lifecycle management.
@@ -21,6 +53,10 @@ class SandboxedExecutor:
     PLUGIN_TIMEOUT_SECONDS = 120
     PLUGIN_MEMORY_LIMIT = "256m"
 
+    # Large executions are split into batches run by parallel sandboxes
+    MAX_PARALLEL_BATCHES = 4
+    MIN_PAIRS_PER_BATCH = 16
+
     # Label to identify containers managed by this specific system
     CONTAINER_LABEL_KEY = "managed_by"
     CONTAINER_LABEL_VAL = "sandboxed_plugin_executor"
@@ -28,6 +64,10 @@ class SandboxedExecutor:
     def __init__(self):
         self.lambda_function_name = os.environ.get("PLUGIN_EXECUTOR_LAMBDA")
         self.use_lambda = bool(self.lambda_function_name)
+        # Shared by all requests, so it also bounds the sandboxes running at once
+        self._batch_pool = ThreadPoolExecutor(
+            max_workers=self.MAX_PARALLEL_BATCHES, thread_name_prefix="plugin-batch"
+        )
 
         if self.use_lambda:
             self._init_lambda()
@@ -107,23 +147,28 @@ class SandboxedExecutor:
         import statsmodels.tsa.api
         import traceback
 
+        def _to_frame(series, column):
+            # Series are read directly instead of being converted to a dict first
+            if isinstance(series, pd.Series):
+                series = series[~series.index.duplicated(keep="last")]  # as to_dict() did
+                times, values = series.index, series.to_numpy()
+            else:
+                times, values = list(series.keys()), list(series.values())
+            frame = pd.DataFrame({
+                "time": pd.to_datetime(times),
+                column: values,
+            }).set_index("time")
+            # Stored series are already in time order; skip the sorted copy
+            if not frame.index.is_monotonic_increasing:
+                frame = frame.sort_index()
+            return frame
+
         def get_aligned_data(series1, series2, tolerance=None):
-            if isinstance(series1, pd.Series):
-                series1 = series1.to_dict()
-            if isinstance(series2, pd.Series):
-                series2 = series2.to_dict()
-            if not isinstance(series1, dict) or not isinstance(series2, dict):
+            if not isinstance(series1, (dict, pd.Series)) or not isinstance(series2, (dict, pd.Series)):
                 raise ValueError("Inputs must be dictionaries or pandas Series")
 
-            df1 = pd.DataFrame({
-                "time": pd.to_datetime(list(series1.keys())),
-                "value1": list(series1.values()),
-            }).set_index("time").sort_index()
-
-            df2 = pd.DataFrame({
-                "time": pd.to_datetime(list(series2.keys())),
-                "value2": list(series2.values()),
-            }).set_index("time").sort_index()
+            df1 = _to_frame(series1, "value1")
+            df2 = _to_frame(series2, "value2")
 
             df1 = df1[~df1.index.duplicated(keep="first")]
             df2 = df2[~df2.index.duplicated(keep="first")]
@@ -146,6 +191,19 @@ class SandboxedExecutor:
         try:
             input_data = json.loads(sys.stdin.read())
             pairs = input_data["pairs"]
+            # Series shared by several pairs are sent once, as value columns
+            # referring to a timestamp index shared between series
+            indexes = [pd.Index(index) for index in input_data.get("indexes", [])]
+            shared_series = {
+                name: pd.Series(columns["values"], index=indexes[columns["index"]])
+                for name, columns in input_data.get("series", {}).items()
+            }
+
+            def to_series(ref):
+                # A copy, so a plugin modifying its input cannot affect other pairs
+                if isinstance(ref, str):
+                    return shared_series[ref].copy()
+                return pd.Series(ref)
             plugin_code = input_data["code"]
 
             namespace = {
@@ -167,8 +225,8 @@ class SandboxedExecutor:
 
             for pair in pairs:
                 try:
-                    s1 = pd.Series(pair["series1"])
-                    s2 = pd.Series(pair["series2"])
+                    s1 = to_series(pair["series1"])
+                    s2 = to_series(pair["series2"])
 
                     # 1. Execute User Code
                     result = calculate(s1, s2)
@@ -212,27 +270,75 @@ class SandboxedExecutor:
         """
     )
 
-    def execute(self, code: str, pairs: list) -> dict:
-        """Execute plugin code on multiple pairs."""
+    def execute(self, code: str, pairs: list, series: dict = None) -> dict:
+        """
+        Execute plugin code on multiple pairs.
+
+        The series of a pair are either given inline as {timestamp: value} dicts,
+        or as names of entries in `series`, so that a series used by many pairs
+        is sent to the sandbox only once.
+        """
         if not pairs:
             return {"results": []}
 
+        series = series or {}
+        batch_count = min(
+            self.MAX_PARALLEL_BATCHES, -(-len(pairs) // self.MIN_PAIRS_PER_BATCH)
+        )
+        if batch_count <= 1:
+            return self._execute_batch(code, pairs, series)
+
+        # Each sandbox is limited to CPU_LIMIT, so batches running side by side
+        # let a large execution use several cores
+        batch_size = -(-len(pairs) // batch_count)
+        batches = []
+        for start in range(0, len(pairs), batch_size):
+            end = start + batch_size
+            batches.append(pairs[start:end])
+        futures = [
+            self._batch_pool.submit(self._execute_batch, code, batch, series)
+            for batch in batches
+        ]
+        outputs = [future.result() for future in futures]
+
+        results = []
+        for output in outputs:
+            if "error" in output:
+                return output
+            results.extend(output["results"])
+        return {"results": results}
+
+    def _execute_batch(self, code: str, pairs: list, series: dict) -> dict:
+        """Execute plugin code on a batch of pairs in a single sandbox."""
+        payload = {"code": code, "pairs": pairs}
+        names = {
+            name
+            for pair in pairs
+            for name in (pair["series1"], pair["series2"])
+            if isinstance(name, str)
+        }
+        if names:
+            payload.update(
+                _encode_series(
+                    {name: values for name, values in series.items() if name in names}
+                )
+            )
+
         if self.use_lambda:
-            return self._execute_lambda(code, pairs)
+            return self._execute_lambda(payload)
         else:
-            return self._execute_docker(code, pairs)
+            return self._execute_docker(payload)
 
-    def _execute_lambda(self, code: str, pairs: list) -> dict:
+    def _execute_lambda(self, payload: dict) -> dict:
         """Execute plugin code via AWS Lambda."""
         try:
-            payload = json.dumps({"code": code, "pairs": pairs})
+            payload = orjson.dumps(payload)
             response = self.lambda_client.invoke(
                 FunctionName=self.lambda_function_name,
                 InvocationType="RequestResponse",
-                Payload=payload.encode("utf-8"),
+                Payload=payload,
             )
-            response_payload = response["Payload"].read().decode("utf-8")
-            result = json.loads(response_payload)
+            result = _loads(response["Payload"].read())
 
             if "FunctionError" in response:
                 logger.error(f"Lambda execution error: {result}")
@@ -242,12 +348,12 @@ class SandboxedExecutor:
             logger.exception("Error invoking Lambda")
             return {"error": f"Lambda invocation error: {str(e)}"}
 
-    def _execute_docker(self, code: str, pairs: list) -> dict:
+    def _execute_docker(self, payload: dict) -> dict:
         """Execute plugin code via Docker container."""
         if not self.docker_available:
             return {"error": "Secure execution environment unavailable"}
 
-        input_data = json.dumps({"pairs": pairs, "code": code})
+        input_data = orjson.dumps(payload).decode("utf-8")
 
         try:
             docker_cmd = [
@@ -285,7 +391,7 @@ class SandboxedExecutor:
                 return {"error": f"Execution failed (code {result.returncode})"}
 
             try:
-                return json.loads(result.stdout.strip())
+                return _loads(result.stdout.strip())
             except json.JSONDecodeError:
                 return {"error": "Invalid output format from plugin"}
 
@@ -1,5 +1,7 @@
 from datetime import datetime
+import hashlib
 import time
+import uuid
 import redis.exceptions
 
 try:
@@ -9,7 +11,8 @@ try:
         return json.loads(x)
 
     def _json_dumps(x):
-        return json.dumps(x).decode("utf-8")
+        # Redis accepts the bytes as they are, no need to decode them to str
+        return json.dumps(x)
 
 except ImportError:
     import json
@@ -21,9 +24,28 @@ except ImportError:
         return json.dumps(x)
 
 
-from typing import Any, Dict, List, Optional
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional, Union
 from logging import Logger
 from redis import Redis
+from utils.cache_utils import TTLCache
+
+
+class InvalidTimeseriesError(ValueError):
+    """Raised when timestamps of a bulk upload are invalid, listing each of them."""
+
+    def __init__(self, errors: Dict[str, str]):
+        """
+        Args:
+            errors (Dict[str, str]): Error message per invalid timestamp
+        """
+        super().__init__(next(iter(errors.values())))
+        self.errors = errors
+
+
+def _decode_field(field: Union[bytes, str]) -> str:
+    """Decode a hash field name returned by a client without decode_responses."""
+    return field.decode("utf-8") if isinstance(field, bytes) else field
 
 
 class TimeSeriesManager:
@@ -39,15 +61,58 @@ class TimeSeriesManager:
         bool: True if added successfully, False otherwise
     """
 
-    def __init__(self, redis_client: Redis, logger: Logger):
+    def __init__(
+        self,
+        redis_client: Redis,
+        logger: Logger,
+        cache_ttl: float = 10.0,
+        cache_maxsize: int = 32,
+        background_executor: Optional[Executor] = None,
+    ):
         self.redis = redis_client
         self.logger = logger
         self._ttl_seconds = 3600 * 2  # 2 hours
+        # Raw session reads, shared by requests polling the same session
+        self._cache = TTLCache(maxsize=cache_maxsize, ttl=cache_ttl)
+        # Session reads decoded into per-series columns, see get_series_many
+        self._column_cache = TTLCache(maxsize=cache_maxsize, ttl=cache_ttl)
+        # Single series built from the columns, several per session read
+        self._series_cache = TTLCache(maxsize=cache_maxsize * 16, ttl=cache_ttl)
+        # Built series are also kept in Redis briefly, shared by all workers
+        self._shared_series_ttl = 60
+        # Runs the writes of built series to Redis after the request is
+        # answered; without one they are written before returning
+        self._background_executor = background_executor
 
     def _get_key(self, token: str) -> str:
         """Generate Redis key for a given token."""
         return f"session:{token}"
 
+    def _get_version_key(self, token: str) -> str:
+        """Generate Redis key of the session's data version counter."""
+        return f"session:{token}:version"
+
+    def _get_series_key(self, token: str, version: str, query_key: tuple) -> str:
+        """Generate Redis key of a built series for a session data version."""
+        digest = hashlib.blake2b(repr(query_key).encode(), digest_size=16).hexdigest()
+        return f"session:{token}:series:{_decode_field(version)}:{digest}"
+
+    def _new_version(self) -> str:
+        """Generate a new, unique session data version."""
+        return uuid.uuid4().hex
+
+    def get_version(self, token: str) -> Optional[str]:
+        """
+        Get the session's data version, replaced on every write.
+
+        Part of the cache keys, so that writes made by any worker invalidate the
+        cached reads and responses of all workers. None if the session has no data.
+        """
+        return self._retry_redis_operation(
+            lambda: self.redis.get(self._get_version_key(token)),
+            f"get_version for token {token}",
+        )
+
     def _refresh_ttl(self, token: str) -> None:
         """Refresh the TTL for an active session to keep it alive."""
         key = self._get_key(token)
@@ -121,8 +186,9 @@ class TimeSeriesManager:
         def operation():
             # Use hscan_iter for non-blocking iteration
             session_data = {}
+            # Values are kept as raw bytes, which the JSON parser reads directly
             for field, value in self.redis.hscan_iter(key):
-                session_data[field] = value
+                session_data[_decode_field(field)] = value
 
             # Refresh TTL
             if session_data:
@@ -138,28 +204,6 @@ class TimeSeriesManager:
             self.logger.error(f"Error retrieving session data for token {token}: {e}")
             raise e
 
-    def _fetch_chunked_data(
-        self, key: str, filtered_keys: List[str], chunk_size: int = 300
-    ) -> Dict[str, Any]:
-        """Fetch data from Redis in chunks to avoid connection resets."""
-        filtered_data = {}
-        for i in range(
-            0, len(filtered_keys), chunk_size
-        ):  # linter wciska spacje, a potem na nią narzeka :|
-            chunk = filtered_keys[i : i + chunk_size]  # noqa: E203
-
-            pipeline = self.redis.pipeline()
-            pipeline.hmget(key, chunk)
-            if i == 0:
-                pipeline.expire(key, self._ttl_seconds)
-            results = pipeline.execute()
-
-            values = results[0]
-            chunk_data = {ts: val for ts, val in zip(chunk, values) if val is not None}
-            filtered_data.update(chunk_data)
-
-        return filtered_data
-
     def _get_redis_subset(
         self,
         token: str,
@@ -179,21 +223,26 @@ class TimeSeriesManager:
         key = self._get_key(token)
 
         def operation():
-            filtered_keys = []
+            filtered_data = {}
             datetime_start, datetime_end = self._parse_dates(start, end)
 
-            # Use hscan_iter for non-blocking iteration
-            for field, _ in self.redis.hscan_iter(key):
+            # Use hscan_iter for non-blocking iteration. The scan already returns
+            # the values, so matching ones are kept instead of fetched again.
+            for field, value in self.redis.hscan_iter(key):
+                field = _decode_field(field)
                 if self._matches_time_filter(
                     field, timestamp, datetime_start, datetime_end
                 ):
-                    filtered_keys.append(field)
+                    filtered_data[field] = value
 
-            if not filtered_keys:
+            if not filtered_data:
                 self.logger.info(f"No data found for token {token} with given filters.")
                 return {}
 
-            return self._fetch_chunked_data(key, filtered_keys)
+            # Refresh TTL
+            self.redis.expire(key, self._ttl_seconds)
+
+            return filtered_data
 
         try:
             return self._retry_redis_operation(
@@ -369,12 +418,143 @@ class TimeSeriesManager:
             json_value = _json_dumps(data)
             pipeline.hset(key, time, json_value)
             pipeline.expire(key, self._ttl_seconds)
+            pipeline.set(
+                self._get_version_key(token), self._new_version(), ex=self._ttl_seconds
+            )
+            pipeline.execute()
+            return True
+        except Exception as e:
+            self.logger.error(f"Error adding timeseries for token {token}: {e}")
+            return False
+
+    def add_timeseries_bulk(
+        self, token: str, items: Dict[str, dict], chunk_size: int = 1000
+    ) -> bool:
+        """
+        Add many timestamps to the session at once.
+
+        All items are validated before Redis is touched, then written in a
+        single MULTI/EXEC transaction, so either every timestamp is stored or
+        none is.
+
+        Args:
+            token (str): The token identifying the session
+            items (Dict[str, dict]): Timestamp to {category: {filename: value}} mapping
+            chunk_size (int): Maximum number of fields written by a single HSET
+
+        Raises:
+            ValueError: If items is not a dictionary
+            InvalidTimeseriesError: If any timestamps or their data are invalid,
+                with the errors of all of them
+
+        Returns:
+            bool: True if added successfully, False otherwise
+        """
+        if not isinstance(items, dict):
+            raise ValueError(f"Invalid data format: {items}. Expected a dictionary.")
+
+        mapping = {}
+        errors = {}
+        for timestamp, data in items.items():
+            try:
+                self._validate_parameters(time=timestamp)
+                if not isinstance(data, dict):
+                    raise ValueError(
+                        f"Invalid data format: {data}. Expected a dictionary."
+                    )
+                if not data:
+                    raise ValueError("Data cannot be empty.")
+            except ValueError as e:
+                errors[timestamp] = str(e)
+                continue
+            if not errors:
+                # Nothing will be stored once an item failed, skip encoding the rest
+                mapping[timestamp] = _json_dumps(data)
+        if errors:
+            raise InvalidTimeseriesError(errors)
+
+        if not mapping:
+            return True  # nothing to store
+
+        key = self._get_key(token)
+
+        try:
+            pipeline = self.redis.pipeline(transaction=True)
+            if len(mapping) <= chunk_size:
+                # Most uploads fit in a single HSET, which needs no copy of the mapping
+                pipeline.hset(key, mapping=mapping)
+            else:
+                fields = list(mapping)
+                for i in range(0, len(fields), chunk_size):
+                    chunk = fields[i : i + chunk_size]  # noqa: E203
+                    pipeline.hset(
+                        key, mapping={field: mapping[field] for field in chunk}
+                    )
+            pipeline.expire(key, self._ttl_seconds)
+            pipeline.set(
+                self._get_version_key(token), self._new_version(), ex=self._ttl_seconds
+            )
             pipeline.execute()
             return True
         except Exception as e:
             self.logger.error(f"Error adding timeseries for token {token}: {e}")
             return False
 
+    def _get_raw_data(
+        self,
+        token: str,
+        timestamp: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        version: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Read the raw session hash, restricted to the time filters if given.
+
+        Reads are cached for a few seconds per session data version, which is
+        looked up unless the caller already knows it.
+        """
+
+        def read():
+            if timestamp or start or end:
+                return self._get_redis_subset(token, timestamp, start, end)
+            return self._get_session_data(token)
+
+        if version is None:
+            version = self.get_version(token)
+        cache_key = (token, version, timestamp, start, end)
+        return self._cache.get_or_set(cache_key, read)
+
+    def _select_timeseries(
+        self,
+        raw_data: Dict[str, Any],
+        timestamp: Optional[str] = None,
+        filename: Optional[str] = None,
+        category: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        filenames: Optional[list] = None,
+        categories: Optional[list] = None,
+    ) -> dict:
+        """Decode and filter raw session data for a single query."""
+        if not raw_data:
+            return {}
+
+        # Convert single values to lists for unified processing
+        category_filter = (
+            categories if categories else ([category] if category else None)
+        )
+        filename_filter = filenames if filenames else ([filename] if filename else None)
+
+        return self._process_data(
+            raw_data,
+            timestamp=timestamp,
+            start=start,
+            end=end,
+            categories=category_filter,
+            filenames=filename_filter,
+        )
+
     def get_timeseries(
         self,
         token: str,
@@ -402,28 +582,244 @@ class TimeSeriesManager:
             timestamp, filename, category, start, end, filenames, categories
         )
 
-        if timestamp or start or end:
-            raw_data = self._get_redis_subset(token, timestamp, start, end)
-        else:
-            raw_data = self._get_session_data(token)
+        raw_data = self._get_raw_data(token, timestamp, start, end)
+        return self._select_timeseries(
+            raw_data, timestamp, filename, category, start, end, filenames, categories
+        )
 
-        if not raw_data:
+    def get_timeseries_many(self, token: str, queries: List[dict]) -> List[dict]:
+        """
+        Retrieve several timeseries selections from one session.
+
+        All series of a session live in the same Redis hash, so queries sharing
+        the same time filters are answered from a single read of that hash.
+
+        Args:
+            token (str): The token identifying the session
+            queries (List[dict]): Keyword arguments of get_timeseries (without token)
+        Returns:
+            List[dict]: Timeseries data for each query, in the order of queries
+        """
+        for query in queries:
+            self._validate_parameters(
+                query.get("timestamp"),
+                query.get("filename"),
+                query.get("category"),
+                query.get("start"),
+                query.get("end"),
+                query.get("filenames"),
+                query.get("categories"),
+            )
+
+        raw_by_filters = {}
+        results = []
+        for query in queries:
+            filters = (query.get("timestamp"), query.get("start"), query.get("end"))
+            if filters not in raw_by_filters:
+                raw_by_filters[filters] = self._get_raw_data(token, *filters)
+            results.append(self._select_timeseries(raw_by_filters[filters], **query))
+        return results
+
+    def _build_columns(
+        self,
+        raw_data: Dict[str, Any],
+        timestamp: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> Dict[tuple, tuple]:
+        """
+        Decode raw session data into columns of numeric values per series.
+
+        Args:
+            raw_data (Dict[str, Any]): Raw data from Redis
+            timestamp (str, optional): Specific timestamp to filter by
+            start (str, optional): Start of the time interval
+            end (str, optional): End of the time interval
+
+        Returns:
+            Dict[tuple, tuple]: (timestamps, values) lists keyed by (category, filename)
+        """
+        columns = {}
+        datetime_start, datetime_end = self._parse_dates(start, end)
+
+        for ts_key, ts_value in raw_data.items():
+            if not self._matches_time_filter(
+                ts_key, timestamp, datetime_start, datetime_end
+            ):
+                continue
+            try:
+                values = _json_loads(ts_value)
+            except (json.JSONDecodeError, ValueError) as e:
+                self.logger.error(f"Error decoding JSON for timestamp {ts_key}: {e}")
+                continue
+
+            for category, files in values.items():
+                if not isinstance(files, dict):
+                    continue
+                for filename, value in files.items():
+                    if not isinstance(value, (int, float)):
+                        continue
+                    column = columns.get((category, filename))
+                    if column is None:
+                        column = columns[(category, filename)] = ([], [])
+                    column[0].append(ts_key)
+                    column[1].append(float(value))
+
+        return columns
+
+    def _get_columns(
+        self,
+        token: str,
+        version: Optional[str],
+        timestamp: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> Dict[tuple, tuple]:
+        """Decoded columns of the session, cached per session data version."""
+
+        def build():
+            raw_data = self._get_raw_data(token, timestamp, start, end, version)
+            return self._build_columns(raw_data, timestamp, start, end)
+
+        cache_key = (token, version, timestamp, start, end)
+        return self._column_cache.get_or_set(cache_key, build)
+
+    def _get_shared_series(
+        self, token: str, version: str, query_keys: List[tuple]
+    ) -> Dict[tuple, dict]:
+        """Read series built by any worker from Redis, in a single MGET."""
+        keys = [self._get_series_key(token, version, key) for key in query_keys]
+        try:
+            payloads = self.redis.mget(keys)
+        except Exception as e:
+            self.logger.warning(f"Failed to read cached series for token {token}: {e}")
             return {}
+        return {
+            query_key: _json_loads(payload)
+            for query_key, payload in zip(query_keys, payloads)
+            if payload is not None
+        }
+
+    def _set_shared_series(
+        self, token: str, version: str, series_by_key: Dict[tuple, dict]
+    ) -> None:
+        """Store built series in Redis for the other workers."""
+        try:
+            pipeline = self.redis.pipeline(transaction=False)
+            for query_key, series in series_by_key.items():
+                pipeline.set(
+                    self._get_series_key(token, version, query_key),
+                    _json_dumps(series),
+                    ex=self._shared_series_ttl,
+                )
+            pipeline.execute()
+        except Exception as e:
+            self.logger.warning(f"Failed to cache series for token {token}: {e}")
 
-        # Convert single values to lists for unified processing
-        category_filter = (
-            categories if categories else ([category] if category else None)
-        )
-        filename_filter = filenames if filenames else ([filename] if filename else None)
+    def get_series_many(
+        self, token: str, queries: List[dict], version: Optional[str] = None
+    ) -> List[dict]:
+        """
+        Retrieve the numeric values of several single series from one session.
 
-        return self._process_data(
-            raw_data,
+        Unlike get_timeseries, which rebuilds the nested
+        {timestamp: {category: {filename: value}}} structure on every call,
+        the session is decoded once into columns per (category, filename),
+        from which each series is read directly. Timestamps without a numeric
+        value for a series are left out of it.
+
+        Built series are cached per session data version in the worker, and
+        for a minute in Redis, where the other workers find them without
+        reading the whole session. With a background executor that write
+        does not delay the caller.
+
+        Args:
+            token (str): The token identifying the session
+            queries (List[dict]): filename and category of each series, with
+                optional timestamp, start and end filters
+            version (str, optional): Session data version, when the caller
+                already read it; saves a Redis round trip
+        Returns:
+            List[dict]: {timestamp: value} series for each query, in the order
+                of queries. The dicts are cached per session data version and
+                shared between callers, so they must not be modified.
+        """
+        for query in queries:
+            self._validate_parameters(
+                query.get("timestamp"),
+                query.get("filename"),
+                query.get("category"),
+                query.get("start"),
+                query.get("end"),
+            )
+
+        if version is None:
+            version = self.get_version(token)
+        query_keys = [
+            (query.get("timestamp"), query.get("start"), query.get("end"))
+            + (query.get("category"), query.get("filename"))
+            for query in queries
+        ]
+        found = {}
+        for query_key in query_keys:
+            series = self._series_cache.get((token, version) + query_key)
+            if series is not None:
+                found[query_key] = series
+
+        missing = [key for key in dict.fromkeys(query_keys) if key not in found]
+        cached = set(found)
+        if missing and version is not None:
+            found.update(self._get_shared_series(token, version, missing))
+            missing = [key for key in missing if key not in found]
+
+        columns_by_filters = {}
+        for query_key in missing:
+            filters, series_key = query_key[:3], query_key[3:]
+            if filters not in columns_by_filters:
+                columns_by_filters[filters] = self._get_columns(
+                    token, version, *filters
+                )
+            timestamps, values = columns_by_filters[filters].get(series_key, ((), ()))
+            found[query_key] = dict(zip(timestamps, values))
+        if missing and version is not None:
+            built = {key: found[key] for key in missing}
+            if self._background_executor is None:
+                self._set_shared_series(token, version, built)
+            else:
+                # Only the other workers read them, the caller need not wait
+                self._background_executor.submit(
+                    self._set_shared_series, token, version, built
+                )
+
+        for query_key, series in found.items():
+            if query_key not in cached:
+                self._series_cache.set((token, version) + query_key, series)
+        return [found[query_key] for query_key in query_keys]
+
+    def get_series(
+        self,
+        token: str,
+        filename: str,
+        category: str,
+        timestamp: str = None,
+        start: str = None,
+        end: str = None,
+        version: Optional[str] = None,
+    ) -> dict:
+        """
+        Retrieve the numeric values of a single series, see get_series_many.
+
+        Returns:
+            dict: {timestamp: value} series
+        """
+        query = dict(
+            filename=filename,
+            category=category,
             timestamp=timestamp,
             start=start,
             end=end,
-            categories=category_filter,
-            filenames=filename_filter,
         )
+        return self.get_series_many(token, [query], version)[0]
 
     def clear_timeseries(self, token: str) -> dict:
         """
@@ -435,6 +831,10 @@ class TimeSeriesManager:
         try:
             key = self._get_key(token)
             self.redis.delete(key)
+            # Replaced rather than deleted, so cached reads can never match again
+            self.redis.set(
+                self._get_version_key(token), self._new_version(), ex=self._ttl_seconds
+            )
             return {"message": "All timeseries data cleared successfully."}, 200
         except Exception as e:
             self.logger.error(f"Error clearing timeseries for token {token}: {e}")
@@ -0,0 +1,87 @@
+"""
+Unit tests for cache_utils.py
+
+Tests the TTLCache expiry, LRU eviction and get_or_set behaviour.
+"""
+
+import unittest
+from unittest.mock import patch, MagicMock
+
+from utils.cache_utils import TTLCache
+
+
+class TestTTLCache(unittest.TestCase):
+    """Tests for TTLCache."""
+
+    def test_get_returns_stored_value(self):
+        """Test a stored value is returned until it expires."""
+        # Arrange
+        cache = TTLCache(maxsize=2, ttl=10)
+
+        # Act
+        cache.set("key", "value")
+
+        # Assert
+        self.assertEqual(cache.get("key"), "value")
+        self.assertIsNone(cache.get("missing"))
+
+    def test_entries_expire_after_ttl(self):
+        """Test entries are dropped once their TTL has elapsed."""
+        # Arrange
+        cache = TTLCache(maxsize=2, ttl=10)
+        with patch("utils.cache_utils.time.monotonic", return_value=100.0):
+            cache.set("key", "value")
+
+        # Act
+        with patch("utils.cache_utils.time.monotonic", return_value=110.0):
+            result = cache.get("key", "expired")
+
+        # Assert
+        self.assertEqual(result, "expired")
+        self.assertEqual(len(cache), 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test the least recently used entry is evicted when the cache is full."""
+        # Arrange
+        cache = TTLCache(maxsize=2, ttl=10)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+
+        # Act
+        cache.set("c", 3)
+
+        # Assert
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_get_or_set_calls_factory_once(self):
+        """Test get_or_set only computes the value on a miss."""
+        # Arrange
+        cache = TTLCache(maxsize=2, ttl=10)
+        factory = MagicMock(return_value={})
+
+        # Act
+        first = cache.get_or_set("key", factory)
+        second = cache.get_or_set("key", factory)
+
+        # Assert
+        self.assertIs(first, second)
+        factory.assert_called_once()
+
+    def test_clear(self):
+        """Test clear drops all entries."""
+        # Arrange
+        cache = TTLCache(maxsize=2, ttl=10)
+        cache.set("key", "value")
+
+        # Act
+        cache.clear()
+
+        # Assert
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Unit tests for compression_utils.py
+
+Tests the gzip compression of JSON responses.
+"""
+
+import gzip
+import unittest
+
+from flask import Flask, jsonify, request
+
+from utils.compression_utils import gzip_response
+
+
+class TestGzipResponse(unittest.TestCase):
+    """Tests for gzip_response."""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.payload = {
+            f"2024-01-01T00:{i // 60:02d}:{i % 60:02d}": i for i in range(500)
+        }
+
+        @self.app.route("/large")
+        def large():
+            response = jsonify(self.payload)
+            response.set_etag("abc")
+            return response
+
+        @self.app.route("/small")
+        def small():
+            return jsonify({"status": "ok"})
+
+        @self.app.route("/text")
+        def text():
+            return "x" * 5000
+
+        self.app.after_request(lambda response: gzip_response(response, request))
+        self.client = self.app.test_client()
+
+    def test_large_json_is_compressed(self):
+        """Test a large JSON body is gzipped and decompresses to the original."""
+        # Act
+        response = self.client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+        # Assert
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        self.assertEqual(
+            self.app.json.loads(gzip.decompress(response.get_data())), self.payload
+        )
+        self.assertEqual(
+            int(response.headers["Content-Length"]), len(response.get_data())
+        )
+
+    def test_etag_becomes_weak(self):
+        """Test the ETag of a compressed body is made weak."""
+        # Act
+        response = self.client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+        # Assert
+        self.assertEqual(response.get_etag(), ("abc", True))
+
+    def test_not_compressed_without_accept_encoding(self):
+        """Test clients not accepting gzip get the plain body."""
+        # Act
+        response = self.client.get("/large", headers={"Accept-Encoding": "identity"})
+
+        # Assert
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        self.assertEqual(response.get_json(), self.payload)
+        self.assertEqual(response.get_etag(), ("abc", False))
+
+    def test_small_body_is_not_compressed(self):
+        """Test bodies below the minimum size are left uncompressed."""
+        # Act
+        response = self.client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+        # Assert
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertEqual(response.get_json(), {"status": "ok"})
+
+    def test_other_mimetypes_are_not_compressed(self):
+        """Test non JSON responses are left untouched."""
+        # Act
+        response = self.client.get("/text", headers={"Accept-Encoding": "gzip"})
+
+        # Assert
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertNotIn("Vary", response.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
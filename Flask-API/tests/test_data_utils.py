@@ -0,0 +1,145 @@
+"""
+Unit tests for data_utils.py
+
+Tests pivoting uploaded CSV and JSON files and rounding series to float32.
+"""
+
+import io
+import math
+import unittest
+
+import numpy as np
+import orjson
+
+from utils.data_utils import pivot_file, to_float32
+
+
+def _upload(content, filename):
+    file = io.BytesIO(content.encode())
+    file.filename = filename
+    return file
+
+
+CSV = 'log_date,data_type,value,note\n1,30,"1,5",x\n1,30,2.5,y\n1,31,4,z\n2,31,x,w\n'
+
+
+class TestPivotFile(unittest.TestCase):
+    """Tests for pivot_file."""
+
+    def test_pivot_csv(self):
+        """Test duplicates are averaged and rows without numeric values dropped."""
+        # Act
+        result = pivot_file(_upload(CSV, "a.csv"), "log_date", "data_type", "value")
+
+        # Assert
+        self.assertEqual(
+            result, [{"log_date": "1", "data_type_30": 2.0, "data_type_31": 4.0}]
+        )
+
+    def test_missing_cells_are_nan(self):
+        """Test cells without values are NaN."""
+        # Arrange
+        content = "d,t,v\n1,a,1\n2,b,2\n"
+
+        # Act
+        result = pivot_file(_upload(content, "a.csv"), "d", "t", "v", layout="columns")
+
+        # Assert
+        self.assertEqual(result["t_a"][0], 1.0)
+        self.assertTrue(math.isnan(result["t_a"][1]))
+        self.assertTrue(math.isnan(result["t_b"][0]))
+
+    def test_chunked_csv_matches_whole_file(self):
+        """Test chunks spanning duplicate cells give the same means."""
+        # Act
+        whole = pivot_file(
+            _upload(CSV, "a.csv"), "log_date", "data_type", "value", layout="columns"
+        )
+        chunked = pivot_file(
+            _upload(CSV, "a.csv"),
+            "log_date",
+            "data_type",
+            "value",
+            layout="columns",
+            chunksize=1,
+        )
+
+        # Assert
+        self.assertEqual(whole["log_date"], chunked["log_date"])
+        self.assertEqual(whole["data_type_30"][0], chunked["data_type_30"][0])
+        self.assertEqual(whole["data_type_31"][0], chunked["data_type_31"][0])
+
+    def test_pivot_json(self):
+        """Test JSON records are pivoted like CSV rows."""
+        # Arrange
+        content = '[{"d": "2024-01-01", "t": "a", "v": 1}, {"d": "2024-01-01", "t": "b", "v": 3}]'
+
+        # Act
+        result = pivot_file(_upload(content, "a.json"), "d", "t", "v", layout="columns")
+
+        # Assert
+        self.assertEqual(result, {"d": ["2024-01-01"], "t_a": [1.0], "t_b": [3.0]})
+
+    def test_missing_columns_raise(self):
+        """Test missing pivot columns are reported."""
+        # Act & Assert
+        with self.assertRaisesRegex(ValueError, "Missing columns in the data: value"):
+            pivot_file(
+                _upload("log_date,data_type\n1,30\n", "a.csv"),
+                "log_date",
+                "data_type",
+                "value",
+            )
+
+    def test_unsupported_format_raises(self):
+        """Test files other than CSV and JSON are rejected."""
+        # Act & Assert
+        with self.assertRaisesRegex(ValueError, "Unsupported file format"):
+            pivot_file(_upload("", "a.txt"), "log_date", "data_type", "value")
+
+
+class TestToFloat32(unittest.TestCase):
+    """Tests for to_float32."""
+
+    def test_floats_are_rounded_to_float32(self):
+        """Test floats become float32 while other values are kept."""
+        # Arrange
+        data = {"2024-01-01": {"cat": {"a.csv": 0.1, "b.csv": 3, "c.csv": None}}}
+
+        # Act
+        result = to_float32(data)
+
+        # Assert
+        values = result["2024-01-01"]["cat"]
+        self.assertIsInstance(values["a.csv"], np.float32)
+        self.assertEqual(values["b.csv"], 3)
+        self.assertIsInstance(values["b.csv"], int)
+        self.assertIsNone(values["c.csv"])
+        self.assertEqual(data["2024-01-01"]["cat"]["a.csv"], 0.1)
+
+    def test_non_dict_categories_are_kept(self):
+        """Test category values which are not file dicts are passed through."""
+        # Arrange
+        data = {"t": {"cat": 5, "other": {"a.csv": 0.5}}}
+
+        # Act
+        result = to_float32(data)
+
+        # Assert
+        self.assertEqual(result["t"]["cat"], 5)
+        self.assertIsInstance(result["t"]["other"]["a.csv"], np.float32)
+
+    def test_serialized_with_float32_digits(self):
+        """Test orjson writes the shortest float32 representation."""
+        # Act
+        body = orjson.dumps(
+            to_float32({"t": {"cat": {"a.csv": 1 / 3}}}),
+            option=orjson.OPT_SERIALIZE_NUMPY,
+        )
+
+        # Assert
+        self.assertEqual(body, b'{"t":{"cat":{"a.csv":0.33333334}}}')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Unit tests for json_provider.py
+
+Tests the orjson based Flask JSON provider.
+"""
+
+import datetime
+import unittest
+
+import numpy as np
+from flask import Flask, jsonify
+
+from utils.json_provider import OrjsonProvider
+
+
+class TestOrjsonProvider(unittest.TestCase):
+    """Tests for OrjsonProvider."""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.json = OrjsonProvider(self.app)
+
+    def test_nan_and_inf_are_serialized_as_null(self):
+        """Test NaN and infinities produce valid JSON."""
+        # Act
+        result = self.app.json.dumps({"a": float("nan"), "b": float("inf")})
+
+        # Assert
+        self.assertEqual(result, '{"a":null,"b":null}')
+
+    def test_numpy_values_and_sorted_keys(self):
+        """Test numpy types are serialized and keys are sorted."""
+        # Act
+        result = self.app.json.dumps(
+            {"b": np.array([1.0, np.nan]), "a": np.float64(2.5), 1: np.int64(3)}
+        )
+
+        # Assert
+        self.assertEqual(result, '{"1":3,"a":2.5,"b":[1.0,null]}')
+
+    def test_fallback_to_default_for_other_types(self):
+        """Test types orjson does not know use Flask's default serialization."""
+        # Act
+        result = self.app.json.dumps({"d": datetime.date(2024, 1, 2)})
+
+        # Assert
+        self.assertEqual(result, '{"d":"Tue, 02 Jan 2024 00:00:00 GMT"}')
+
+    def test_loads_accepts_nan_literals(self):
+        """Test input with NaN literals is still parsed."""
+        # Act
+        result = self.app.json.loads('{"a": NaN, "b": 1}')
+
+        # Assert
+        self.assertTrue(np.isnan(result["a"]))
+        self.assertEqual(result["b"], 1)
+
+    def test_jsonify_response(self):
+        """Test jsonify builds a JSON response with the provider."""
+        # Act
+        with self.app.app_context():
+            response = jsonify({"mean": float("nan")})
+
+        # Assert
+        self.assertEqual(response.mimetype, "application/json")
+        self.assertEqual(response.get_data(as_text=True), '{"mean":null}\n')
+
+    def test_ndjson_lines(self):
+        """Test records are serialized lazily, one JSON document per line."""
+        # Act
+        lines = self.app.json.ndjson_lines(
+            ({"t": t, "v": v} for t, v in [("a", 1.0), ("b", np.nan)])
+        )
+
+        # Assert
+        self.assertEqual(next(lines), b'{"t":"a","v":1.0}\n')
+        self.assertEqual(list(lines), [b'{"t":"b","v":null}\n'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
+from unittest.mock import patch
 import pandas as pd
 import numpy as np
+import services.metric_service as metric_service
 from services.metric_service import (
     extract_series_from_dict,
     calculate_basic_statistics,
@@ -15,7 +17,12 @@ from services.metric_service import (
     calculate_cosine_similarity,
     calculate_mae,
     calculate_rmse,
+    calculate_comparison_metrics,
+    align_series,
+    format_timestamps,
     get_aligned_data,
+    parse_series,
+    series_values,
 )
 
 
@@ -81,6 +88,29 @@ class TestExtractSeriesFromDict(unittest.TestCase):
         expected = {"2023-01-01": 1}
         self.assertEqual(result, expected)
 
+    def test_values_converted_to_float(self):
+        # Arrange
+        data = {
+            "2023-01-01": {"category1": {"file1": 1}},
+            "2023-01-02": {"category1": {"file1": 2.5}},
+            "2023-01-03": {"category2": {"file1": 3}},
+        }
+
+        # Act
+        result = extract_series_from_dict(data, " category1 ", "file1 ")
+
+        # Assert
+        self.assertEqual(result, {"2023-01-01": 1.0, "2023-01-02": 2.5})
+        self.assertTrue(all(type(value) is float for value in result.values()))
+
+    def test_non_dict_entry(self):
+        # Arrange
+        data = {"2023-01-01": [1, 2]}
+
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            extract_series_from_dict(data, "category1", "file1")
+
 
 class TestCalculateBasicStatistics(unittest.TestCase):
     def test_typical_series(self):
@@ -119,11 +149,51 @@ class TestCalculateBasicStatistics(unittest.TestCase):
         self.assertFalse(pd.isna(stats["variance"]))
         self.assertFalse(pd.isna(stats["std_dev"]))
 
+    def test_all_nan_values(self):
+        series = {"2023-01-01": np.nan, "2023-01-02": np.nan}
+        stats = calculate_basic_statistics(series)
+        self.assertTrue(np.isnan(stats["mean"]))
+        self.assertTrue(np.isnan(stats["median"]))
+        self.assertTrue(np.isnan(stats["variance"]))
+        self.assertTrue(np.isnan(stats["std_dev"]))
+
     def test_string_values(self):
         series = {"2023-01-01": "a", "2023-01-02": "b"}
         result = calculate_basic_statistics(series)
         self.assertTrue(isinstance(result, str) or "error" in result)
 
+    def test_mixed_numeric_types(self):
+        series = {"2023-01-01": 1, "2023-01-02": np.float64(2.0), "2023-01-03": 3.0}
+        stats = calculate_basic_statistics(series)
+        self.assertNotIn("error", stats)
+        self.assertAlmostEqual(stats["mean"], 2.0)
+
+    def test_numeric_string_among_numbers(self):
+        series = {"2023-01-01": 1.0, "2023-01-02": "2"}
+        stats = calculate_basic_statistics(series)
+        self.assertEqual(stats["error"], "series values must be numeric")
+
+
+class TestSeriesValues(unittest.TestCase):
+    def test_dict_is_converted(self):
+        values = series_values({"2023-01-01": 1, "2023-01-02": 2.5})
+        np.testing.assert_array_equal(values, [1.0, 2.5])
+
+    def test_invalid_series(self):
+        self.assertIsNone(series_values({}))
+        self.assertIsNone(series_values([1, 2]))
+        self.assertIsNone(series_values({"2023-01-01": "a"}))
+
+    def test_statistics_share_values(self):
+        series = {"2023-01-01": 4.0, "2023-01-02": 1.0, "2023-01-03": 3.0}
+        values = series_values(series)
+        self.assertEqual(
+            calculate_basic_statistics(values), calculate_basic_statistics(series)
+        )
+        self.assertEqual(calculate_iqr(values), calculate_iqr(series))
+        # The median must not reorder the shared array
+        np.testing.assert_array_equal(values, [4.0, 1.0, 3.0])
+
 
 class TestCalculateAutocorrelation(unittest.TestCase):
     def test_typical_series(self):
@@ -173,6 +243,38 @@ class TestCalculateAutocorrelation(unittest.TestCase):
         # Assert
         self.assertTrue(np.isnan(acf_value))
 
+    def test_matches_lagged_correlation(self):
+        # Arrange
+        values = np.random.default_rng(0).normal(size=50).cumsum()
+        series = {f"2023-01-01T00:{i:02d}:00": v for i, v in enumerate(values)}
+        centered = values - values.mean()
+
+        # Act
+        acf_value = calculate_autocorrelation(series, lag=3)
+
+        # Assert
+        expected = np.dot(centered[:-3], centered[3:]) / np.dot(centered, centered)
+        self.assertAlmostEqual(acf_value, expected)
+
+    def test_lag_not_shorter_than_series(self):
+        # Act
+        acf_value = calculate_autocorrelation({"2023-01-01": 1.0})
+
+        # Assert
+        self.assertTrue(np.isnan(acf_value))
+
+    def test_constant_series(self):
+        # Act
+        acf_value = calculate_autocorrelation({"2023-01-01": 3, "2023-01-02": 3})
+
+        # Assert
+        self.assertTrue(np.isnan(acf_value))
+
+    def test_invalid_lag(self):
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            calculate_autocorrelation({"2023-01-01": 1, "2023-01-02": 2}, lag=0)
+
 
 class TestCalculateCoefficientOfVariation(unittest.TestCase):
     def test_typical_series(self):
@@ -242,6 +344,17 @@ class TestCalculateCoefficientOfVariation(unittest.TestCase):
         # Assert
         self.assertTrue(np.isnan(cv))
 
+    def test_single_value(self):
+
+        # Arrange
+        series = {"2023-01-01": 5}
+
+        # Act
+        cv = calculate_coefficient_of_variation(series)
+
+        # Assert
+        self.assertTrue(np.isnan(cv))
+
 
 class TestCalculateIQR(unittest.TestCase):
     def test_typical_series(self):
@@ -327,6 +440,21 @@ class TestCalculatePearsonCorrelation(unittest.TestCase):
         # Assert
         self.assertAlmostEqual(correlation, -1.0)
 
+    def test_constant_non_integer_series_is_nan(self):
+
+        # Arrange
+        dates = [f"2023-01-0{day}" for day in range(1, 8)]
+        series1 = dict(zip(dates, [3.1, 0.2, 5.7, 1.4, 9.9, 2.6, 4.8]))
+        series2 = dict(zip(dates, np.full(7, 6.0647).tolist()))
+
+        # Act
+        correlation = calculate_pearson_correlation(series1, series2)
+        metrics = calculate_comparison_metrics(series1, series2)
+
+        # Assert
+        self.assertTrue(np.isnan(correlation))
+        self.assertTrue(np.isnan(metrics["pearson_correlation"]))
+
     def test_empty_series(self):
 
         # Arrange
@@ -404,6 +532,52 @@ class TestCalculateDifference(unittest.TestCase):
         with self.assertRaises(ValueError):
             calculate_difference(series1, series2)
 
+    def test_keys_formatted_as_isoformat(self):
+        cases = [
+            (
+                {"2023-01-01T00:00:00": 3, "2023-01-01T01:00:00": 4},
+                "2023-01-01T01:00:00",
+            ),
+            (
+                {"2023-01-01T00:00:00Z": 3, "2023-01-01T01:00:00Z": 4},
+                "2023-01-01T01:00:00+00:00",
+            ),
+            (
+                {"2023-01-01T00:00:00.5": 3, "2023-01-01T01:00:00.5": 4},
+                "2023-01-01T01:00:00.500000",
+            ),
+            (
+                {"2023-01-01T00:00:00+02:00": 3, "2023-01-01T01:00:00+02:00": 4},
+                "2023-01-01T01:00:00+02:00",
+            ),
+        ]
+        for series, last_key in cases:
+            with self.subTest(last_key=last_key):
+                result = calculate_difference(series, series)
+                self.assertEqual(list(result), [list(result)[0], last_key])
+                self.assertEqual(list(result.values()), [0.0, 0.0])
+
+
+class TestFormatTimestamps(unittest.TestCase):
+    def test_matches_isoformat(self):
+        cases = [
+            ["2023-01-01T00:00:00", "2023-01-01T01:00:00"],
+            ["2023-01-01T00:00:00Z", "2023-01-01T01:00:00Z"],
+            ["2023-01-01T00:00:00.25", "2023-01-01T01:00:00"],
+            ["2023-01-01T00:00:00+02:00", "2023-01-01T01:00:00+02:00"],
+            ["2023-01-01T00:00:00.5-05:30", "2023-01-01T01:00:00.000001-05:30"],
+            ["2023-01-01T00:00:00.000000001", "2023-01-01T01:00:00"],
+        ]
+        for timestamps in cases:
+            with self.subTest(timestamps=timestamps):
+                index = pd.to_datetime(timestamps, format="ISO8601")
+                self.assertEqual(
+                    format_timestamps(index), [ts.isoformat() for ts in index]
+                )
+
+    def test_empty_index(self):
+        self.assertEqual(format_timestamps(pd.DatetimeIndex([])), [])
+
 
 class TestCalculateRollingMean(unittest.TestCase):
     def test_typical_series(self):
@@ -419,6 +593,43 @@ class TestCalculateRollingMean(unittest.TestCase):
         self.assertGreater(len(result), 0)
         self.assertEqual(len(result), 5)
 
+    def test_matches_pandas_time_window(self):
+        series = {
+            "2023-01-01 00:00": 1.0,
+            "2023-01-01 00:30": 2.0,
+            "2023-01-01 01:00": 4.0,
+            "2023-01-01 03:00": 8.0,
+            "2023-01-01 03:45": 16.0,
+        }
+        index = pd.to_datetime(list(series))
+        expected = pd.Series(list(series.values()), index=index).rolling("1h").mean()
+        result = calculate_rolling_mean(series, "1h")
+        np.testing.assert_allclose(list(result.values()), expected.to_numpy())
+
+    def test_regular_grid_matches_pandas(self):
+        index = pd.date_range("2023-01-01", periods=12, freq="10min")
+        series = {
+            timestamp.isoformat(): float(i * i) for i, timestamp in enumerate(index)
+        }
+        for window in ("10min", "25min", "30min", "5h"):
+            expected = pd.Series(list(series.values()), index=index).rolling(window)
+            result = calculate_rolling_mean(series, window)
+            np.testing.assert_allclose(
+                list(result.values()), expected.mean().to_numpy()
+            )
+
+    def test_zero_window_matches_pandas(self):
+        series = {
+            "2023-01-01 00:00:00": 1.0,
+            "2023-01-01 00:00:01": 2.0,
+            "2023-01-01 00:00:03": 4.0,
+        }
+        index = pd.to_datetime(list(series))
+        expected = pd.Series(list(series.values()), index=index).rolling("0s").mean()
+        for source in (series, (index, np.array(list(series.values())))):
+            result = calculate_rolling_mean(source, "0s")
+            np.testing.assert_allclose(list(result.values()), expected.to_numpy())
+
     def test_empty_series(self):
         result = calculate_rolling_mean({})
         self.assertEqual(result, {})
@@ -450,6 +661,76 @@ class TestCalculateDTW(unittest.TestCase):
         self.assertIsInstance(result, float)
         self.assertGreater(result, 0)
 
+    def test_same_series_has_zero_distance(self):
+        series = {"2023-01-01": 1, "2023-01-02": 5, "2023-01-03": 3}
+        self.assertEqual(calculate_dtw(series, series), 0.0)
+
+    def test_exact_distance(self):
+        series1 = {"2023-01-01": 1, "2023-01-02": 2, "2023-01-03": 3}
+        series2 = {"2023-01-01": 1.5, "2023-01-02": 2.5, "2023-01-03": 3.5}
+        self.assertAlmostEqual(calculate_dtw(series1, series2), 1.5)
+
+    def test_warped_series_have_zero_distance(self):
+        series1 = {"2023-01-01": 1, "2023-01-02": 2, "2023-01-03": 3}
+        series2 = {
+            "2023-01-01": 1,
+            "2023-01-02": 2,
+            "2023-01-03": 2,
+            "2023-01-04": 3,
+        }
+        self.assertAlmostEqual(calculate_dtw(series1, series2), 0.0)
+        self.assertAlmostEqual(calculate_dtw(series2, series1), 0.0)
+
+    def test_matches_full_dynamic_programming(self):
+        rng = np.random.default_rng(0)
+        x = rng.normal(size=40).cumsum()
+        y = rng.normal(size=25).cumsum()
+        expected = np.full((len(x) + 1, len(y) + 1), np.inf)
+        expected[0, 0] = 0
+        for i in range(1, len(x) + 1):
+            for j in range(1, len(y) + 1):
+                expected[i, j] = abs(x[i - 1] - y[j - 1]) + min(
+                    expected[i - 1, j - 1], expected[i - 1, j], expected[i, j - 1]
+                )
+        series1 = {f"2023-01-01T00:{i:02d}:00": v for i, v in enumerate(x)}
+        series2 = {f"2023-01-01T00:{i:02d}:00": v for i, v in enumerate(y)}
+        self.assertAlmostEqual(calculate_dtw(series1, series2), expected[-1, -1])
+
+    def test_radius_limits_warping(self):
+        x = [1, 1, 1, 1, 1, 2, 3]
+        y = [1, 2, 3, 3, 3, 3, 3]
+        series1 = {f"2023-01-0{i + 1}": v for i, v in enumerate(x)}
+        series2 = {f"2023-01-0{i + 1}": v for i, v in enumerate(y)}
+        self.assertAlmostEqual(calculate_dtw(series1, series2), 0.0)
+        self.assertAlmostEqual(calculate_dtw(series1, series2, radius=2), 4.0)
+        self.assertAlmostEqual(calculate_dtw(series1, series2, radius=1), 6.0)
+
+    def test_wide_radius_matches_unconstrained(self):
+        rng = np.random.default_rng(1)
+        series1 = {
+            f"2023-01-01T00:{i:02d}:00": v for i, v in enumerate(rng.normal(size=30))
+        }
+        series2 = {
+            f"2023-01-01T00:{i:02d}:00": v for i, v in enumerate(rng.normal(size=20))
+        }
+        self.assertAlmostEqual(
+            calculate_dtw(series1, series2, radius=30), calculate_dtw(series1, series2)
+        )
+
+    def test_invalid_radius(self):
+        with self.assertRaises(ValueError):
+            calculate_dtw({"2023-01-01": 1}, {"2023-01-01": 1}, radius=0)
+
+    def test_large_series_use_fastdtw(self):
+        series1 = {"2023-01-01": 1, "2023-01-02": 2, "2023-01-03": 3}
+        series2 = {"2023-01-01": 1.5, "2023-01-02": 2.5}
+        with patch("services.metric_service.EXACT_DTW_MAX_CELLS", 4), patch(
+            "services.metric_service.fastdtw", return_value=(7.0, [])
+        ) as mock_fastdtw:
+            result = calculate_dtw(series1, series2)
+        self.assertEqual(result, 7.0)
+        mock_fastdtw.assert_called_once()
+
     def test_empty_series(self):
         # Empty series now returns None instead of raising ValueError
         result = calculate_dtw({}, {"2023-01-01": 1})
@@ -568,6 +849,43 @@ class TestCalculateRMSE(unittest.TestCase):
         self.assertTrue(np.isnan(result))
 
 
+class TestCalculateComparisonMetrics(unittest.TestCase):
+    def test_matches_individual_metrics(self):
+        series1 = {"2023-01-01": 10, "2023-01-02": 20, "2023-01-03": 30}
+        series2 = {"2023-01-01": 12, "2023-01-02": 18, "2023-01-03": 33}
+        result = calculate_comparison_metrics(series1, series2)
+        self.assertAlmostEqual(
+            result["pearson_correlation"],
+            calculate_pearson_correlation(series1, series2),
+        )
+        self.assertAlmostEqual(
+            result["cosine_similarity"], calculate_cosine_similarity(series1, series2)
+        )
+        self.assertAlmostEqual(result["mae"], calculate_mae(series1, series2))
+        self.assertAlmostEqual(result["rmse"], calculate_rmse(series1, series2))
+
+    def test_selected_metrics(self):
+        series1 = {"2023-01-01": 10, "2023-01-02": 20, "2023-01-03": 30}
+        series2 = {"2023-01-01": 12, "2023-01-02": 18, "2023-01-03": 33}
+        result = calculate_comparison_metrics(series1, series2, metrics=("rmse", "mae"))
+        self.assertEqual(list(result), ["rmse", "mae"])
+        self.assertAlmostEqual(result["mae"], calculate_mae(series1, series2))
+
+    def test_constant_series(self):
+        series1 = {"2023-01-01": 1, "2023-01-02": 1, "2023-01-03": 1}
+        series2 = {"2023-01-01": 2, "2023-01-02": 3, "2023-01-03": 4}
+        result = calculate_comparison_metrics(series1, series2)
+        self.assertTrue(np.isnan(result["pearson_correlation"]))
+        self.assertAlmostEqual(result["mae"], 2.0)
+
+    def test_empty_series(self):
+        result = calculate_comparison_metrics({}, {"2023-01-01": 1})
+        self.assertEqual(
+            set(result), {"pearson_correlation", "cosine_similarity", "mae", "rmse"}
+        )
+        self.assertTrue(all(np.isnan(value) for value in result.values()))
+
+
 class TestGetAlignedData(unittest.TestCase):
     def test_with_tolerance(self):
         series1 = {"2023-01-01T00:00:00": 1, "2023-01-01T00:02:00": 2}
@@ -585,6 +903,151 @@ class TestGetAlignedData(unittest.TestCase):
         with self.assertRaises(ValueError):
             get_aligned_data([1, 2], {"2023-01-01": 1})
 
+    def test_same_series_matches_merged_alignment(self):
+        series = {"2023-01-03": 3, "2023-01-01": 1, "2023-01-02": np.nan}
+        df = get_aligned_data(series, series)
+        expected = get_aligned_data(series, dict(series))
+        pd.testing.assert_frame_equal(df, expected)
+
+    def test_matches_merge_asof_nearest(self):
+        series1 = {
+            "2023-01-01T00:00:00": 1.0,
+            "2023-01-01T00:01:15": 2.0,
+            "2023-01-01T00:03:00": 3.0,
+            "2023-01-01T00:09:00": 4.0,
+        }
+        series2 = {
+            "2023-01-01T00:00:30": 10.0,
+            "2023-01-01T00:02:00": 20.0,
+            "2023-01-01T00:03:30": np.nan,
+            "2023-01-01T00:04:00": 40.0,
+        }
+        df = get_aligned_data(series1, series2, "1min")
+        left = pd.DataFrame(
+            {"value1": list(series1.values())},
+            index=pd.DatetimeIndex(pd.to_datetime(list(series1)), name="time"),
+        )
+        right = pd.DataFrame(
+            {"value2": list(series2.values())},
+            index=pd.DatetimeIndex(pd.to_datetime(list(series2)), name="time"),
+        )
+        expected = pd.merge_asof(
+            left,
+            right,
+            left_index=True,
+            right_index=True,
+            direction="nearest",
+            tolerance=pd.Timedelta("1min"),
+        ).dropna()
+        pd.testing.assert_frame_equal(df, expected)
+        # The tie at 00:01:15 goes to the earlier 00:00:30 point
+        self.assertEqual(df["value2"].tolist(), [10.0, 10.0])
+
+    def test_negative_tolerance(self):
+        with self.assertRaises(ValueError):
+            get_aligned_data({"2023-01-01": 1}, {"2023-01-02": 2}, "-1min")
+
+    def test_same_single_point_series_not_aligned(self):
+        series = {"2023-01-01": 1}
+        self.assertTrue(get_aligned_data(series, series).empty)
+
+
+class TestAlignSeries(unittest.TestCase):
+    def test_arrays_match_aligned_frame(self):
+        series1 = {"2023-01-01": 1.0, "2023-01-02": 2.0, "2023-01-03": np.nan}
+        series2 = {"2023-01-01T01:00": 10.0, "2023-01-03T00:00": 30.0}
+        index, x, y = align_series(series1, series2, "2h")
+        df = get_aligned_data(series1, series2, "2h")
+        pd.testing.assert_index_equal(index, df.index)
+        np.testing.assert_array_equal(x, [1.0])
+        np.testing.assert_array_equal(y, [10.0])
+
+    def test_no_derivable_tolerance(self):
+        self.assertIsNone(align_series({"2023-01-01": 1}, {"2023-01-02": 2}))
+
+    def test_parsed_series_aligned_once(self):
+        parsed1 = parse_series({"2023-01-01": 1.0, "2023-01-02": 2.0})
+        parsed2 = parse_series({"2023-01-01": 3.0, "2023-01-02": 5.0})
+        with patch(
+            "services.metric_service._nearest_within",
+            wraps=metric_service._nearest_within,
+        ) as nearest_within:
+            mae = calculate_mae(parsed1, parsed2)
+            rmse = calculate_rmse(parsed1, parsed2)
+            difference = calculate_difference(parsed1, parsed2)
+        self.assertEqual(nearest_within.call_count, 1)
+        self.assertAlmostEqual(mae, 2.5)
+        self.assertAlmostEqual(rmse, np.sqrt(6.5))
+        self.assertEqual(list(difference.values()), [-2.0, -3.0])
+
+    def test_tolerance_spellings_share_alignment(self):
+        parsed1 = parse_series({"2023-01-01": 1.0, "2023-01-02": 2.0})
+        parsed2 = parse_series({"2023-01-01T00:00:30": 3.0, "2023-01-02T00:00:00": 5.0})
+        self.assertIs(
+            align_series(parsed1, parsed2, "1min"),
+            align_series(parsed1, parsed2, "60s"),
+        )
+
+    def test_invalid_tolerance(self):
+        series = {"2023-01-01": 1.0, "2023-01-02": 2.0}
+        with self.assertRaises(ValueError):
+            align_series(series, series, "not a duration")
+
+
+class TestParseSeries(unittest.TestCase):
+    def setUp(self):
+        self.series1 = {
+            "2023-01-03": 3.0,
+            "2023-01-01": 1.0,
+            "2023-01-02": 2.0,
+            "2023-01-04": 5.0,
+        }
+        self.series2 = {
+            "2023-01-01": 2,
+            "2023-01-02": 3,
+            "2023-01-03": 3,
+            "2023-01-04": 6,
+        }
+
+    def test_sorted_by_time(self):
+        index, values = parse_series(self.series1)
+        expected = ["2023-01-01", "2023-01-02", "2023-01-03", "2023-01-04"]
+        self.assertEqual(list(index), list(pd.to_datetime(expected)))
+        np.testing.assert_array_equal(values, [1.0, 2.0, 3.0, 5.0])
+        self.assertEqual(values.dtype, np.float64)
+
+    def test_parsed_series_returned_as_is(self):
+        parsed = parse_series(self.series1)
+        self.assertIs(parse_series(parsed), parsed)
+
+    def test_metrics_accept_parsed_series(self):
+        parsed1, parsed2 = parse_series(self.series1), parse_series(self.series2)
+        for metric in (
+            calculate_pearson_correlation,
+            calculate_cosine_similarity,
+            calculate_mae,
+            calculate_rmse,
+            calculate_euclidean_distance,
+            calculate_dtw,
+        ):
+            self.assertAlmostEqual(
+                metric(parsed1, parsed2), metric(self.series1, self.series2)
+            )
+        self.assertEqual(
+            calculate_difference(parsed1, parsed2),
+            calculate_difference(self.series1, self.series2),
+        )
+        self.assertEqual(
+            calculate_rolling_mean(parsed1, "2d"),
+            calculate_rolling_mean(self.series1, "2d"),
+        )
+
+    def test_empty_parsed_series(self):
+        empty = parse_series({})
+        self.assertTrue(np.isnan(calculate_mae(empty, self.series2)))
+        self.assertEqual(calculate_difference(empty, self.series2), {})
+        self.assertIsNone(calculate_dtw(empty, self.series2))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -8,7 +8,16 @@ import unittest
 import textwrap
 from unittest.mock import patch, MagicMock
 
-from services.plugin_service import validate_plugin_code, execute_plugin_code
+from services.plugin_service import (
+    MAE_TEMPLATE,
+    _check_plugin_code,
+    _validation_cache,
+    build_execution_pairs,
+    builtin_plugin_metric,
+    execution_results_to_map,
+    execute_plugin_code,
+    validate_plugin_code,
+)
 
 
 class TestValidatePluginCode(unittest.TestCase):
@@ -243,6 +252,96 @@ class TestValidatePluginCode(unittest.TestCase):
         self.assertFalse(result["valid"])
         self.assertIn("Forbidden pattern", result["error"])
 
+    @patch(
+        "services.plugin_service._check_plugin_code",
+        side_effect=_check_plugin_code,
+    )
+    def test_repeated_code_validated_once(self, mock_check):
+        """Test the same code is only checked once, each caller getting its own dict."""
+        # Arrange
+        _validation_cache.clear()
+        code = "def calculate(series1, series2):\n    return 1\n"
+
+        # Act
+        first = validate_plugin_code(code)
+        first["valid"] = False
+        second = validate_plugin_code(code)
+
+        # Assert
+        self.assertTrue(second["valid"])
+        mock_check.assert_called_once_with(code)
+
+
+class TestBuiltinPluginMetric(unittest.TestCase):
+    """Tests for the builtin_plugin_metric function."""
+
+    def test_template_is_recognized(self):
+        """Test the client's MAE template maps to the built-in metric."""
+        # Act & Assert
+        self.assertEqual(builtin_plugin_metric(MAE_TEMPLATE), "mae")
+
+    def test_indented_template_is_recognized(self):
+        """Test surrounding whitespace and indentation are ignored."""
+        # Arrange
+        code = "\n" + textwrap.indent(MAE_TEMPLATE, "    ") + "\n\n"
+
+        # Act & Assert
+        self.assertEqual(builtin_plugin_metric(code), "mae")
+
+    def test_modified_template_is_not_recognized(self):
+        """Test any change to the template runs it as a regular plugin."""
+        # Arrange
+        code = MAE_TEMPLATE.replace("np.mean", "np.median")
+
+        # Act & Assert
+        self.assertIsNone(builtin_plugin_metric(code))
+
+
+class TestExecutionPairs(unittest.TestCase):
+    """Tests for build_execution_pairs and execution_results_to_map."""
+
+    def test_every_ordered_pair_is_built(self):
+        """Test each file is paired with every file, itself included."""
+        # Act
+        pairs = build_execution_pairs(["a", "b"])
+
+        # Assert
+        self.assertEqual(
+            [(pair["series1"], pair["series2"]) for pair in pairs],
+            [("a", "a"), ("a", "b"), ("b", "a"), ("b", "b")],
+        )
+        self.assertEqual(len({pair["key"] for pair in pairs}), 4)
+
+    def test_filenames_with_separator_keep_their_results(self):
+        """Test filenames containing "|" cannot collide in the results."""
+        # Arrange
+        filenames = ["a|b", "c", "a", "b|c"]
+        pairs = build_execution_pairs(filenames)
+        results = [
+            {"result": float(i), "key": pair["key"]} for i, pair in enumerate(pairs)
+        ]
+
+        # Act
+        results_map = execution_results_to_map(pairs, results)
+
+        # Assert
+        self.assertEqual(results_map["a|b"]["c"], 1.0)
+        self.assertEqual(results_map["a"]["b|c"], 11.0)
+        self.assertEqual(sum(len(row) for row in results_map.values()), 16)
+
+    def test_errors_and_unknown_keys(self):
+        """Test results without a value map to None and stray keys are ignored."""
+        # Arrange
+        pairs = build_execution_pairs(["a"])
+
+        # Act
+        results_map = execution_results_to_map(
+            pairs, [{"error": "boom", "key": 0}, {"result": 1.0, "key": 5}]
+        )
+
+        # Assert
+        self.assertEqual(results_map, {"a": {"a": None}})
+
 
 class TestExecutePluginCode(unittest.TestCase):
     """Tests for the execute_plugin_code function."""
@@ -0,0 +1,231 @@
+"""
+Unit tests for query_utils.py
+
+Tests parsing and validation of the timeseries query parameters.
+"""
+
+import unittest
+
+from werkzeug.datastructures import MultiDict
+
+from utils.query_utils import (
+    PluginExecuteRequest,
+    SeriesQuery,
+    ValidationError,
+    parse_bool,
+    parse_choice,
+    parse_choices,
+    parse_positive_int,
+)
+
+
+class TestSeriesQuery(unittest.TestCase):
+    """Tests for SeriesQuery.from_args."""
+
+    def test_reads_all_parameters(self):
+        """Test known parameters are read and unknown ones ignored."""
+        # Arrange
+        args = MultiDict(
+            {
+                "filename": "a.csv",
+                "category": "cat",
+                "start": "2024-01-01",
+                "end": "2024-01-02",
+                "window_size": "1d",
+            }
+        )
+
+        # Act
+        query = SeriesQuery.from_args(args, "filename", "category")
+
+        # Assert
+        self.assertEqual(query.filename, "a.csv")
+        self.assertEqual(query.category, "cat")
+        self.assertEqual(query.start, "2024-01-01")
+        self.assertEqual(query.end, "2024-01-02")
+        self.assertIsNone(query.tolerance)
+
+    def test_empty_values_are_none(self):
+        """Test empty query values are normalized to None."""
+        # Act
+        query = SeriesQuery.from_args(MultiDict({"tolerance": ""}))
+
+        # Assert
+        self.assertIsNone(query.tolerance)
+
+    def test_missing_required_parameters(self):
+        """Test all missing required parameters are reported at once."""
+        # Arrange
+        args = MultiDict({"filename1": "a.csv", "filename2": ""})
+
+        # Act & Assert
+        with self.assertRaises(ValidationError) as context:
+            SeriesQuery.from_args(args, "filename1", "filename2", "category")
+
+        self.assertEqual(
+            str(context.exception),
+            "Missing required parameters: 'filename2', 'category'",
+        )
+
+    def test_validation_error_is_value_error(self):
+        """Test ValidationError is still handled as a ValueError."""
+        # Assert
+        self.assertTrue(issubclass(ValidationError, ValueError))
+
+
+class TestParseBool(unittest.TestCase):
+    """Tests for parse_bool."""
+
+    def test_true_values(self):
+        """Test accepted spellings of true, regardless of case."""
+        for value in ("1", "true", "True", "YES", "on"):
+            with self.subTest(value=value):
+                self.assertTrue(parse_bool(value))
+
+    def test_other_values_are_false(self):
+        """Test anything else is false."""
+        for value in ("0", "false", "no", ""):
+            with self.subTest(value=value):
+                self.assertFalse(parse_bool(value))
+
+    def test_missing_value_uses_default(self):
+        """Test a missing parameter falls back to the default."""
+        self.assertFalse(parse_bool(None))
+        self.assertTrue(parse_bool(None, default=True))
+
+
+class TestParsePositiveInt(unittest.TestCase):
+    """Tests for parse_positive_int."""
+
+    def test_digits_are_parsed(self):
+        """Test a string of digits is converted to an int."""
+        self.assertEqual(parse_positive_int("12", "lag"), 12)
+
+    def test_missing_value_uses_default(self):
+        """Test a missing or empty parameter falls back to the default."""
+        self.assertIsNone(parse_positive_int(None, "radius"))
+        self.assertEqual(parse_positive_int("", "lag", default=1), 1)
+
+    def test_invalid_value_raises(self):
+        """Test anything but digits is rejected with the parameter name."""
+        for value in ("-1", "1.5", "abc"):
+            with self.subTest(value=value):
+                with self.assertRaisesRegex(ValidationError, "'lag'"):
+                    parse_positive_int(value, "lag")
+
+
+class TestParseChoices(unittest.TestCase):
+    """Tests for parse_choices."""
+
+    choices = ("mean", "median", "iqr")
+
+    def test_selection_in_request_order(self):
+        """Test values are returned in request order, stripped and deduplicated."""
+        self.assertEqual(
+            parse_choices("iqr, mean,iqr,", "metrics", self.choices, ("mean",)),
+            ("iqr", "mean"),
+        )
+
+    def test_missing_value_uses_default(self):
+        """Test a missing or empty parameter falls back to the default."""
+        for value in (None, "", " , "):
+            with self.subTest(value=value):
+                self.assertEqual(
+                    parse_choices(value, "metrics", self.choices, ("mean",)),
+                    ("mean",),
+                )
+
+    def test_unknown_value_raises(self):
+        """Test unknown values are reported with the parameter name."""
+        with self.assertRaisesRegex(ValidationError, "'metrics'.*mode"):
+            parse_choices("mean,mode", "metrics", self.choices, ("mean",))
+
+
+class TestParseChoice(unittest.TestCase):
+    """Tests for parse_choice."""
+
+    choices = ("records", "columns")
+
+    def test_selected_value(self):
+        """Test an accepted value is returned as is."""
+        self.assertEqual(
+            parse_choice("columns", "layout", self.choices, "records"), "columns"
+        )
+
+    def test_missing_value_uses_default(self):
+        """Test a missing or empty parameter falls back to the default."""
+        for value in (None, ""):
+            with self.subTest(value=value):
+                self.assertEqual(
+                    parse_choice(value, "layout", self.choices, "records"), "records"
+                )
+
+    def test_unknown_value_raises(self):
+        """Test unknown values are reported with the parameter name."""
+        with self.assertRaisesRegex(ValidationError, "'layout'.*records, columns"):
+            parse_choice("rows", "layout", self.choices, "records")
+
+
+class TestPluginExecuteRequest(unittest.TestCase):
+    """Tests for PluginExecuteRequest.from_json."""
+
+    def setUp(self):
+        self.data = {
+            "code": "def calculate(s1, s2): return 0",
+            "category": "temp",
+            "filenames": ["a.csv", "b.csv"],
+        }
+
+    def test_valid_body(self):
+        """Test a valid body is parsed with optional fields defaulted."""
+        # Act
+        plugin_request = PluginExecuteRequest.from_json(self.data)
+
+        # Assert
+        self.assertEqual(plugin_request.filenames, ("a.csv", "b.csv"))
+        self.assertEqual(plugin_request.category, "temp")
+        self.assertIsNone(plugin_request.start)
+        self.assertIsNone(plugin_request.end)
+
+    def test_missing_body(self):
+        """Test an empty or non-object body is rejected."""
+        for data in (None, {}, ["code"]):
+            with self.subTest(data=data):
+                with self.assertRaisesRegex(ValidationError, "No data provided"):
+                    PluginExecuteRequest.from_json(data)
+
+    def test_missing_field(self):
+        """Test the first missing required field is reported."""
+        # Arrange
+        del self.data["category"]
+
+        # Act & Assert
+        with self.assertRaisesRegex(
+            ValidationError, "Missing required field: category"
+        ):
+            PluginExecuteRequest.from_json(self.data)
+
+    def test_too_few_filenames(self):
+        """Test fewer than two filenames are rejected."""
+        # Arrange
+        self.data["filenames"] = ["a.csv"]
+
+        # Act & Assert
+        with self.assertRaisesRegex(ValidationError, "At least 2 filenames"):
+            PluginExecuteRequest.from_json(self.data)
+
+    def test_wrong_types(self):
+        """Test fields of the wrong type are rejected with their name."""
+        for name, value in (
+            ("code", 1),
+            ("category", None),
+            ("filenames", "a.csv,b.csv"),
+            ("start", 0),
+        ):
+            with self.subTest(name=name):
+                with self.assertRaisesRegex(ValidationError, f"'{name}'"):
+                    PluginExecuteRequest.from_json({**self.data, name: value})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+"""
+Unit tests for rate_limit_storage.py
+
+Tests the LocallyBatchedRedisStorage batching of fixed-window counters.
+"""
+
+import unittest
+from unittest.mock import patch, MagicMock
+
+from limits.storage import storage_from_string
+from utils.rate_limit_storage import LocallyBatchedRedisStorage
+
+
+class TestLocallyBatchedRedisStorage(unittest.TestCase):
+    """Tests for LocallyBatchedRedisStorage."""
+
+    def setUp(self):
+        self.storage = LocallyBatchedRedisStorage(
+            "batched+redis://localhost:6379/0", sync_every=3, sync_interval=60
+        )
+        self.redis_total = 0
+
+        def incr_expire(keys, args):
+            self.redis_total += args[1]
+            return self.redis_total
+
+        self.storage.lua_incr_expire = MagicMock(side_effect=incr_expire)
+        # Redis client, asked for the TTL of windows started by other workers
+        self.storage.storage = MagicMock()
+        self.storage.storage.ttl.return_value = 60
+
+    def test_scheme_is_registered(self):
+        """Test the batched scheme resolves to the batched storage."""
+        # Act
+        storage = storage_from_string("batched+redis://localhost:6379/0")
+
+        # Assert
+        self.assertIsInstance(storage, LocallyBatchedRedisStorage)
+
+    def test_first_hit_is_synced(self):
+        """Test the first hit of a window is flushed to learn the shared count."""
+        # Arrange
+        self.redis_total = 7
+
+        # Act
+        count = self.storage.incr("key", 60)
+
+        # Assert
+        self.assertEqual(count, 8)
+        self.storage.lua_incr_expire.assert_called_once_with(["LIMITS:key"], [60, 1])
+
+    def test_hits_are_batched(self):
+        """Test hits are counted locally until sync_every is reached."""
+        # Act
+        counts = [self.storage.incr("key", 60) for _ in range(4)]
+
+        # Assert
+        self.assertEqual(counts, [1, 2, 3, 4])
+        self.assertEqual(self.storage.lua_incr_expire.call_count, 2)
+        self.storage.lua_incr_expire.assert_called_with(["LIMITS:key"], [60, 3])
+        self.assertEqual(self.redis_total, 4)
+
+    def test_sync_interval_forces_flush(self):
+        """Test pending hits are flushed once sync_interval has elapsed."""
+        # Arrange
+        with patch("utils.rate_limit_storage.time.time", return_value=1000.0):
+            self.storage.incr("key", 3600)
+
+        # Act
+        with patch("utils.rate_limit_storage.time.time", return_value=1061.0):
+            count = self.storage.incr("key", 3600)
+
+        # Assert
+        self.assertEqual(count, 2)
+        self.assertEqual(self.storage.lua_incr_expire.call_count, 2)
+
+    def test_get_and_expiry_use_local_counter(self):
+        """Test get and get_expiry are answered without Redis for known keys."""
+        # Arrange
+        self.storage.incr("key", 60)
+        self.storage.incr("key", 60)
+        self.storage.storage = MagicMock()
+
+        # Act
+        count = self.storage.get("key")
+        expiry = self.storage.get_expiry("key")
+
+        # Assert
+        self.assertEqual(count, 2)
+        self.assertGreater(expiry, 0)
+        self.storage.storage.get.assert_not_called()
+        self.storage.storage.ttl.assert_not_called()
+
+    def test_joined_window_expiry_comes_from_redis(self):
+        """Test a window started by another worker keeps its Redis expiry."""
+        # Arrange
+        self.redis_total = 7
+
+        # Act
+        with patch("utils.rate_limit_storage.time.time", return_value=1000.0):
+            self.storage.incr("key", 3600)
+            expiry = self.storage.get_expiry("key")
+
+        # Assert
+        self.assertEqual(expiry, 1060.0)
+        self.storage.storage.ttl.assert_called_once_with("LIMITS:key")
+
+    def test_fresh_window_expiry_is_local(self):
+        """Test a window started by this worker's flush needs no TTL lookup."""
+        # Act
+        with patch("utils.rate_limit_storage.time.time", return_value=1000.0):
+            self.storage.incr("key", 3600)
+            expiry = self.storage.get_expiry("key")
+
+        # Assert
+        self.assertEqual(expiry, 4600.0)
+        self.storage.storage.ttl.assert_not_called()
+
+    def test_expired_counters_are_swept_on_flush(self):
+        """Test counters of keys not seen again are dropped once expired."""
+        # Arrange
+        with patch("utils.rate_limit_storage.time.time", return_value=1000.0):
+            self.storage.incr("gone", 10)
+
+        # Act
+        with patch("utils.rate_limit_storage.time.time", return_value=1100.0):
+            self.storage.incr("other", 10)
+
+        # Assert
+        self.assertNotIn("gone", self.storage._counters)
+        self.assertIn("other", self.storage._counters)
+
+    def test_clear_drops_local_counter(self):
+        """Test clear removes both the local and the shared counter."""
+        # Arrange
+        self.storage.incr("key", 60)
+        self.storage.storage = MagicMock()
+        self.storage.storage.get.return_value = None
+
+        # Act
+        self.storage.clear("key")
+
+        # Assert
+        self.assertEqual(self.storage.get("key"), 0)
+        self.storage.storage.delete.assert_called_once_with("LIMITS:key")
+
+
+if __name__ == "__main__":
+    unittest.main()
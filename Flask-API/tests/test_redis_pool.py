@@ -0,0 +1,84 @@
+"""
+Unit tests for redis_pool.py
+
+Tests the BurstableConnectionPool growing past and shrinking back to its
+steady size.
+"""
+
+import os
+import unittest
+from unittest.mock import MagicMock
+
+from redis.exceptions import ConnectionError
+
+from utils.redis_pool import BurstableConnectionPool
+
+
+def _make_connection(**kwargs):
+    connection = MagicMock(pid=os.getpid())
+    connection.can_read.return_value = False
+    connection.should_reconnect.return_value = False
+    return connection
+
+
+class TestBurstableConnectionPool(unittest.TestCase):
+    """Tests for BurstableConnectionPool."""
+
+    def setUp(self):
+        self.pool = BurstableConnectionPool(
+            max_idle_connections=2,
+            max_connections=4,
+            connection_class=MagicMock(side_effect=_make_connection),
+        )
+
+    def test_grows_past_idle_size(self):
+        """Test up to max_connections are opened during a burst."""
+        # Act
+        connections = [self.pool.get_connection() for _ in range(4)]
+
+        # Assert
+        self.assertEqual(len(set(map(id, connections))), 4)
+
+    def test_burst_limit(self):
+        """Test the pool refuses connections beyond max_connections."""
+        # Arrange
+        for _ in range(4):
+            self.pool.get_connection()
+
+        # Act & Assert
+        with self.assertRaises(ConnectionError):
+            self.pool.get_connection()
+
+    def test_surplus_connections_closed_on_release(self):
+        """Test only max_idle_connections stay open once the burst is over."""
+        # Arrange
+        connections = [self.pool.get_connection() for _ in range(4)]
+
+        # Act
+        for connection in connections:
+            self.pool.release(connection)
+
+        # Assert
+        self.assertEqual(len(self.pool._available_connections), 2)
+        self.assertEqual(self.pool._created_connections, 2)
+        connections[0].disconnect.assert_called_once()
+        connections[1].disconnect.assert_called_once()
+        connections[2].disconnect.assert_not_called()
+        connections[3].disconnect.assert_not_called()
+
+    def test_idle_connections_reused(self):
+        """Test released connections within the idle size are reused."""
+        # Arrange
+        connection = self.pool.get_connection()
+        self.pool.release(connection)
+
+        # Act
+        reused = self.pool.get_connection()
+
+        # Assert
+        self.assertIs(reused, connection)
+        connection.disconnect.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,6 +6,7 @@ Tests the SandboxedExecutor class for Docker and Lambda execution modes.
 
 import unittest
 from unittest.mock import patch, MagicMock
+import math
 import json
 import subprocess
 
@@ -187,6 +188,44 @@ class TestSandboxedExecutorDockerExecution(unittest.TestCase):
         # Assert
         self.assertEqual(result, expected_output)
 
+    @patch("services.sandboxed_executor.subprocess.run")
+    @patch.dict("os.environ", {}, clear=True)
+    def test_execute_docker_shared_series_sent_once(self, mock_run):
+        """Test named series are sent once, sharing identical timestamp indexes."""
+        # Arrange
+        mock_run.side_effect = [
+            MagicMock(returncode=0),  # docker version
+            MagicMock(returncode=0, stdout=""),  # cleanup
+            MagicMock(returncode=0, stdout='{"results": []}', stderr=""),  # docker run
+        ]
+        executor = SandboxedExecutor()
+        pairs = [
+            {"series1": "a.csv", "series2": "a.csv", "key": "a.csv|a.csv"},
+            {"series1": "a.csv", "series2": "b.csv", "key": "a.csv|b.csv"},
+        ]
+        series = {
+            "a.csv": {"t1": 1.0, "t2": 2.0},
+            "b.csv": {"t1": 3.0},
+            "c.csv": {"t1": 4.0, "t2": 5.0},
+        }
+        pairs.append({"series1": "b.csv", "series2": "c.csv", "key": "b.csv|c.csv"})
+
+        # Act
+        executor.execute("def calculate(s1, s2): return 0", pairs, series)
+
+        # Assert
+        sent = json.loads(mock_run.call_args.kwargs["input"])
+        self.assertEqual(sent["pairs"], pairs)
+        self.assertEqual(sent["indexes"], [["t1", "t2"], ["t1"]])
+        self.assertEqual(
+            sent["series"],
+            {
+                "a.csv": {"index": 0, "values": [1.0, 2.0]},
+                "b.csv": {"index": 1, "values": [3.0]},
+                "c.csv": {"index": 0, "values": [4.0, 5.0]},
+            },
+        )
+
     @patch("services.sandboxed_executor.subprocess.run")
     @patch.dict("os.environ", {}, clear=True)
     def test_execute_docker_nonzero_exit(self, mock_run):
@@ -229,6 +268,31 @@ class TestSandboxedExecutorDockerExecution(unittest.TestCase):
         self.assertIn("error", result)
         self.assertIn("timed out", result["error"])
 
+    @patch("services.sandboxed_executor.subprocess.run")
+    @patch.dict("os.environ", {}, clear=True)
+    def test_execute_docker_nan_output(self, mock_run):
+        """Test NaN literals printed by a plugin are still parsed."""
+        # Arrange
+        mock_run.side_effect = [
+            MagicMock(returncode=0),  # docker version
+            MagicMock(returncode=0, stdout=""),  # cleanup
+            MagicMock(
+                returncode=0,
+                stdout='{"results": [{"result": NaN, "key": "test"}]}',
+                stderr="",
+            ),  # docker run
+        ]
+        executor = SandboxedExecutor()
+
+        # Act
+        result = executor.execute(
+            "def calculate(s1, s2): return float('nan')",
+            [{"series1": {"t1": 1}, "series2": {"t1": 2}, "key": "test"}],
+        )
+
+        # Assert
+        self.assertTrue(math.isnan(result["results"][0]["result"]))
+
     @patch("services.sandboxed_executor.subprocess.run")
     @patch.dict("os.environ", {}, clear=True)
     def test_execute_docker_invalid_json_output(self, mock_run):
@@ -347,6 +411,64 @@ class TestSandboxedExecutorLambdaExecution(unittest.TestCase):
         self.assertEqual(result, expected_result)
         mock_lambda.invoke.assert_called_once()
 
+    @patch("boto3.client")
+    @patch.dict("os.environ", {"PLUGIN_EXECUTOR_LAMBDA": "test-lambda"})
+    def test_execute_lambda_large_execution_batched(self, mock_boto_client):
+        """Test large executions are split into batches, keeping result order."""
+
+        # Arrange
+        def invoke(**kwargs):
+            sent = json.loads(kwargs["Payload"])
+            results = [{"result": 0, "key": pair["key"]} for pair in sent["pairs"]]
+            return {"Payload": MagicMock(read=lambda: json.dumps({"results": results}))}
+
+        mock_lambda = MagicMock()
+        mock_lambda.invoke.side_effect = invoke
+        mock_boto_client.return_value = mock_lambda
+        executor = SandboxedExecutor()
+        pairs = [
+            {"series1": "a.csv", "series2": f"{i}.csv", "key": str(i)}
+            for i in range(2 * SandboxedExecutor.MIN_PAIRS_PER_BATCH)
+        ]
+        series = {f"{i}.csv": {"t1": i} for i in range(len(pairs))}
+        series["a.csv"] = {"t1": 1}
+
+        # Act
+        result = executor.execute("def calculate(s1, s2): return 0", pairs, series)
+
+        # Assert
+        self.assertEqual(mock_lambda.invoke.call_count, 2)
+        self.assertEqual(
+            [item["key"] for item in result["results"]], [pair["key"] for pair in pairs]
+        )
+        first_batch = json.loads(mock_lambda.invoke.call_args_list[0].kwargs["Payload"])
+        self.assertEqual(
+            len(first_batch["series"]), SandboxedExecutor.MIN_PAIRS_PER_BATCH + 1
+        )
+
+    @patch("boto3.client")
+    @patch.dict("os.environ", {"PLUGIN_EXECUTOR_LAMBDA": "test-lambda"})
+    def test_execute_lambda_batch_error_returned(self, mock_boto_client):
+        """Test an error in one batch is returned for the whole execution."""
+        # Arrange
+        mock_lambda = MagicMock()
+        mock_lambda.invoke.side_effect = [
+            {"Payload": MagicMock(read=lambda: b'{"results": []}')},
+            Exception("Throttled"),
+        ]
+        mock_boto_client.return_value = mock_lambda
+        executor = SandboxedExecutor()
+        pairs = [
+            {"series1": {}, "series2": {}, "key": str(i)}
+            for i in range(2 * SandboxedExecutor.MIN_PAIRS_PER_BATCH)
+        ]
+
+        # Act
+        result = executor.execute("def calculate(s1, s2): return 0", pairs)
+
+        # Assert
+        self.assertIn("Throttled", result["error"])
+
     @patch("boto3.client")
     @patch.dict("os.environ", {"PLUGIN_EXECUTOR_LAMBDA": "test-lambda"})
     def test_execute_lambda_function_error(self, mock_boto_client):
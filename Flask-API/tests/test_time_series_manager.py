@@ -1,8 +1,13 @@
 import unittest
 import uuid
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 from logging import Logger
-from services.time_series_manager import TimeSeriesManager, _json_dumps
+from services.time_series_manager import (
+    InvalidTimeseriesError,
+    TimeSeriesManager,
+    _json_dumps,
+    _json_loads,
+)
 
 
 class TestTimeSeriesManagerAddMethod(unittest.TestCase):
@@ -90,6 +95,81 @@ class TestTimeSeriesManagerAddMethod(unittest.TestCase):
         self.assertFalse(result)
         self.mock_logger.error.assert_called()
 
+    def test_add_timeseries_bulk_single_transaction(self):
+        # Arrange
+        items = {
+            "2023-01-01T00:00:00": {"category1": {"file1": 1.0}},
+            "2023-01-02T00:00:00": {"category1": {"file1": 2.0}},
+            "2023-01-03T00:00:00": {"category1": {"file1": 3.0}},
+        }
+        mock_pipeline = MagicMock()
+        self.mock_redis.pipeline.return_value = mock_pipeline
+
+        # Act
+        result = self.manager.add_timeseries_bulk(self.token, items, chunk_size=2)
+
+        # Assert
+        self.assertTrue(result)
+        self.mock_redis.pipeline.assert_called_once_with(transaction=True)
+        self.assertEqual(mock_pipeline.hset.call_count, 2)
+        written = {}
+        for call in mock_pipeline.hset.call_args_list:
+            written.update(call.kwargs["mapping"])
+        self.assertEqual(
+            written, {time: _json_dumps(data) for time, data in items.items()}
+        )
+        mock_pipeline.expire.assert_called_once_with(
+            f"session:{self.token}", self.manager._ttl_seconds
+        )
+        mock_pipeline.execute.assert_called_once()
+
+    def test_add_timeseries_bulk_invalid_item_writes_nothing(self):
+        # Arrange
+        items = {
+            "2023-01-01T00:00:00": {"category1": {"file1": 1.0}},
+            "2023-01-02T00:00:00": {},
+        }
+
+        # Act & Assert
+        with self.assertRaises(ValueError) as context:
+            self.manager.add_timeseries_bulk(self.token, items)
+
+        self.assertIn("Data cannot be empty", str(context.exception))
+        self.mock_redis.pipeline.assert_not_called()
+
+    def test_add_timeseries_bulk_reports_every_invalid_item(self):
+        # Arrange
+        items = {
+            "2023-01-01T00:00:00": {},
+            "2023-01-02T00:00:00": {"category1": {"file1": 1.0}},
+            "2023-01-03T00:00:00": [1.0],
+        }
+
+        # Act & Assert
+        with self.assertRaises(InvalidTimeseriesError) as context:
+            self.manager.add_timeseries_bulk(self.token, items)
+
+        self.assertEqual(
+            set(context.exception.errors),
+            {"2023-01-01T00:00:00", "2023-01-03T00:00:00"},
+        )
+        self.assertEqual(str(context.exception), "Data cannot be empty.")
+        self.mock_redis.pipeline.assert_not_called()
+
+    def test_add_timeseries_bulk_redis_exception(self):
+        # Arrange
+        items = {"2023-01-01T00:00:00": {"category1": {"file1": 1.0}}}
+        self.mock_redis.pipeline.return_value.execute.side_effect = Exception(
+            "Redis connection error"
+        )
+
+        # Act
+        result = self.manager.add_timeseries_bulk(self.token, items)
+
+        # Assert
+        self.assertFalse(result)
+        self.mock_logger.error.assert_called()
+
 
 class TestTimeSeriesManagerGetMethod(unittest.TestCase):
     def setUp(self):
@@ -136,15 +216,30 @@ class TestTimeSeriesManagerGetMethod(unittest.TestCase):
         self.mock_redis.hscan_iter.assert_called_with(f"session:{self.token}")
         self.mock_redis.expire.assert_called_once()
 
+    def test_get_timeseries_from_raw_bytes(self):
+        """Test replies of a client without decode_responses are parsed."""
+        # Arrange
+        self.mock_redis.hscan_iter.return_value = iter(
+            [(k.encode(), v) for k, v in self.test_data.items()]
+        )
+
+        # Act
+        result = self.manager.get_timeseries(
+            self.token, start="2023-01-02T00:00:00", category="category1"
+        )
+
+        # Assert
+        expected = {
+            "2023-01-02T00:00:00": {"category1": {"file2": 6.0, "file3": 7.0}},
+        }
+        self.assertEqual(result, expected)
+
     def test_get_timeseries_with_time(self):
         # Arrange
         timestamp = "2023-01-01T00:00:00"
-        mock_pipeline = MagicMock()
-        mock_pipeline.execute.return_value = [[self.test_data[timestamp]], True]
-        self.mock_redis.pipeline.return_value = mock_pipeline
         # hscan_iter returns iterator of tuples (field, value)
         self.mock_redis.hscan_iter.return_value = iter(
-            [(k, _json_dumps(v)) for k, v in self.test_data.items()]
+            [(k, v) for k, v in self.test_data.items()]
         )
 
         # Act
@@ -158,9 +253,12 @@ class TestTimeSeriesManagerGetMethod(unittest.TestCase):
             }
         }
         self.assertEqual(result, expected)
+        # Values come from the scan itself, without a second HMGET pass
         self.mock_redis.hscan_iter.assert_called_once()
-        mock_pipeline.hmget.assert_called_once()
-        mock_pipeline.expire.assert_called_once()
+        self.mock_redis.pipeline.assert_not_called()
+        self.mock_redis.expire.assert_called_once_with(
+            f"session:{self.token}", self.manager._ttl_seconds
+        )
 
     def test_get_timeseries_with_category(self):
         # Arrange
@@ -203,12 +301,9 @@ class TestTimeSeriesManagerGetMethod(unittest.TestCase):
     def test_get_timeseries_with_time_and_category(self):
         # Arrange
         timestamp = "2023-01-01T00:00:00"
-        mock_pipeline = MagicMock()
-        mock_pipeline.execute.return_value = [[self.test_data[timestamp]], True]
-        self.mock_redis.pipeline.return_value = mock_pipeline
         # hscan_iter returns iterator of tuples (field, value)
         self.mock_redis.hscan_iter.return_value = iter(
-            [(k, _json_dumps(v)) for k, v in self.test_data.items()]
+            [(k, v) for k, v in self.test_data.items()]
         )
 
         # Act
@@ -227,12 +322,9 @@ class TestTimeSeriesManagerGetMethod(unittest.TestCase):
     def test_get_timeseries_with_time_and_filename(self):
         # Arrange
         timestamp = "2023-01-01T00:00:00"
-        mock_pipeline = MagicMock()
-        mock_pipeline.execute.return_value = [[self.test_data[timestamp]], True]
-        self.mock_redis.pipeline.return_value = mock_pipeline
         # hscan_iter returns iterator of tuples (field, value)
         self.mock_redis.hscan_iter.return_value = iter(
-            [(k, _json_dumps(v)) for k, v in self.test_data.items()]
+            [(k, v) for k, v in self.test_data.items()]
         )
 
         # Act
@@ -268,12 +360,9 @@ class TestTimeSeriesManagerGetMethod(unittest.TestCase):
     def test_get_timeseries_with_time_category_and_filename(self):
         # Arrange
         timestamp = "2023-01-01T00:00:00"
-        mock_pipeline = MagicMock()
-        mock_pipeline.execute.return_value = [[self.test_data[timestamp]], True]
-        self.mock_redis.pipeline.return_value = mock_pipeline
         # hscan_iter returns iterator of tuples (field, value)
         self.mock_redis.hscan_iter.return_value = iter(
-            [(k, _json_dumps(v)) for k, v in self.test_data.items()]
+            [(k, v) for k, v in self.test_data.items()]
         )
 
         # Act
@@ -302,7 +391,7 @@ class TestTimeSeriesManagerGetMethod(unittest.TestCase):
         self.mock_redis.pipeline.return_value = mock_pipeline
         # hscan_iter returns iterator of tuples (field, value)
         self.mock_redis.hscan_iter.return_value = iter(
-            [(k, _json_dumps(v)) for k, v in self.test_data.items()]
+            [(k, v) for k, v in self.test_data.items()]
         )
 
         # Act
@@ -384,15 +473,9 @@ class TestTimeSeriesManagerGetMethod(unittest.TestCase):
 
     def test_get_timeseries_with_date_range(self):
         # Arrange
-        mock_pipeline = MagicMock()
-        mock_pipeline.execute.return_value = [
-            [self.test_data["2023-01-01T00:00:00"]],
-            True,
-        ]
-        self.mock_redis.pipeline.return_value = mock_pipeline
         # hscan_iter returns iterator of tuples (field, value)
         self.mock_redis.hscan_iter.return_value = iter(
-            [(k, _json_dumps(v)) for k, v in self.test_data.items()]
+            [(k, v) for k, v in self.test_data.items()]
         )
 
         # Act
@@ -409,6 +492,225 @@ class TestTimeSeriesManagerGetMethod(unittest.TestCase):
         }
         self.assertEqual(result, expected)
 
+    def test_get_timeseries_many_reads_session_once(self):
+        # Arrange
+        self.mock_redis.hscan_iter.return_value = iter(
+            [(k, v) for k, v in self.test_data.items()]
+        )
+
+        # Act
+        result1, result2 = self.manager.get_timeseries_many(
+            self.token,
+            [
+                {"filename": "file1", "category": "category1"},
+                {"filename": "file3", "category": "category1"},
+            ],
+        )
+
+        # Assert
+        self.assertEqual(
+            result1, {"2023-01-01T00:00:00": {"category1": {"file1": 1.0}}}
+        )
+        self.assertEqual(
+            result2,
+            {
+                "2023-01-01T00:00:00": {"category1": {"file3": 3.0}},
+                "2023-01-02T00:00:00": {"category1": {"file3": 7.0}},
+            },
+        )
+        self.mock_redis.hscan_iter.assert_called_once_with(f"session:{self.token}")
+
+    def test_get_timeseries_reuses_cached_read(self):
+        # Arrange
+        self.mock_redis.get.return_value = "v1"
+        self.mock_redis.hscan_iter.side_effect = lambda key: iter(
+            self.test_data.items()
+        )
+
+        # Act
+        result1 = self.manager.get_timeseries(self.token, filename="file1")
+        result2 = self.manager.get_timeseries(self.token, filename="file2")
+
+        # Assert
+        self.assertIn("2023-01-01T00:00:00", result1)
+        self.assertIn("2023-01-02T00:00:00", result2)
+        self.mock_redis.hscan_iter.assert_called_once_with(f"session:{self.token}")
+        self.mock_redis.get.assert_called_with(f"session:{self.token}:version")
+
+    def test_get_timeseries_rereads_after_version_change(self):
+        # Arrange
+        self.mock_redis.get.side_effect = ["v1", "v2"]
+        self.mock_redis.hscan_iter.side_effect = lambda key: iter(
+            self.test_data.items()
+        )
+
+        # Act
+        self.manager.get_timeseries(self.token)
+        self.manager.get_timeseries(self.token)
+
+        # Assert
+        self.assertEqual(self.mock_redis.hscan_iter.call_count, 2)
+
+    def test_get_timeseries_many_validates_all_queries(self):
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            self.manager.get_timeseries_many(
+                self.token, [{"filename": "file1"}, {"category": 123}]
+            )
+        self.mock_redis.hscan_iter.assert_not_called()
+
+    def test_get_series_many(self):
+        # Arrange
+        self.mock_redis.hscan_iter.return_value = iter(self.test_data.items())
+
+        # Act
+        file1, file3, missing = self.manager.get_series_many(
+            self.token,
+            [
+                {"filename": "file1", "category": "category1"},
+                {"filename": "file3", "category": "category1"},
+                {"filename": "file9", "category": "category1"},
+            ],
+        )
+
+        # Assert
+        self.assertEqual(file1, {"2023-01-01T00:00:00": 1.0})
+        self.assertEqual(
+            file3, {"2023-01-01T00:00:00": 3.0, "2023-01-02T00:00:00": 7.0}
+        )
+        self.assertEqual(missing, {})
+        self.mock_redis.hscan_iter.assert_called_once_with(f"session:{self.token}")
+        self.mock_redis.get.assert_called_once_with(f"session:{self.token}:version")
+
+    def test_get_series_skips_non_numeric_values(self):
+        # Arrange
+        self.test_data["2023-01-03T00:00:00"] = _json_dumps(
+            {"category1": {"file2": "n/a"}, "category2": 5}
+        )
+        self.mock_redis.hscan_iter.return_value = iter(self.test_data.items())
+
+        # Act
+        result = self.manager.get_series(self.token, "file2", "category1")
+
+        # Assert
+        self.assertEqual(
+            result, {"2023-01-01T00:00:00": 2.0, "2023-01-02T00:00:00": 6.0}
+        )
+
+    def test_get_series_many_shares_identical_queries(self):
+        # Arrange
+        self.mock_redis.hscan_iter.return_value = iter(self.test_data.items())
+        query = {"filename": "file2", "category": "category1"}
+
+        # Act
+        series1, series2 = self.manager.get_series_many(
+            self.token, [query, dict(query)]
+        )
+
+        # Assert
+        self.assertIs(series1, series2)
+
+    def test_get_series_reuses_decoded_columns(self):
+        # Arrange
+        self.mock_redis.get.return_value = b"v1"
+        self.mock_redis.hscan_iter.side_effect = lambda key: iter(
+            self.test_data.items()
+        )
+
+        # Act
+        with patch(
+            "services.time_series_manager._json_loads", side_effect=_json_loads
+        ) as loads:
+            self.manager.get_series(self.token, "file1", "category1")
+            self.manager.get_series(self.token, "file2", "category2")
+
+        # Assert
+        self.assertEqual(loads.call_count, len(self.test_data))
+
+    def test_get_series_known_version_not_read_again(self):
+        # Arrange
+        self.mock_redis.mget.return_value = [None]
+        self.mock_redis.hscan_iter.return_value = iter(self.test_data.items())
+
+        # Act
+        result = self.manager.get_series(
+            self.token, "file1", "category1", version=b"v1"
+        )
+
+        # Assert
+        self.assertEqual(result, {"2023-01-01T00:00:00": 1.0})
+        self.mock_redis.get.assert_not_called()
+
+    def test_get_series_cached_per_version(self):
+        # Arrange
+        self.mock_redis.get.side_effect = [b"v1", b"v1", b"v2"]
+        self.mock_redis.hscan_iter.side_effect = lambda key: iter(
+            self.test_data.items()
+        )
+
+        # Act
+        first = self.manager.get_series(self.token, "file1", "category1")
+        repeated = self.manager.get_series(self.token, "file1", "category1")
+        updated = self.manager.get_series(self.token, "file1", "category1")
+
+        # Assert
+        self.assertIs(repeated, first)
+        self.assertIsNot(updated, first)
+        self.assertEqual(updated, first)
+
+    def test_get_series_shared_through_redis(self):
+        # Arrange
+        self.mock_redis.get.return_value = b"v1"
+        self.mock_redis.mget.return_value = [_json_dumps({"t1": 1.5})]
+
+        # Act
+        result = self.manager.get_series(self.token, "file1", "category1")
+
+        # Assert
+        self.assertEqual(result, {"t1": 1.5})
+        self.mock_redis.hscan_iter.assert_not_called()
+        (keys,), _ = self.mock_redis.mget.call_args
+        self.assertTrue(keys[0].startswith(f"session:{self.token}:series:v1:"))
+
+    def test_get_series_built_series_stored_in_redis(self):
+        # Arrange
+        self.mock_redis.get.return_value = b"v1"
+        self.mock_redis.mget.return_value = [None]
+        self.mock_redis.hscan_iter.return_value = iter(self.test_data.items())
+        pipeline = self.mock_redis.pipeline.return_value
+
+        # Act
+        result = self.manager.get_series(self.token, "file1", "category1")
+
+        # Assert
+        pipeline.set.assert_called_once()
+        _, payload = pipeline.set.call_args.args
+        self.assertEqual(_json_loads(payload), result)
+        self.assertEqual(pipeline.set.call_args.kwargs["ex"], 60)
+        pipeline.execute.assert_called_once()
+
+    def test_get_series_stored_in_redis_in_background(self):
+        # Arrange
+        executor = MagicMock()
+        manager = TimeSeriesManager(
+            redis_client=self.mock_redis,
+            logger=self.mock_logger,
+            background_executor=executor,
+        )
+        self.mock_redis.get.return_value = b"v1"
+        self.mock_redis.mget.return_value = [None]
+        self.mock_redis.hscan_iter.return_value = iter(self.test_data.items())
+
+        # Act
+        result = manager.get_series(self.token, "file1", "category1")
+
+        # Assert
+        self.mock_redis.pipeline.assert_not_called()
+        write, token, version, built = executor.submit.call_args.args
+        self.assertEqual(write, manager._set_shared_series)
+        self.assertEqual((token, version), (self.token, b"v1"))
+        self.assertEqual(list(built.values()), [result])
+
 
 class TestTimeSeriesManagerClearTimeseries(unittest.TestCase):
     def setUp(self):
@@ -459,9 +761,6 @@ class TestTimeSeriesManagerStartEndFilters(unittest.TestCase):
         self.mock_redis.hscan_iter.return_value = iter(
             [(k, v) for k, v in self.test_data.items()]
         )
-        # Mock pipeline for chunked data fetching
-        self.mock_pipeline = MagicMock()
-        self.mock_redis.pipeline.return_value = self.mock_pipeline
         self.mock_redis.exists.return_value = True
 
     def test_get_timeseries_with_start_filter(self):
@@ -473,10 +772,6 @@ class TestTimeSeriesManagerStartEndFilters(unittest.TestCase):
                 ("2023-01-10", self.test_data["2023-01-10"]),
             ]
         )
-        # Pipeline returns values for filtered keys (2023-01-05, 2023-01-10)
-        self.mock_pipeline.execute.return_value = [
-            [self.test_data["2023-01-05"], self.test_data["2023-01-10"]]
-        ]
 
         # Act
         result = self.manager.get_timeseries(self.token, start="2023-01-05")
@@ -496,10 +791,6 @@ class TestTimeSeriesManagerStartEndFilters(unittest.TestCase):
                 ("2023-01-10", self.test_data["2023-01-10"]),
             ]
         )
-        # Pipeline returns values for filtered keys (2023-01-01, 2023-01-05)
-        self.mock_pipeline.execute.return_value = [
-            [self.test_data["2023-01-01"], self.test_data["2023-01-05"]]
-        ]
 
         # Act
         result = self.manager.get_timeseries(self.token, end="2023-01-05")
@@ -528,14 +819,6 @@ class TestTimeSeriesManagerStartEndFilters(unittest.TestCase):
                 ("2023-01-10", extended_data["2023-01-10"]),
             ]
         )
-        # Pipeline returns values for filtered keys (2023-01-02, 2023-01-05, 2023-01-08)
-        self.mock_pipeline.execute.return_value = [
-            [
-                extended_data["2023-01-02"],
-                extended_data["2023-01-05"],
-                extended_data["2023-01-08"],
-            ]
-        ]
 
         # Act
         result = self.manager.get_timeseries(
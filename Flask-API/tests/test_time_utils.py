@@ -0,0 +1,82 @@
+"""
+Unit tests for time_utils.py
+
+Tests conversion of timeseries timestamp keys between timezones.
+"""
+
+import unittest
+from zoneinfo import ZoneInfoNotFoundError
+
+from utils.time_utils import convert_timeseries_keys_timezone
+
+
+class TestConvertTimeseriesKeysTimezone(unittest.TestCase):
+    """Tests for convert_timeseries_keys_timezone."""
+
+    def test_converts_to_naive_local_time(self):
+        """Test UTC keys are converted to naive local timestamps."""
+        # Arrange
+        data = {"2024-11-01T23:00:01.000Z": {"cat": {"a.csv": 1.0}}}
+
+        # Act
+        result = convert_timeseries_keys_timezone(data, "Europe/Warsaw")
+
+        # Assert
+        self.assertEqual(result, {"2024-11-02T00:00:01": {"cat": {"a.csv": 1.0}}})
+
+    def test_keep_offset(self):
+        """Test converted keys include the offset when requested."""
+        # Arrange
+        data = {"2024-07-01T12:00:00": 1}
+
+        # Act
+        result = convert_timeseries_keys_timezone(
+            data, "Europe/Warsaw", keep_offset=True
+        )
+
+        # Assert
+        self.assertEqual(result, {"2024-07-01T14:00:00+02:00": 1})
+
+    def test_repeated_conversion_is_consistent(self):
+        """Test a key converted again for another timezone is not reused."""
+        # Arrange
+        data = {"2024-01-01T00:00:00Z": 1}
+
+        # Act
+        warsaw = convert_timeseries_keys_timezone(data, "Europe/Warsaw")
+        utc = convert_timeseries_keys_timezone(data, "UTC")
+        warsaw_again = convert_timeseries_keys_timezone(data, "Europe/Warsaw")
+
+        # Assert
+        self.assertEqual(warsaw, {"2024-01-01T01:00:00": 1})
+        self.assertEqual(utc, {"2024-01-01T00:00:00": 1})
+        self.assertEqual(warsaw_again, warsaw)
+
+    def test_non_timestamp_keys_kept(self):
+        """Test keys which are not timestamps are left unchanged."""
+        # Act
+        result = convert_timeseries_keys_timezone({"label": 1}, "UTC")
+
+        # Assert
+        self.assertEqual(result, {"label": 1})
+
+    def test_colliding_keys_get_suffix(self):
+        """Test keys mapping to the same local time are kept apart."""
+        # Arrange
+        data = {"2024-01-01T00:00:00Z": 1, "2024-01-01T01:00:00+01:00": 2}
+
+        # Act
+        result = convert_timeseries_keys_timezone(data, "UTC")
+
+        # Assert
+        self.assertEqual(result, {"2024-01-01T00:00:00": 1, "2024-01-01T00:00:00-1": 2})
+
+    def test_unknown_timezone_raises(self):
+        """Test an unknown timezone is reported instead of ignored."""
+        # Act & Assert
+        with self.assertRaises(ZoneInfoNotFoundError):
+            convert_timeseries_keys_timezone({"2024-01-01T00:00:00Z": 1}, "Nowhere/X")
+
+
+if __name__ == "__main__":
+    unittest.main()
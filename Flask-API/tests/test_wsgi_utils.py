@@ -0,0 +1,70 @@
+"""
+Unit tests for wsgi_utils.py
+
+Tests the HealthCheckMiddleware short-circuiting of health checks.
+"""
+
+import unittest
+from unittest.mock import MagicMock
+
+from flask import Flask
+
+from utils.wsgi_utils import HealthCheckMiddleware
+
+
+class TestHealthCheckMiddleware(unittest.TestCase):
+    """Tests for HealthCheckMiddleware."""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.check = MagicMock(return_value=True)
+        self.app.add_url_rule("/", "index", lambda: "index")
+        self.app.wsgi_app = HealthCheckMiddleware(
+            self.app.wsgi_app, path="/health", check=self.check
+        )
+        self.client = self.app.test_client()
+
+    def test_healthy(self):
+        """Test a passing check returns 200 OK."""
+        # Act
+        response = self.client.get("/health")
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_data(as_text=True), "OK")
+        self.check.assert_called_once()
+
+    def test_unhealthy(self):
+        """Test a failing check returns 503."""
+        # Arrange
+        self.check.return_value = False
+
+        # Act
+        response = self.client.get("/health")
+
+        # Assert
+        self.assertEqual(response.status_code, 503)
+
+    def test_check_exception_is_unhealthy(self):
+        """Test an exception raised by the check is reported as unhealthy."""
+        # Arrange
+        self.check.side_effect = Exception("Redis down")
+
+        # Act
+        response = self.client.get("/health")
+
+        # Assert
+        self.assertEqual(response.status_code, 503)
+
+    def test_other_paths_reach_the_app(self):
+        """Test requests to other paths are passed through to Flask."""
+        # Act
+        response = self.client.get("/")
+
+        # Assert
+        self.assertEqual(response.get_data(as_text=True), "index")
+        self.check.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
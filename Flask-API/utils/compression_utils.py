@@ -0,0 +1,53 @@
+import gzip
+
+from flask import Request, Response
+
+# Mimetypes of the responses worth compressing; series are mostly digits and
+# repeated timestamp prefixes, which gzip shrinks several times over
+COMPRESSIBLE_MIMETYPES = frozenset({"application/json"})
+
+
+def gzip_response(
+    response: Response, request: Request, min_size: int = 1024, level: int = 4
+) -> Response:
+    """
+    Compress a JSON response body with gzip if the client accepts it.
+
+    Streamed and already encoded responses are left as they are, as are bodies
+    smaller than `min_size` bytes, for which the gzip header costs more than it
+    saves. A strong ETag is made weak, since the compressed body is no longer
+    byte-identical to the one it was computed for.
+
+    Args:
+        response (Response): Response to compress in place
+        request (Request): Request the response answers
+        min_size (int): Smallest body size in bytes worth compressing
+        level (int): gzip compression level, trading ratio for speed
+
+    Returns:
+        Response: The same response, compressed or not
+    """
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+    response.vary.add("Accept-Encoding")
+    if (
+        response.is_streamed
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or not 200 <= response.status_code < 300
+        or response.status_code == 204
+        or not request.accept_encodings["gzip"]
+    ):
+        return response
+
+    body = response.get_data()
+    if len(body) < min_size:
+        return response
+    # mtime=0 keeps the output deterministic for identical bodies
+    response.set_data(gzip.compress(body, compresslevel=level, mtime=0))
+    response.headers["Content-Encoding"] = "gzip"
+
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
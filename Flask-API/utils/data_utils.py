@@ -1,44 +1,126 @@
+import numpy as np
 import pandas as pd
 
+# Rows parsed at once when pivoting a CSV; each chunk is reduced to sums and
+# counts per cell before the next one is read
+PIVOT_CHUNKSIZE = 1_000_000
 
-def pivot_file(file, index_col, columns_col, values_col):
+
+def _aggregate_pivot_chunk(df, index_col, columns_col, values_col):
+    """
+    Reduce a chunk of rows to the sum and count of values per pivot cell.
+
+    Args:
+        df (pd.DataFrame): Rows read from the uploaded file.
+        index_col (str): The column to use as the new index.
+        columns_col (str): The column to use to create new columns.
+        values_col (str): The column to use for populating values.
+    Returns:
+        pd.DataFrame: "sum" and "count" columns indexed by (index, column) pairs.
+    Raises:
+        ValueError: If any of the pivot columns is missing.
+    """
+    # Check if required columns exist
+    missing_cols = [
+        col for col in [index_col, columns_col, values_col] if col not in df.columns
+    ]
+    if missing_cols:
+        raise ValueError(f"Missing columns in the data: {', '.join(missing_cols)}")
+
+    # Convert values column to numeric (handle Polish decimal format with comma)
+    # First replace commas with dots, then convert to numeric
+    values = df[values_col]
+    if values.dtype == "object":
+        values = values.astype(str).str.replace(",", ".", regex=False)
+    values = pd.to_numeric(values, errors="coerce")
+    return values.groupby([df[index_col], df[columns_col]]).agg(["sum", "count"])
+
+
+def _pivot_means(partials, index_col):
+    """
+    Combine per-chunk sums and counts into a table of means.
+
+    Index and column labels are factorized and the sums and counts are
+    scattered into a dense grid with np.bincount, which avoids concatenating,
+    regrouping and unstacking the partials in pandas.
+
+    Args:
+        partials (list[pd.DataFrame]): Results of _aggregate_pivot_chunk.
+        index_col (str): Name given to the index of the table.
+    Returns:
+        pd.DataFrame: Mean per cell with sorted index and column labels, as
+            pivot_table(aggfunc="mean") builds it. Cells without values are
+            NaN, and rows or columns without any value are dropped.
+    """
+    totals = partials[0] if len(partials) == 1 else pd.concat(partials)
+    row_codes, rows = pd.factorize(totals.index.get_level_values(0), sort=True)
+    col_codes, cols = pd.factorize(totals.index.get_level_values(1), sort=True)
+    cells = row_codes * len(cols) + col_codes
+    size = len(rows) * len(cols)
+    sums = np.bincount(cells, weights=totals["sum"].to_numpy(), minlength=size)
+    counts = np.bincount(cells, weights=totals["count"].to_numpy(), minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.where(counts > 0, sums / counts, np.nan)
+    means = means.reshape(len(rows), len(cols))
+
+    has_row = (counts.reshape(means.shape) > 0).any(axis=1)
+    has_col = (counts.reshape(means.shape) > 0).any(axis=0)
+    return pd.DataFrame(
+        means[has_row][:, has_col],
+        index=pd.Index(rows[has_row], name=index_col),
+        columns=cols[has_col],
+    )
+
+
+def pivot_file(
+    file,
+    index_col,
+    columns_col,
+    values_col,
+    layout="records",
+    chunksize=PIVOT_CHUNKSIZE,
+):
     """
     Pivot a CSV or JSON file into a list of dictionaries.
 
+    CSV files are read in chunks of `chunksize` rows, so only the pivot
+    columns of one chunk and the running sums per cell are held in memory.
+
     Args:
         file (FileStorage): The uploaded file (CSV or JSON).
         index_col (str): The column to use as the new index.
         columns_col (str): The column to use to create new columns.
         values_col (str): The column to use for populating values.
+        layout (str): "records" for a list of row dicts, or "columns" for a
+            dict of column lists, which does not repeat the column names on
+            every row.
+        chunksize (int): Number of CSV rows parsed at once.
     Returns:
-        list[dict]: The pivoted data as a list of dictionaries.
+        list[dict] | dict[str, list]: The pivoted data in the requested layout.
     """
     try:
         if file.filename.lower().endswith(".csv"):
-            df = pd.read_csv(file)
+            # Only the pivoted columns are parsed; missing ones are reported below
+            wanted = {index_col, columns_col, values_col}
+            with pd.read_csv(
+                file, usecols=lambda col: col in wanted, chunksize=chunksize
+            ) as reader:
+                partials = [
+                    _aggregate_pivot_chunk(chunk, index_col, columns_col, values_col)
+                    for chunk in reader
+                ]
         elif file.filename.lower().endswith(".json"):
-            df = pd.read_json(file)
+            partials = [
+                _aggregate_pivot_chunk(
+                    pd.read_json(file), index_col, columns_col, values_col
+                )
+            ]
         else:
             raise ValueError("Unsupported file format. Use CSV or JSON.")
-        # Check if required columns exist
-        missing_cols = [
-            col for col in [index_col, columns_col, values_col] if col not in df.columns
-        ]
-        if missing_cols:
-            raise ValueError(f"Missing columns in the data: {', '.join(missing_cols)}")
-
-        # Convert values column to numeric (handle Polish decimal format with comma)
-        # First replace commas with dots, then convert to numeric
-        if df[values_col].dtype == "object":
-            df[values_col] = (
-                df[values_col].astype(str).str.replace(",", ".", regex=False)
-            )
-        df[values_col] = pd.to_numeric(df[values_col], errors="coerce")
 
-        # Pivot the Dataframe using pivot_table, using mean as aggregation function for duplicates
-        pivot_df = df.pivot_table(
-            index=index_col, columns=columns_col, values=values_col, aggfunc="mean"
-        )
+        # Combine the chunks and take the mean of duplicates per cell, as
+        # pivot_table(aggfunc="mean") would; cells without values stay NaN
+        pivot_df = _pivot_means(partials, index_col)
         # Flatten column names (e.g. (30, 31) --> 'data_type_30', 'data_type_31')
         pivot_df.columns = [f"{columns_col}_{col}" for col in pivot_df.columns]
         # Reset index, so that index_col becomes a column again
@@ -52,5 +134,33 @@ def pivot_file(file, index_col, columns_col, values_col):
                 pass
     except Exception as e:
         raise ValueError(f"Error processing file: {e}")
+    if layout == "columns":
+        return pivot_df.to_dict(orient="list")
     # Convert the pivoted DataFrame to a list of records (dicts)
     return pivot_df.to_dict(orient="records")
+
+
+def to_float32(data: dict) -> dict:
+    """
+    Round the float values of {timestamp: {category: {filename: value}}} data
+    to float32 for transmission.
+
+    The values become numpy float32 scalars, which orjson writes with the
+    shortest digits identifying them as float32, about half as many as a
+    float64 needs. Other values, such as integers, are kept as they are, as
+    are categories holding a value instead of a {filename: value} dict.
+    """
+    return {
+        timestamp: {
+            category: (
+                {
+                    filename: np.float32(value) if type(value) is float else value
+                    for filename, value in files.items()
+                }
+                if isinstance(files, dict)
+                else files
+            )
+            for category, files in categories.items()
+        }
+        for timestamp, categories in data.items()
+    }
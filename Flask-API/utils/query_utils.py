@@ -0,0 +1,190 @@
+from dataclasses import dataclass, fields
+from typing import Any, Iterable, Mapping, Optional, Tuple
+
+TRUE_VALUES = frozenset(("1", "true", "yes", "on"))
+
+
+class ValidationError(ValueError):
+    """Raised when request parameters are missing or invalid."""
+
+
+def parse_bool(value: Optional[str], default: bool = False) -> bool:
+    """
+    Interpret a query parameter as a boolean flag.
+
+    Args:
+        value (str, optional): Raw parameter value
+        default (bool): Result when the parameter is missing
+    Returns:
+        bool: True for "1", "true", "yes" or "on" (case insensitive)
+    """
+    if value is None:
+        return default
+    return value.lower() in TRUE_VALUES
+
+
+def parse_positive_int(
+    value: Optional[str], name: str, default: Optional[int] = None
+) -> Optional[int]:
+    """
+    Interpret a query parameter as a non-negative integer.
+
+    Args:
+        value (str, optional): Raw parameter value
+        name (str): Parameter name used in the error message
+        default (int, optional): Result when the parameter is missing or empty
+    Returns:
+        int, optional: The parsed value
+    Raises:
+        ValidationError: If the value is not made of digits only
+    """
+    if not value:
+        return default
+    if not value.isdigit():
+        raise ValidationError(f"Parameter '{name}' must be a positive integer")
+    return int(value)
+
+
+def parse_choice(
+    value: Optional[str], name: str, choices: Iterable[str], default: str
+) -> str:
+    """
+    Interpret a query parameter as one of a fixed set of values.
+
+    Args:
+        value (str, optional): Raw parameter value
+        name (str): Parameter name used in the error message
+        choices (Iterable[str]): Accepted values
+        default (str): Result when the parameter is missing or empty
+    Returns:
+        str: The selected value
+    Raises:
+        ValidationError: If the value is not one of the choices
+    """
+    if not value:
+        return default
+    if value not in choices:
+        raise ValidationError(
+            f"Parameter '{name}' must be one of: {', '.join(choices)}"
+        )
+    return value
+
+
+def parse_choices(
+    value: Optional[str], name: str, choices: Iterable[str], default: Tuple[str, ...]
+) -> Tuple[str, ...]:
+    """
+    Interpret a query parameter as a comma separated selection of choices.
+
+    Args:
+        value (str, optional): Raw parameter value, e.g. "mean,iqr"
+        name (str): Parameter name used in the error message
+        choices (Iterable[str]): Accepted values
+        default (Tuple[str, ...]): Result when the parameter is missing or empty
+    Returns:
+        Tuple[str, ...]: Selected values in request order, without duplicates
+    Raises:
+        ValidationError: If a value is not one of the choices
+    """
+    selected = tuple(dict.fromkeys(part.strip() for part in (value or "").split(",")))
+    selected = tuple(part for part in selected if part)
+    if not selected:
+        return default
+    unknown = [part for part in selected if part not in choices]
+    if unknown:
+        raise ValidationError(
+            f"Parameter '{name}' has unknown values: {', '.join(unknown)}. "
+            f"Expected any of: {', '.join(choices)}"
+        )
+    return selected
+
+
+@dataclass(frozen=True, slots=True)
+class SeriesQuery:
+    """Query parameters shared by the timeseries endpoints."""
+
+    filename: Optional[str] = None
+    filename1: Optional[str] = None
+    filename2: Optional[str] = None
+    category: Optional[str] = None
+    start: Optional[str] = None
+    end: Optional[str] = None
+    time: Optional[str] = None
+    tolerance: Optional[str] = None
+
+    @classmethod
+    def from_args(cls, args: Mapping[str, str], *required: str) -> "SeriesQuery":
+        """
+        Read the query parameters in one pass over the request args.
+
+        Args:
+            args (Mapping[str, str]): Request query arguments
+            *required (str): Names of parameters which must be present
+        Returns:
+            SeriesQuery: The parsed parameters, empty values normalized to None
+        Raises:
+            ValidationError: If a required parameter is missing or empty
+        """
+        values = {name: args.get(name) or None for name in _SERIES_QUERY_FIELDS}
+        missing = [name for name in required if values.get(name) is None]
+        if missing:
+            raise ValidationError(
+                "Missing required parameters: "
+                + ", ".join(f"'{name}'" for name in missing)
+            )
+        return cls(**values)
+
+
+@dataclass(frozen=True, slots=True)
+class PluginExecuteRequest:
+    """Body of a plugin execution request."""
+
+    code: str
+    category: str
+    filenames: Tuple[str, ...]
+    start: Optional[str] = None
+    end: Optional[str] = None
+
+    @classmethod
+    def from_json(cls, data: Any) -> "PluginExecuteRequest":
+        """
+        Check the fields and their types in one pass over the parsed body.
+
+        Args:
+            data (Any): Parsed JSON body
+        Returns:
+            PluginExecuteRequest: The validated request
+        Raises:
+            ValidationError: If a field is missing or has the wrong type
+        """
+        if not data or not isinstance(data, dict):
+            raise ValidationError("No data provided")
+        for name in ("code", "category", "filenames"):
+            if name not in data:
+                raise ValidationError(f"Missing required field: {name}")
+
+        filenames = data["filenames"]
+        if not isinstance(filenames, list) or not all(
+            isinstance(filename, str) for filename in filenames
+        ):
+            raise ValidationError("Field 'filenames' must be a list of strings")
+        if len(filenames) < 2:
+            raise ValidationError("At least 2 filenames required")
+        for name in ("code", "category"):
+            if not isinstance(data[name], str):
+                raise ValidationError(f"Field '{name}' must be a string")
+        for name in ("start", "end"):
+            if data.get(name) is not None and not isinstance(data[name], str):
+                raise ValidationError(f"Field '{name}' must be a string")
+
+        return cls(
+            code=data["code"],
+            category=data["category"],
+            filenames=tuple(filenames),
+            start=data.get("start"),
+            end=data.get("end"),
+        )
+
+
+# Resolved once, dataclasses.fields() is not free on every request
+_SERIES_QUERY_FIELDS = tuple(field.name for field in fields(SeriesQuery))
@@ -0,0 +1,141 @@
+import threading
+import time
+from dataclasses import dataclass
+
+from limits.storage import RedisStorage
+
+
+@dataclass
+class _LocalCounter:
+    window_end: float
+    synced: int = 0
+    pending: int = 0
+    last_sync: float = 0.0
+
+
+class LocallyBatchedRedisStorage(RedisStorage):
+    """
+    Redis rate limit storage that counts fixed-window hits in-process and only
+    flushes them to Redis every `sync_every` hits or `sync_interval` seconds.
+
+    Removes the per-request Lua round-trip of the plain Redis storage. Counters
+    stay shared between workers, at the price of each worker being able to admit
+    up to `sync_every - 1` requests over the limit before its next flush.
+
+    The end of a window is taken from Redis when a worker joins a window another
+    worker started, and expired local counters are swept every `sweep_interval`
+    seconds, on flush, so keys of clients that do not return are not kept.
+
+    Registered for the `batched+redis://` and `batched+rediss://` storage URIs.
+    """
+
+    STORAGE_SCHEME = ["batched+redis", "batched+rediss"]
+    URI_PREFIX = "batched+"
+
+    def __init__(
+        self,
+        uri: str,
+        sync_every: int = 10,
+        sync_interval: float = 1.0,
+        sweep_interval: float = 60.0,
+        **options,
+    ) -> None:
+        super().__init__(uri.removeprefix(self.URI_PREFIX), **options)
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.sweep_interval = sweep_interval
+        self._counters: dict[str, _LocalCounter] = {}
+        self._next_sweep = 0.0
+        self._lock = threading.Lock()
+
+    def _local_counter(self, key: str, now: float):
+        """Return the live local counter for a key, dropping expired windows."""
+        counter = self._counters.get(key)
+        if counter is not None and now >= counter.window_end:
+            del self._counters[key]
+            return None
+        return counter
+
+    def _sweep(self, now: float) -> None:
+        """Drop the expired local counters, at most every sweep_interval seconds."""
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self.sweep_interval
+        expired = [
+            key for key, counter in self._counters.items() if now >= counter.window_end
+        ]
+        for key in expired:
+            del self._counters[key]
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        """
+        Increment the counter for a key, flushing to Redis when due.
+
+        Returns the best known count for the current window: the last value
+        synced from Redis plus hits not flushed yet.
+        """
+        now = time.time()
+        with self._lock:
+            counter = self._local_counter(key, now)
+            if counter is None:
+                # Unknown window - flush on the first hit to learn the shared count
+                counter = _LocalCounter(window_end=now + expiry)
+                self._counters[key] = counter
+            counter.pending += amount
+            if (
+                counter.last_sync
+                and counter.pending < self.sync_every
+                and now - counter.last_sync < self.sync_interval
+            ):
+                return counter.synced + counter.pending
+            first_sync = not counter.last_sync
+            flush_amount = counter.pending
+            counter.pending = 0
+            counter.last_sync = now
+            self._sweep(now)
+
+        total = int(
+            self.lua_incr_expire([self.prefixed_key(key)], [expiry, flush_amount])
+        )
+        if total == flush_amount:
+            # Redis started a fresh window with this flush
+            window_end = now + expiry
+        elif first_sync:
+            # Joined a window started by another worker, which ends earlier
+            window_end = super().get_expiry(key)
+        else:
+            window_end = None
+
+        with self._lock:
+            counter.synced = total
+            if window_end is not None:
+                counter.window_end = window_end
+            return counter.synced + counter.pending
+
+    def get(self, key: str) -> int:
+        """Get the current count for a key, preferring the local counter."""
+        with self._lock:
+            counter = self._local_counter(key, time.time())
+            if counter is not None:
+                return counter.synced + counter.pending
+        return super().get(key)
+
+    def get_expiry(self, key: str) -> float:
+        """Get the window expiry for a key, preferring the local counter."""
+        with self._lock:
+            counter = self._local_counter(key, time.time())
+            if counter is not None:
+                return counter.window_end
+        return super().get_expiry(key)
+
+    def clear(self, key: str) -> None:
+        """Clear the local and shared counter for a key."""
+        with self._lock:
+            self._counters.pop(key, None)
+        super().clear(key)
+
+    def reset(self):
+        """Clear all local and shared counters."""
+        with self._lock:
+            self._counters.clear()
+        return super().reset()
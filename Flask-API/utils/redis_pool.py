@@ -0,0 +1,38 @@
+import redis
+
+
+class BurstableConnectionPool(redis.ConnectionPool):
+    """
+    Redis connection pool which may grow past its steady size during bursts.
+
+    Up to `max_connections` connections are opened when requests spike, so
+    threads do not fail with "Too many connections" while the pool is
+    exhausted. Once released, connections beyond `max_idle_connections` are
+    closed again, bringing the pool back to its steady size when load drops.
+    """
+
+    def __init__(self, max_idle_connections: int, **kwargs):
+        """
+        Args:
+            max_idle_connections (int): Connections kept open while idle
+            **kwargs: Arguments of redis.ConnectionPool, where max_connections
+                is the burst limit
+        """
+        super().__init__(**kwargs)
+        self.max_idle_connections = max_idle_connections
+
+    def release(self, connection) -> None:
+        """Release a connection, closing it if the pool already has enough idle."""
+        super().release(connection)
+        with self._lock:
+            excess = len(self._available_connections) - self.max_idle_connections
+            if excess <= 0:
+                return
+            # get_connection() pops from the end, so the least recently used
+            # connections are at the start of the list
+            surplus = self._available_connections[:excess]
+            del self._available_connections[:excess]
+            self._created_connections -= excess
+
+        for surplus_connection in surplus:
+            surplus_connection.disconnect()
@@ -1,7 +1,10 @@
 # utils/time_utils.py
 from datetime import datetime
+from functools import lru_cache
 from zoneinfo import ZoneInfo
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+UTC = ZoneInfo("UTC")
 
 
 def parse_iso_maybe_z(ts: str) -> datetime:
@@ -20,10 +23,32 @@ def parse_iso_maybe_z(ts: str) -> datetime:
         raise
     if dt.tzinfo is None:
         # assume UTC for purely naive timestamps coming from upstream
-        return dt.replace(tzinfo=ZoneInfo("UTC"))
+        return dt.replace(tzinfo=UTC)
     return dt
 
 
+@lru_cache(maxsize=65536)
+def _convert_timestamp_key(key: str, tz_str: str, keep_offset: bool) -> Optional[str]:
+    """
+    Convert a single timestamp key to the given timezone, None if not a timestamp.
+
+    The same session timestamps are converted on every request, so results are
+    memoized instead of parsing and formatting each key again.
+    """
+    try:
+        dt_utc = parse_iso_maybe_z(key)  # aware (UTC)
+    except Exception:
+        return None
+
+    # convert to target tz
+    dt_local = dt_utc.astimezone(ZoneInfo(tz_str))
+
+    if keep_offset:
+        return dt_local.isoformat(timespec="seconds")
+    # produce naive local ISO (no tz info) e.g. 2024-11-02T00:00:01
+    return dt_local.replace(tzinfo=None).isoformat(timespec="seconds")
+
+
 def convert_timeseries_keys_timezone(
     data: Dict[str, Any], tz_str: str = "Europe/Warsaw", keep_offset: bool = False
 ) -> Dict[str, Any]:
@@ -37,25 +62,21 @@ def convert_timeseries_keys_timezone(
     if not isinstance(data, dict):
         return data
 
-    target_tz = ZoneInfo(tz_str)
-    out: Dict[str, Any] = {}
+    ZoneInfo(tz_str)  # raise for an unknown timezone before converting anything
+    new_keys = [_convert_timestamp_key(key, tz_str, keep_offset) or key for key in data]
+    out = dict(zip(new_keys, data.values()))
+    if len(out) == len(data):
+        return out
+
+    # some keys collided, convert again one by one to keep them apart
+    out = {}
     for key, value in data.items():
-        try:
-            dt_utc = parse_iso_maybe_z(key)  # aware (UTC)
-        except Exception:
+        new_key = _convert_timestamp_key(key, tz_str, keep_offset)
+        if new_key is None:
             # if key is not a timestamp, keep as-is
             out[key] = value
             continue
 
-        # convert to target tz
-        dt_local = dt_utc.astimezone(target_tz)
-
-        if keep_offset:
-            new_key = dt_local.isoformat(timespec="seconds")
-        else:
-            # produce naive local ISO (no tz info) e.g. 2024-11-02T00:00:01
-            new_key = dt_local.replace(tzinfo=None).isoformat(timespec="seconds")
-
         # avoid key collision (if two UTC keys map to same local timestamp)
         # if collision, append a suffix (rare)
         if new_key in out:
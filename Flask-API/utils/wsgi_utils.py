@@ -0,0 +1,44 @@
+from typing import Callable, Iterable
+
+
+class HealthCheckMiddleware:
+    """
+    WSGI middleware answering health checks before the request reaches Flask.
+
+    Load balancer probes hit the health endpoint every few seconds, so it is
+    served without Flask's request context, routing, CORS handling and rate
+    limiter. Every other request is passed through to the wrapped application.
+    """
+
+    def __init__(self, app, path: str, check: Callable[[], bool]):
+        """
+        Args:
+            app: The WSGI application to wrap
+            path (str): Path of the health endpoint
+            check (Callable[[], bool]): Returns True if the service is healthy
+        """
+        self.app = app
+        self.path = path
+        self.check = check
+
+    def __call__(self, environ, start_response) -> Iterable[bytes]:
+        if environ.get("PATH_INFO") != self.path:
+            return self.app(environ, start_response)
+
+        try:
+            healthy = self.check()
+        except Exception:
+            healthy = False
+
+        if healthy:
+            status, body = "200 OK", b"OK"
+        else:
+            status, body = "503 SERVICE UNAVAILABLE", b"Service Unavailable"
+        start_response(
+            status,
+            [
+                ("Content-Type", "text/plain; charset=utf-8"),
+                ("Content-Length", str(len(body))),
+            ],
+        )
+        return [body]
@@ -573,6 +573,7 @@ export const DataImportPopup = forwardRef<DataImportPopupHandle, Props>(
         formData.append('index_col', pivotIndex);
         formData.append('columns_col', pivotColumn);
         formData.append('values_col', pivotValue);
+        formData.append('layout', 'columns');
 
         const response = await fetch(`${API_URL}/api/transform/pivot`, {
           method: 'POST',
@@ -599,7 +600,13 @@ export const DataImportPopup = forwardRef<DataImportPopupHandle, Props>(
         }
 
         const sanitizedText = responseText.replace(/:\s*NaN\b/g, ':null');
-        const transformedData = JSON.parse(sanitizedText);
+        // Columns layout: {column: [values...]}, converted back to row records
+        const transformedColumns: Record<string, unknown[]> = JSON.parse(sanitizedText);
+        const columnNames = Object.keys(transformedColumns);
+        const rowCount = columnNames.length > 0 ? transformedColumns[columnNames[0]].length : 0;
+        const transformedData = Array.from({ length: rowCount }, (_, i) =>
+          Object.fromEntries(columnNames.map(name => [name, transformedColumns[name][i]]))
+        );
 
 
         // Update file configuration with new data
@@ -73,6 +73,7 @@ export const useScatterPlot = () => {
                 filename1: file1,
                 filename2: file2,
                 category: category,
+                layout: 'columns',
             });
             if (startDate) {
                 params.append('start_date', startDate.toISOString());
@@ -92,7 +93,13 @@ export const useScatterPlot = () => {
             handleSessionToken(response);
             if (!response.ok) throw new Error("Failed to fetch scatter data");
 
-            const data: ScatterPoint[] = await response.json();
+            // Columns layout avoids repeating x/y/time keys for every point
+            const columns: { x: number[]; y: number[]; time: string[] } = await response.json();
+            const data: ScatterPoint[] = columns.time.map((time, i) => ({
+                x: columns.x[i],
+                y: columns.y[i],
+                time,
+            }));
             
             // Cache the result - both in-memory and in cacheAPI
             const cacheEntry: CacheEntry<ScatterPoint[]> = {
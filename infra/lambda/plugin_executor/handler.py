@@ -3,8 +3,10 @@ Lambda function for sandboxed plugin execution.
 Executes user-defined Python code on time series pairs in an isolated environment.
 """
 
+import hashlib
 import json
 import traceback
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
 import scipy
@@ -15,24 +17,47 @@ import statsmodels.api
 import statsmodels.tsa.api
 
 
+# Compiled plugin code kept across invocations of a warm Lambda, keyed by the
+# digest of the source. Only code objects are cached: every invocation still
+# runs the plugin in a fresh namespace, so no state leaks between requests.
+_COMPILED_PLUGINS = OrderedDict()
+_COMPILED_PLUGINS_MAXSIZE = 64
+
+
+def compile_plugin(plugin_code):
+    """Compile plugin code, reusing the code object of an identical source."""
+    key = hashlib.blake2b(plugin_code.encode("utf-8", "surrogatepass")).digest()
+    code_object = _COMPILED_PLUGINS.get(key)
+    if code_object is None:
+        code_object = compile(plugin_code, "<string>", "exec")
+        _COMPILED_PLUGINS[key] = code_object
+        if len(_COMPILED_PLUGINS) > _COMPILED_PLUGINS_MAXSIZE:
+            _COMPILED_PLUGINS.popitem(last=False)
+    else:
+        _COMPILED_PLUGINS.move_to_end(key)
+    return code_object
+
+
+def _to_frame(series, column):
+    # Series are read directly instead of being converted to a dict first
+    if isinstance(series, pd.Series):
+        series = series[~series.index.duplicated(keep="last")]  # as to_dict() did
+        times, values = series.index, series.to_numpy()
+    else:
+        times, values = list(series.keys()), list(series.values())
+    return pd.DataFrame({
+        "time": pd.to_datetime(times),
+        column: values,
+    }).set_index("time").sort_index()
+
+
 def get_aligned_data(series1, series2, tolerance=None):
     """Align two time series by their timestamps."""
-    if isinstance(series1, pd.Series):
-        series1 = series1.to_dict()
-    if isinstance(series2, pd.Series):
-        series2 = series2.to_dict()
-    if not isinstance(series1, dict) or not isinstance(series2, dict):
+    if not isinstance(series1, (dict, pd.Series)) or not isinstance(series2, (dict, pd.Series)):
         raise ValueError("Inputs must be dictionaries or pandas Series")
 
-    df1 = pd.DataFrame({
-        "time": pd.to_datetime(list(series1.keys())),
-        "value1": list(series1.values()),
-    }).set_index("time").sort_index()
-
-    df2 = pd.DataFrame({
-        "time": pd.to_datetime(list(series2.keys())),
-        "value2": list(series2.values()),
-    }).set_index("time").sort_index()
+    df1 = _to_frame(series1, "value1")
+    df2 = _to_frame(series2, "value2")
 
     df1 = df1[~df1.index.duplicated(keep="first")]
     df2 = df2[~df2.index.duplicated(keep="first")]
@@ -53,6 +78,23 @@ def get_aligned_data(series1, series2, tolerance=None):
                          direction="nearest", tolerance=tolerance_td).dropna()
 
 
+# Libraries available to plugins, built once per Lambda container
+_PLUGIN_GLOBALS = {
+    "pd": pd,
+    "np": np,
+    "numpy": np,
+    "pandas": pd,
+    "scipy": scipy,
+    "stats": scipy.stats,
+    "signal": scipy.signal,
+    "metrics": sklearn.metrics,
+    "statsmodels": statsmodels,
+    "sm": statsmodels.api,
+    "tsa": statsmodels.tsa.api,
+    "get_aligned_data": get_aligned_data,
+}
+
+
 def handler(event, context):
     """
     Execute plugin code on time series pairs.
@@ -61,15 +103,18 @@ def handler(event, context):
     {
         "code": "def calculate(s1, s2): return ...",
         "pairs": [
-            {"series1": {...}, "series2": {...}, "key": "file1|file2"},
+            {"series1": {...}, "series2": {...}, "key": 0},
+            {"series1": "file1", "series2": "file2", "key": 1},
             ...
-        ]
+        ],
+        "indexes": [[timestamp, ...], ...],  (optional)
+        "series": {"file1": {"index": 0, "values": [...]}, ...}  (optional)
     }
 
     Returns:
     {
         "results": [
-            {"result": 42.0, "key": "file1|file2"},
+            {"result": 42.0, "key": 0},
             ...
         ]
     }
@@ -81,25 +126,25 @@ def handler(event, context):
     try:
         pairs = event["pairs"]
         plugin_code = event["code"]
-
-        # Create namespace with allowed libraries
-        namespace = {
-            "pd": pd,
-            "np": np,
-            "numpy": np,
-            "pandas": pd,
-            "scipy": scipy,
-            "stats": scipy.stats,
-            "signal": scipy.signal,
-            "metrics": sklearn.metrics,
-            "statsmodels": statsmodels,
-            "sm": statsmodels.api,
-            "tsa": statsmodels.tsa.api,
-            "get_aligned_data": get_aligned_data,
+        # Series shared by several pairs are sent once, as value columns
+        # referring to a timestamp index shared between series
+        indexes = [pd.Index(index) for index in event.get("indexes", [])]
+        shared_series = {
+            name: pd.Series(columns["values"], index=indexes[columns["index"]])
+            for name, columns in event.get("series", {}).items()
         }
 
+        def to_series(ref):
+            # A copy, so a plugin modifying its input cannot affect other pairs
+            if isinstance(ref, str):
+                return shared_series[ref].copy()
+            return pd.Series(ref)
+
+        # Fresh namespace with allowed libraries, plugins may modify it
+        namespace = dict(_PLUGIN_GLOBALS)
+
         # Execute the plugin code to define the calculate function
-        exec(plugin_code, namespace)
+        exec(compile_plugin(plugin_code), namespace)
 
         if "calculate" not in namespace:
             return {"error": "Plugin must define 'calculate' function"}
@@ -109,8 +154,8 @@ def handler(event, context):
 
         for pair in pairs:
             try:
-                s1 = pd.Series(pair["series1"])
-                s2 = pd.Series(pair["series2"])
+                s1 = to_series(pair["series1"])
+                s2 = to_series(pair["series2"])
                 result = calculate(s1, s2)
                 # Convert numpy types to Python native types
                 if isinstance(result, (np.integer, np.floating)):
@@ -130,7 +130,9 @@ def create_ecs_task_definition(
             {"name": "REDIS_HOST", "value": redis_host},
             {"name": "GUNICORN_WORKERS", "value": "3"},
             {"name": "GUNICORN_THREADS", "value": "4"},
-            {"name": "GUNICORN_LOG_LEVEL", "value": "warning"}
+            {"name": "GUNICORN_LOG_LEVEL", "value": "warning"},
+            # Requests arrive through the ALB, trust its X-Forwarded-For entry
+            {"name": "TRUSTED_PROXY_COUNT", "value": "1"}
         ]
         if plugin_lambda:
             env_vars.append({"name": "PLUGIN_EXECUTOR_LAMBDA", "value": plugin_lambda})